@@ -0,0 +1,79 @@
+"""
+Running blocking storage calls from async code
+
+boto3 is synchronous: calling it from an `async def` route blocks the event
+loop, so one slow DynamoDB request stalls every other request in the worker.
+Storage services mix in `AsyncCalls` and are awaited through their `aio`
+view, which runs the call on a bounded thread pool shared by all services:
+
+    state = await game_manager.aio.get_state(game_id)
+
+The pool size (STORAGE_MAX_WORKERS) caps concurrent storage calls per process
+and stays below the shared clients' connection pool (AWS_MAX_POOL_CONNECTIONS),
+so threads never queue on HTTP connections.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .config import settings
+from .lifecycle import on_restore
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.storage_max_workers, thread_name_prefix="storage")
+    return _executor
+
+
+def reset_storage_executor() -> None:
+    """Forget the pool without joining it: after a fork its threads exist only in the parent"""
+    global _executor
+    _executor = None
+
+
+on_restore(reset_storage_executor)
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the storage pool (context variables carried over)"""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_storage_executor(), call)
+
+
+class AsyncProxy:
+    """Awaitable view of an object: every method call runs on the storage pool"""
+
+    __slots__ = ("_target",)
+
+    def __init__(self, target: Any) -> None:
+        self._target = target
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(self._target, name)
+        if not callable(method):
+            raise AttributeError(f"{name} is not a method")
+
+        @functools.wraps(method)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await run_blocking(method, *args, **kwargs)
+
+        return call
+
+
+class AsyncCalls:
+    """Mixin giving a storage service an `aio` view for use in async code"""
+
+    @property
+    def aio(self) -> AsyncProxy:
+        return AsyncProxy(self)
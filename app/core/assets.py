@@ -0,0 +1,177 @@
+"""
+Fingerprinted, precompressed static assets
+
+`python build_assets.py` copies every file under app/static into the build
+directory (STATIC_BUILD_DIR) under a content-hashed name, css/styles.css ->
+css/styles.3f2a9c1b.css, with gzip (and brotli, if installed) variants of
+text assets, and writes manifest.json mapping source paths to hashed ones.
+
+Templates link assets through `static_url('css/styles.css')`, which resolves
+the hashed name from the manifest. A hashed URL changes whenever the content
+does, so `AssetStaticFiles` serves it with a one-year immutable
+Cache-Control and the browser never asks for it again. Anything not in the
+manifest (no build, or a URL hard-coded in JS) falls back to the source file
+with `no-cache`, i.e. an ETag revalidation answered by a 304.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import stat
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .config import settings
+
+MANIFEST_NAME = "manifest.json"
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Precompressed variants, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".html", ".txt", ".map"}
+MIN_COMPRESS_SIZE = 512
+
+_manifests: Dict[str, Dict[str, str]] = {}
+_lock = threading.Lock()
+
+
+def fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _compress(data: bytes, encoding: str) -> Optional[bytes]:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+
+def build_assets(static_dir: Path, out_dir: Path) -> Dict[str, str]:
+    """Write hashed copies, compressed variants and the manifest; returns the manifest"""
+    static_dir, out_dir = Path(static_dir), Path(out_dir)
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+
+    manifest: Dict[str, str] = {}
+    for source in sorted(p for p in static_dir.rglob("*") if p.is_file()):
+        rel = source.relative_to(static_dir)
+        data = source.read_bytes()
+        hashed = rel.with_name(f"{rel.stem}.{fingerprint(data)}{rel.suffix}")
+        target = out_dir / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        manifest[rel.as_posix()] = hashed.as_posix()
+
+        if rel.suffix.lower() in COMPRESSIBLE and len(data) >= MIN_COMPRESS_SIZE:
+            for encoding, suffix in ENCODINGS:
+                compressed = _compress(data, encoding)
+                # Only keep variants that actually save bytes
+                if compressed is not None and len(compressed) < len(data):
+                    target.with_name(target.name + suffix).write_bytes(compressed)
+
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    with _lock:
+        _manifests.pop(str(out_dir), None)
+    return manifest
+
+
+def load_manifest(build_dir: Optional[Path] = None) -> Dict[str, str]:
+    """Source path -> hashed path; empty when assets have not been built"""
+    key = str(build_dir or settings.static_build_dir)
+    manifest = _manifests.get(key)
+    if manifest is None:
+        try:
+            manifest = json.loads((Path(key) / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            manifest = {}
+        with _lock:
+            _manifests[key] = manifest
+    return manifest
+
+
+def static_url(path: str) -> str:
+    """URL of a static asset, fingerprinted when a build exists (Jinja global)"""
+    path = path.lstrip("/")
+    return f"/static/{load_manifest().get(path, path)}"
+
+
+def _accepted_encodings(scope: Scope) -> set:
+    accepted = set()
+    for part in Headers(scope=scope).get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.lower())
+    return accepted
+
+
+class AssetStaticFiles(StaticFiles):
+    """
+    StaticFiles over the build output (hashed files) and the source directory,
+    adding Cache-Control and serving precompressed variants when accepted.
+    """
+
+    def __init__(self, directory: str, build_directory: Optional[str] = None, **kwargs) -> None:
+        super().__init__(directory=directory, **kwargs)
+        self.immutable: set = set()
+        self.variants: Dict[str, Tuple[str, ...]] = {}
+        if build_directory and os.path.isdir(build_directory):
+            self.all_directories = [build_directory, *self.all_directories]
+            self.immutable = set(load_manifest(Path(build_directory)).values())
+            for hashed in self.immutable:
+                base = os.path.join(build_directory, hashed)
+                self.variants[hashed] = tuple(
+                    encoding for encoding, suffix in ENCODINGS if os.path.isfile(base + suffix)
+                )
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        rel = path.replace(os.sep, "/")
+        fingerprinted = rel in self.immutable
+        available = self.variants.get(rel, ())
+        if available and scope["method"] in ("GET", "HEAD"):
+            accepted = _accepted_encodings(scope)
+            for encoding, suffix in ENCODINGS:
+                if encoding in available and encoding in accepted:
+                    response = await self._encoded_response(path, suffix, encoding, scope)
+                    if response is not None:
+                        return response
+                    break
+
+        response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = IMMUTABLE if fingerprinted else REVALIDATE
+        if available:
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    async def _encoded_response(self, path: str, suffix: str, encoding: str, scope: Scope) -> Optional[Response]:
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+        if not stat_result or not stat.S_ISREG(stat_result.st_mode):
+            return None
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        response = FileResponse(
+            full_path,
+            stat_result=stat_result,
+            media_type=media_type,
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding", "Cache-Control": IMMUTABLE},
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,105 @@
+"""
+Shared boto3 session and clients
+
+Every service gets its DynamoDB resource and AWS clients from here instead of
+building its own session at import time:
+
+- nothing is created until the first call, so importing the app (Lambda cold
+  start) does not load botocore's service models or resolve credentials;
+- one session and one client per (service, region) are shared by all
+  services, so they share one connection pool;
+- clients use a tuned botocore Config: a pool sized for the storage thread
+  pool plus the archive worker, short connect/read timeouts instead of
+  botocore's 60 s, standard retries and TCP keepalive.
+
+Credentials follow the existing precedence: explicit AWS_ACCESS_KEY_ID and
+AWS_SECRET_ACCESS_KEY, then AWS_PROFILE, then the default chain (IAM role).
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+from .lifecycle import on_restore
+
+_lock = threading.Lock()
+_session = None
+_clients: Dict[Tuple[str, str], Any] = {}
+_resources: Dict[Tuple[str, str], Any] = {}
+
+
+def client_config():
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=settings.aws_max_pool_connections,
+        connect_timeout=settings.aws_connect_timeout,
+        read_timeout=settings.aws_read_timeout,
+        retries={"mode": settings.aws_retry_mode, "max_attempts": settings.aws_max_attempts},
+        tcp_keepalive=True,
+    )
+
+
+def get_session():
+    """The process-wide boto3 session (created on first use)"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import boto3
+
+                kwargs: Dict[str, Any] = {"region_name": settings.aws_region}
+                if settings.aws_access_key_id and settings.aws_secret_access_key:
+                    kwargs["aws_access_key_id"] = settings.aws_access_key_id
+                    kwargs["aws_secret_access_key"] = settings.aws_secret_access_key
+                elif settings.aws_profile:
+                    kwargs["profile_name"] = settings.aws_profile
+                _session = boto3.Session(**kwargs)
+    return _session
+
+
+def get_client(service: str, region_name: Optional[str] = None):
+    """Shared low-level client for an AWS service (thread-safe)"""
+    key = (service, region_name or settings.aws_region)
+    client = _clients.get(key)
+    if client is None:
+        session = get_session()
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = session.client(service, region_name=key[1], config=client_config())
+                _clients[key] = client
+    return client
+
+
+def get_resource(service: str = "dynamodb", region_name: Optional[str] = None):
+    """Shared resource (e.g. dynamodb) for the default region or region_name"""
+    key = (service, region_name or settings.aws_region)
+    resource = _resources.get(key)
+    if resource is None:
+        session = get_session()
+        with _lock:
+            resource = _resources.get(key)
+            if resource is None:
+                resource = session.resource(service, region_name=key[1], config=client_config())
+                _resources[key] = resource
+    return resource
+
+
+def reset_clients() -> None:
+    """
+    Drop the session and every client; the next call builds new ones.
+
+    Used after a fork or a snapshot restore, when the pooled connections
+    belong to another process. The lock is replaced rather than acquired: a
+    forked child can inherit it held by a thread that no longer exists.
+    """
+    global _session, _clients, _resources, _lock
+    _lock = threading.Lock()
+    _session = None
+    _clients = {}
+    _resources = {}
+
+
+on_restore(reset_clients)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -15,6 +16,9 @@ class Settings(BaseModel):
     base_dir: Path = Path(__file__).resolve().parents[2]
     templates_dir: Path = base_dir / "app" / "templates"
     static_dir: Path = base_dir / "app" / "static"
+    # Build output of `python build_assets.py`: hashed static assets and compiled templates
+    static_build_dir: Path = Path(os.getenv("STATIC_BUILD_DIR", str(base_dir / "app" / "build" / "static")))
+    template_cache_dir: Path = Path(os.getenv("TEMPLATE_CACHE_DIR", str(base_dir / "app" / "build" / "templates")))
     
     # Google OAuth (legacy, can be removed after Cognito migration)
     google_client_id: str = os.getenv("GOOGLE_CLIENT_ID", "")
@@ -33,18 +37,40 @@ class Settings(BaseModel):
     
     # Use Cognito instead of Google OAuth
     use_cognito: bool = os.getenv("USE_COGNITO", "false").lower() == "true"
+    # Signing keys used to verify Cognito tokens (app/services/jwks_cache.py)
+    cognito_jwks_ttl: float = float(os.getenv("COGNITO_JWKS_TTL", "3600"))
+    cognito_jwks_min_refresh_interval: float = float(os.getenv("COGNITO_JWKS_MIN_REFRESH_INTERVAL", "30"))  # Min seconds between JWKS fetch attempts
+    cognito_jwks_snapshot_path: str = os.getenv("COGNITO_JWKS_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "llm-duel-jwks.json"))
+    # Verified access tokens kept until they expire (app/services/token_cache.py); 0 disables
+    cognito_token_cache_size: int = int(os.getenv("COGNITO_TOKEN_CACHE_SIZE", "4096"))
     
     # AWS Profile (optional - for boto3 if using programmatic API)
     aws_profile: str = os.getenv("AWS_PROFILE", "")  # Leave empty to use default profile
     aws_region: str = os.getenv("AWS_REGION", "us-east-1")  # Override region if needed
     aws_access_key_id: str = os.getenv("AWS_ACCESS_KEY_ID", "")
     aws_secret_access_key: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
+    # Shared boto3 clients (app/core/aws.py)
+    aws_max_pool_connections: int = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "32"))
+    aws_connect_timeout: float = float(os.getenv("AWS_CONNECT_TIMEOUT", "2"))
+    aws_read_timeout: float = float(os.getenv("AWS_READ_TIMEOUT", "5"))
+    aws_max_attempts: int = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+    aws_retry_mode: str = os.getenv("AWS_RETRY_MODE", "standard")  # legacy, standard or adaptive
     
     # DynamoDB
     dynamodb_table_name: str = os.getenv("DYNAMODB_TABLE_NAME", "llm-duel-arena-users")
+    # Finished games, one item per (email, game_id)
+    game_history_table_name: str = os.getenv("GAME_HISTORY_TABLE_NAME", "llm-duel-arena-game-history")
+
+    # Completed-game archiving (background worker, one conditional transaction per game)
+    archive_queue_size: int = int(os.getenv("ARCHIVE_QUEUE_SIZE", "1000"))
+    archive_flush_interval: float = float(os.getenv("ARCHIVE_FLUSH_INTERVAL", "0.5"))  # Max seconds a game waits for a batch
+    archive_max_retries: int = int(os.getenv("ARCHIVE_MAX_RETRIES", "5"))
+    # Best-effort crash journal on local disk: survives restarts and warm Lambda containers, not new ones
+    archive_spool_path: str = os.getenv("ARCHIVE_SPOOL_PATH", os.path.join(tempfile.gettempdir(), "llm-duel-archive.spool"))
 
     # Hugging Face
     huggingface_api_token: str = os.getenv("HUGGINGFACE_API_TOKEN", "")
+    huggingface_base_url: str = os.getenv("HUGGINGFACE_BASE_URL", "https://router.huggingface.co/models")
     
     # Cognito OIDC Authority URL (auto-generated from user pool ID and region)
     @property
@@ -64,6 +90,10 @@ class Settings(BaseModel):
     # OpenAI
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     openai_model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    openai_base_url: str = os.getenv("OPENAI_BASE_URL", "")  # Empty = api.openai.com
+
+    # Ollama (point all three base URLs at `python -m benchmarks.mock_llm` for load tests)
+    ollama_base_url: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
     # Anthropic
     anthropic_api_key: str = os.getenv("ANTHROPIC_API_KEY", "")
@@ -76,10 +106,41 @@ class Settings(BaseModel):
     # Redis
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+    # Word Association referee
+    word_embeddings_path: str = os.getenv("WORD_EMBEDDINGS_PATH", "")  # Empty = token overlap only
+    word_similarity_threshold: float = float(os.getenv("WORD_SIMILARITY_THRESHOLD", "0.35"))
+
+    # Active game storage: compression for the moves blob (zlib, zstd or none)
+    moves_blob_codec: str = os.getenv("MOVES_BLOB_CODEC", "zlib")
+    # Seconds a games listing page is served from the in-process cache (0 disables)
+    games_list_cache_ttl: float = float(os.getenv("GAMES_LIST_CACHE_TTL", "2"))
+
     # Runtime
+    # Threads for blocking storage calls made from async routes (keep below AWS_MAX_POOL_CONNECTIONS)
+    storage_max_workers: int = int(os.getenv("STORAGE_MAX_WORKERS", "10"))
+    # Warm up (engines, adapters, templates) at import, e.g. before gunicorn --preload forks workers
+    prepare_on_import: bool = os.getenv("PREPARE_ON_IMPORT", "false").lower() == "true"
     request_timeout_seconds: int = int(os.getenv("REQUEST_TIMEOUT_SECONDS", "30"))
     move_retry_limit: int = int(os.getenv("MOVE_RETRY_LIMIT", "2"))
     token_budget_per_match: int = int(os.getenv("TOKEN_BUDGET_PER_MATCH", "20000"))
+    # LLM concurrency governor (app/models/governor.py); 0 means unlimited
+    llm_provider_concurrency: str = os.getenv("LLM_PROVIDER_CONCURRENCY", "ollama=2,hf=4,local=1")
+    llm_default_provider_concurrency: int = int(os.getenv("LLM_DEFAULT_PROVIDER_CONCURRENCY", "16"))
+    llm_model_concurrency: int = int(os.getenv("LLM_MODEL_CONCURRENCY", "4"))
+    llm_user_concurrency: int = int(os.getenv("LLM_USER_CONCURRENCY", "2"))
+    llm_user_max_queued: int = int(os.getenv("LLM_USER_MAX_QUEUED", "4"))
+    llm_queue_timeout: float = float(os.getenv("LLM_QUEUE_TIMEOUT", "20"))  # Seconds a turn may wait for a slot
+    # LLM circuit breakers (app/models/circuit_breaker.py)
+    circuit_breaker_failures: int = int(os.getenv("CIRCUIT_BREAKER_FAILURES", "3"))  # Consecutive failures to open; 0 disables
+    circuit_breaker_reset: float = float(os.getenv("CIRCUIT_BREAKER_RESET", "30"))  # Seconds open before a probe
+    circuit_breaker_max_reset: float = float(os.getenv("CIRCUIT_BREAKER_MAX_RESET", "60"))
+    llm_fallback_models: str = os.getenv("LLM_FALLBACK_MODELS", "")  # "model-or-provider=substitute-uri,..."
+    # Token usage ledger (app/services/token_ledger.py)
+    token_budget_per_user_day: int = int(os.getenv("TOKEN_BUDGET_PER_USER_DAY", "200000"))  # 0 disables
+    token_ledger_backend: str = os.getenv("TOKEN_LEDGER_BACKEND", "memory")  # memory or dynamodb
+    token_usage_table_name: str = os.getenv("TOKEN_USAGE_TABLE_NAME", "LLM-Duel-TokenUsage")
+    token_ledger_flush_interval: float = float(os.getenv("TOKEN_LEDGER_FLUSH_INTERVAL", "5"))  # 0 writes every turn
+    token_ledger_budget_refresh: float = float(os.getenv("TOKEN_LEDGER_BUDGET_REFRESH", "10"))  # Seconds between budget reads
 
     # Security Settings
     # CORS - Comma-separated list of allowed origins
@@ -95,10 +156,23 @@ class Settings(BaseModel):
     
     # Rate limiting
     enable_rate_limiting: bool = os.getenv("ENABLE_RATE_LIMITING", "true").lower() == "true"
+    rate_limit: str = os.getenv("RATE_LIMIT", "100/minute")  # Per client IP, across all workers
+    rate_limit_gameplay: str = os.getenv("RATE_LIMIT_GAMEPLAY", "600/minute")  # Game polling and process_turn/move
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory, redis or dynamodb
+    rate_limit_table_name: str = os.getenv("RATE_LIMIT_TABLE_NAME", "LLM-Duel-RateLimits")
+    rate_limit_sync_batch: int = int(os.getenv("RATE_LIMIT_SYNC_BATCH", "10"))  # Local hits per store write
+    rate_limit_sync_interval: float = float(os.getenv("RATE_LIMIT_SYNC_INTERVAL", "1"))
     
     # Session storage
     session_table_name: str = os.getenv("SESSION_TABLE_NAME", "LLM-Duel-Sessions")
     use_dynamodb_sessions: bool = os.getenv("USE_DYNAMODB_SESSIONS", "false").lower() == "true"
+    # Per-process cache in front of the DynamoDB session table; 0 TTL disables
+    session_cache_ttl: float = float(os.getenv("SESSION_CACHE_TTL", "5"))
+    session_cache_size: int = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+    session_extend_threshold: float = float(os.getenv("SESSION_EXTEND_THRESHOLD", "900"))  # Rewrite TTL only below this
+    # In-memory sessions (local development, legacy OAuth): LRU cap and expiry sweep period
+    session_max_entries: int = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+    session_sweep_interval: float = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
     
     # Secrets Manager (optional for enhanced security)
     use_secrets_manager: bool = os.getenv("USE_SECRETS_MANAGER", "false").lower() == "true"
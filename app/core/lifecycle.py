@@ -0,0 +1,90 @@
+"""
+Two-phase process initialization
+
+Importing the app must stay snapshot-safe: no sockets, threads or resolved
+credentials, so an initialized process can be frozen by Lambda SnapStart or
+forked into pre-warmed workers (gunicorn --preload). Work is split in two:
+
+- prepare():       pure warm-up done once before the snapshot/fork: import
+                   game engines and adapters, compile templates. CPU and
+                   local files only.
+- after_restore(): runs in every restored or forked process and drops
+                   whatever belongs to the original one: shared AWS clients
+                   and their connection pools, cached DynamoDB tables, the
+                   storage thread pool, the archive worker. All of them are
+                   rebuilt lazily on first use. The random module is
+                   reseeded so restored copies do not share a sequence.
+
+Modules register their own steps with @on_prepare / on_restore(fn); install()
+wires after_restore to os.fork and to the SnapStart runtime hooks.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+from typing import Callable, List
+
+try:
+    import snapshot_restore_py  # Lambda Python runtime, SnapStart only
+except ImportError:
+    snapshot_restore_py = None
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[], None]
+
+_prepare_hooks: List[Hook] = []
+_restore_hooks: List[Hook] = []
+_prepared = False
+_installed = False
+_lock = threading.Lock()
+
+
+def on_prepare(fn: Hook) -> Hook:
+    """Register a snapshot-safe warm-up step (usable as a decorator)"""
+    _prepare_hooks.append(fn)
+    return fn
+
+
+def on_restore(fn: Hook) -> Hook:
+    """Register a step that drops per-process state after a fork or restore"""
+    _restore_hooks.append(fn)
+    return fn
+
+
+def prepare() -> None:
+    """Run the warm-up steps once; failures are logged, never fatal"""
+    global _prepared
+    with _lock:
+        if _prepared:
+            return
+        for hook in list(_prepare_hooks):
+            try:
+                hook()
+            except Exception as e:
+                logger.warning(f"Warm-up step {hook.__qualname__} failed: {e}")
+        _prepared = True
+
+
+def after_restore() -> None:
+    # Runs in a fresh child right after fork: no logging locks, no new threads
+    global _lock
+    _lock = threading.Lock()
+    random.seed()
+    for hook in _restore_hooks:
+        hook()
+
+
+def install() -> None:
+    """Hook after_restore (and prepare, under SnapStart) into the process lifecycle"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=after_restore)
+    if snapshot_restore_py is not None:
+        snapshot_restore_py.register_before_snapshot(prepare)
+        snapshot_restore_py.register_after_restore(after_restore)
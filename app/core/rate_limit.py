@@ -1,41 +1,336 @@
+"""
+Request rate limiting shared by every worker and Lambda instance
+
+A per-process counter lets each uvicorn worker and each concurrent Lambda
+instance admit the full limit on its own. Here the counts live in a
+shared store (RATE_LIMIT_BACKEND):
+
+- memory:   this process only (local development, tests)
+- redis:    INCRBY on REDIS_URL
+- dynamodb: atomic ADD counters in RATE_LIMIT_TABLE_NAME (TTL on `ttl`)
+
+The limit is a sliding window: the current fixed window's count plus the
+previous window's count weighted by how much of it still overlaps.
+
+Counts are pre-aggregated locally. A process decides from the last count
+it read plus its own unsent hits, and only talks to the store once
+RATE_LIMIT_SYNC_BATCH hits are pending (fewer as the limit gets close),
+RATE_LIMIT_SYNC_INTERVAL seconds have passed, or a new window starts.
+Each process can therefore overshoot by about one batch, plus what others
+admitted since its last sync. A client that is over the limit costs no
+store calls until the window has moved on far enough to admit it again.
+If the store is unreachable requests are let through (fail open).
+"""
 from __future__ import annotations
 
+import logging
+import math
+import threading
 import time
-from typing import Dict
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from .config import settings
+from .lifecycle import on_restore
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """'100/minute' -> (100, 60)"""
+    count, _, unit = rate.partition("/")
+    unit = unit.strip().lower().rstrip("s")
+    if unit not in PERIODS:
+        raise ValueError(f"Unknown rate limit period in {rate!r}")
+    return int(count), PERIODS[unit]
+
+
+# --- Window counter stores ---------------------------------------------------
+# incr() adds to the counter of one fixed window and returns the new total;
+# get() reads it (0 if absent). Counters expire on their own after `ttl`.
+
+
+class MemoryWindowStore:
+    local = True  # no I/O: callers need not move calls off the event loop
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self.clock = clock
+        self._counts: Dict[Tuple[str, int], Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, key: str, window: int, amount: int, ttl: int) -> int:
+        now = self.clock()
+        with self._lock:
+            count, _ = self._counts.get((key, window), (0, 0.0))
+            self._counts[(key, window)] = (count + amount, now + ttl)
+            if len(self._counts) > 4096:
+                self._counts = {k: v for k, v in self._counts.items() if v[1] > now}
+            return count + amount
+
+    def get(self, key: str, window: int) -> int:
+        with self._lock:
+            return self._counts.get((key, window), (0, 0.0))[0]
+
+
+class RedisWindowStore:
+    local = False
+
+    def __init__(self, client=None, url: Optional[str] = None, prefix: str = "ratelimit") -> None:
+        self._client = client
+        self.url = url or settings.redis_url
+        self.prefix = prefix
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis  # optional: only needed with RATE_LIMIT_BACKEND=redis
+
+            self._client = redis.Redis.from_url(self.url, socket_timeout=settings.aws_read_timeout)
+        return self._client
+
+    def _name(self, key: str, window: int) -> str:
+        return f"{self.prefix}:{key}:{window}"
+
+    def incr(self, key: str, window: int, amount: int, ttl: int) -> int:
+        name = self._name(key, window)
+        pipe = self.client.pipeline()
+        pipe.incrby(name, amount)
+        pipe.expire(name, ttl)
+        total, _ = pipe.execute()
+        return int(total)
+
+    def get(self, key: str, window: int) -> int:
+        value = self.client.get(self._name(key, window))
+        return int(value) if value is not None else 0
+
+    def reset_connections(self) -> None:
+        self._client = None
+
+
+class DynamoDBWindowStore:
+    local = False
+
+    def __init__(self, table=None, table_name: Optional[str] = None) -> None:
+        self._table = table
+        self.table_name = table_name or settings.rate_limit_table_name
+
+    @property
+    def table(self):
+        if self._table is None:
+            from .aws import get_resource
+
+            self._table = get_resource("dynamodb").Table(self.table_name)
+        return self._table
 
+    def incr(self, key: str, window: int, amount: int, ttl: int) -> int:
+        response = self.table.update_item(
+            Key={"bucket": f"{key}#{window}"},
+            UpdateExpression="ADD hits :n SET #ttl = if_not_exists(#ttl, :ttl)",
+            ExpressionAttributeNames={"#ttl": "ttl"},
+            ExpressionAttributeValues={":n": amount, ":ttl": int(time.time()) + ttl},
+            ReturnValues="UPDATED_NEW",
+        )
+        return int(response["Attributes"]["hits"])
 
-class SimpleTokenTracker:
-    def __init__(self) -> None:
-        self._usage: Dict[str, int] = {}
+    def get(self, key: str, window: int) -> int:
+        response = self.table.get_item(Key={"bucket": f"{key}#{window}"}, ProjectionExpression="hits")
+        return int(response.get("Item", {}).get("hits", 0))
 
-    def add(self, key: str, tokens: int) -> int:
-        self._usage[key] = self._usage.get(key, 0) + tokens
-        return self._usage[key]
+    def reset_connections(self) -> None:
+        self._table = None
 
-    def get(self, key: str) -> int:
-        return self._usage.get(key, 0)
 
+def get_window_store(backend: Optional[str] = None):
+    backend = (backend or settings.rate_limit_backend).lower()
+    if backend == "redis":
+        return RedisWindowStore()
+    if backend == "dynamodb":
+        return DynamoDBWindowStore()
+    if backend != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND {backend!r}; using memory")
+    return MemoryWindowStore()
 
-token_tracker = SimpleTokenTracker()
 
+# --- Limiter -----------------------------------------------------------------
 
 
+@dataclass
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the current window ends
 
 
+class _KeyState:
+    __slots__ = ("window", "count", "previous", "pending", "synced_at")
 
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.count = 0  # store total for `window` at the last sync (includes our synced hits)
+        self.previous = 0  # store total for `window - 1`
+        self.pending = 0  # admitted here, not yet added to the store
+        self.synced_at = float("-inf")
 
 
+class SlidingWindowLimiter:
+    def __init__(
+        self,
+        store,
+        limit: int,
+        period: int,
+        sync_batch: Optional[int] = None,
+        sync_interval: Optional[float] = None,
+        max_keys: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.store = store
+        self.limit = limit
+        self.period = period
+        self.sync_batch = settings.rate_limit_sync_batch if sync_batch is None else sync_batch
+        self.sync_interval = settings.rate_limit_sync_interval if sync_interval is None else sync_interval
+        self.max_keys = max_keys
+        self.clock = clock
+        self._keys: "OrderedDict[str, _KeyState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"allowed": 0, "limited": 0, "syncs": 0, "sync_errors": 0}
 
+    def _estimate(self, state: _KeyState, now: float) -> float:
+        elapsed = (now - state.window * self.period) / self.period
+        return state.previous * (1 - elapsed) + state.count + state.pending
 
+    def _state(self, key: str, window: int) -> _KeyState:
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _KeyState(window)
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        self._keys.move_to_end(key)
+        return state
 
+    def _needs_sync(self, state: _KeyState, window: int, now: float) -> bool:
+        if state.window != window:
+            return True
+        headroom = self.limit - self._estimate(state, now)
+        if headroom < 1:
+            # Over the limit. The estimate only drops as the previous window
+            # ages, which needs no store read; other processes can only raise it.
+            return False
+        if now - state.synced_at >= self.sync_interval:
+            return True
+        # Sync sooner as the limit gets close, so all processes see the last slots
+        return state.pending >= max(1, min(self.sync_batch, int(headroom / 2)))
 
+    def needs_sync(self, key: str) -> bool:
+        """True if the next hit() for `key` will call the store (callers may move it off the event loop)"""
+        if self.store.local:
+            return False
+        now = self.clock()
+        window = int(now // self.period)
+        with self._lock:
+            return self._needs_sync(self._state(key, window), window, now)
 
+    def _sync(self, key: str, state: _KeyState, window: int, now: float) -> None:
+        ttl = 2 * self.period + 60
+        with self._lock:
+            pending, pending_window = state.pending, state.window
+            state.pending = 0
+        try:
+            if pending_window != window:
+                # Close out the window our unsent hits belong to
+                if pending_window == window - 1:
+                    previous = self.store.incr(key, pending_window, pending, ttl) if pending else self.store.get(key, window - 1)
+                else:
+                    if pending:
+                        self.store.incr(key, pending_window, pending, ttl)
+                    previous = self.store.get(key, window - 1)
+                count = self.store.get(key, window)
+            else:
+                previous = state.previous
+                count = self.store.incr(key, window, pending, ttl) if pending else self.store.get(key, window)
+        except Exception as e:
+            with self._lock:
+                state.pending += pending
+                state.synced_at = now  # back off until the next interval
+                self.stats["sync_errors"] += 1
+            logger.warning(f"Rate limit store unavailable, deciding locally: {e}")
+            return
+        with self._lock:
+            if state.window != window:
+                state.window = window
+            state.previous, state.count, state.synced_at = previous, count, now
+            self.stats["syncs"] += 1
 
+    def hit(self, key: str) -> Decision:
+        """Count one request for `key` if the limit allows it"""
+        now = self.clock()
+        window = int(now // self.period)
+        with self._lock:
+            state = self._state(key, window)
+            sync = self._needs_sync(state, window, now)
+        if sync:
+            self._sync(key, state, window, now)
+        with self._lock:
+            if state.window != window:
+                # Store unreachable across a window boundary: start the new window locally
+                state.previous, state.count, state.window = state.count + state.pending, 0, window
+                state.pending = 0
+            estimate = self._estimate(state, now)
+            allowed = estimate + 1 <= self.limit
+            if allowed:
+                state.pending += 1
+                estimate += 1
+                self.stats["allowed"] += 1
+            else:
+                self.stats["limited"] += 1
+        return Decision(
+            allowed=allowed,
+            limit=self.limit,
+            remaining=max(0, math.floor(self.limit - estimate)),
+            reset_after=(window + 1) * self.period - now,
+        )
 
+    def flush(self) -> None:
+        """Send every pending count to the store (shutdown, tests)"""
+        now = self.clock()
+        window = int(now // self.period)
+        for key, state in list(self._keys.items()):
+            if state.pending:
+                self._sync(key, state, window, now)
 
+    def reset_after_fork(self) -> None:
+        """Pending counts were the parent's to send; the child starts clean"""
+        self._lock = threading.Lock()
+        self._keys = OrderedDict()
+        reset = getattr(self.store, "reset_connections", None)
+        if reset is not None:
+            reset()
 
 
+_store = None
+_limiters: Dict[str, SlidingWindowLimiter] = {}
+_limiter_lock = threading.Lock()
 
 
+def bucket_rates() -> Dict[str, str]:
+    """Rate per bucket: "gameplay" for the polling and turn routes, "default" for the rest"""
+    return {"default": settings.rate_limit, "gameplay": settings.rate_limit_gameplay}
 
 
+def get_rate_limiter(bucket: str = "default") -> SlidingWindowLimiter:
+    """Process-wide limiter for a bucket's rate on RATE_LIMIT_BACKEND, built on first use"""
+    global _store
+    limiter = _limiters.get(bucket)
+    if limiter is None:
+        with _limiter_lock:
+            limiter = _limiters.get(bucket)
+            if limiter is None:
+                if _store is None:
+                    _store = get_window_store()
+                limit, period = parse_rate(bucket_rates()[bucket])
+                limiter = _limiters[bucket] = SlidingWindowLimiter(_store, limit, period)
+                on_restore(limiter.reset_after_fork)
+    return limiter
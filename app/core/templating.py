@@ -0,0 +1,91 @@
+"""
+Jinja2 templates for the HTML pages
+
+Built on the first page render rather than at import: Jinja2 is not needed to
+serve the JSON API, which is most of what a cold Lambda handles.
+
+Compiled templates are kept in a bytecode cache (TEMPLATE_CACHE_DIR) that
+`python build_assets.py` fills at build time, so a new process loads them
+instead of parsing and compiling the sources. Outside local development the
+sources are not re-checked on every render.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from typing import Any, Dict
+
+from .config import settings
+from .lifecycle import on_prepare
+
+_templates = None
+_lock = threading.Lock()
+
+
+def _bytecode_cache():
+    from jinja2 import FileSystemBytecodeCache
+
+    class PortableBytecodeCache(FileSystemBytecodeCache):
+        """Keyed by template name only, so a cache built elsewhere matches; read-only dirs are fine"""
+
+        def get_cache_key(self, name: str, filename: Any = None) -> str:
+            # The source checksum stored with the bytecode still catches stale entries
+            return hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+        def dump_bytecode(self, bucket) -> None:
+            try:
+                super().dump_bytecode(bucket)
+            except OSError:
+                pass  # read-only deployment without a prebuilt cache: compile in memory
+
+    directory = str(settings.template_cache_dir)
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        pass
+    return PortableBytecodeCache(directory=directory)
+
+
+def get_templates():
+    global _templates
+    if _templates is None:
+        with _lock:
+            if _templates is None:
+                from fastapi.templating import Jinja2Templates
+
+                from .assets import static_url
+
+                templates = Jinja2Templates(directory=str(settings.templates_dir))
+                templates.env.bytecode_cache = _bytecode_cache()
+                templates.env.auto_reload = settings.is_local
+                templates.env.globals["static_url"] = static_url
+                _templates = templates
+    return _templates
+
+
+@on_prepare
+def compile_templates() -> int:
+    """Compile every template now (Jinja caches them on the environment); returns the count"""
+    env = get_templates().env
+    names = env.list_templates()
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def render_page(request, name: str, context: Dict[str, Any]):
+    """
+    Render a page with an ETag; a repeat visit whose copy is still current
+    gets an empty 304 instead of the HTML.
+    """
+    from starlette.responses import Response
+
+    response = get_templates().TemplateResponse(name, {"request": request, **context})
+    etag = f'W/"{hashlib.blake2b(response.body, digest_size=12).hexdigest()}"'
+    # Pages can differ per session, so only the browser may keep them, and must revalidate
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
@@ -5,7 +5,6 @@ Handles Google OAuth login, callback, and user management
 import json
 import os
 import secrets
-import boto3
 from typing import Dict, Any
 from urllib.parse import urlencode
 
@@ -13,7 +12,21 @@ from urllib.parse import urlencode
 from services.dynamodb_service import save_user, get_user_by_email
 
 # Secrets Manager for OAuth credentials
-secrets_client = boto3.client('secretsmanager', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+_secrets_client = None
+
+
+def get_secrets_client():
+    """Secrets Manager client, created on first use so cold starts skip it"""
+    global _secrets_client
+    if _secrets_client is None:
+        import boto3
+        from botocore.config import Config
+        _secrets_client = boto3.client(
+            'secretsmanager',
+            region_name=os.getenv('AWS_REGION', 'us-east-1'),
+            config=Config(connect_timeout=2, read_timeout=5, retries={'mode': 'standard', 'max_attempts': 3}, tcp_keepalive=True)
+        )
+    return _secrets_client
 
 
 def get_oauth_credentials() -> Dict[str, str]:
@@ -23,7 +36,7 @@ def get_oauth_credentials() -> Dict[str, str]:
         if not secret_arn:
             return {}
         
-        response = secrets_client.get_secret_value(SecretId=secret_arn)
+        response = get_secrets_client().get_secret_value(SecretId=secret_arn)
         secret = json.loads(response['SecretString'])
         return {
             'client_id': secret.get('client_id', ''),
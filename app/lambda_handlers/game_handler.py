@@ -173,17 +173,27 @@ def start_autoplay(game_id: str, body: Dict) -> Dict[str, Any]:
 
 
 def list_games(query_params: Dict) -> Dict[str, Any]:
-    """List all games (public games)"""
+    """List games, newest first (status/game_type/model filters, cursor pagination)"""
+    from services.game_listing import game_listing
+
+    try:
+        page = game_listing.list_games(
+            status=query_params.get('status', 'all'),
+            game_type=query_params.get('game_type'),
+            model=query_params.get('model'),
+            limit=int(query_params.get('limit', 24)),
+            cursor=query_params.get('cursor'),
+        )
+    except ValueError as e:
+        return error_response(str(e), 400)
     try:
-        # For now, return empty list
-        # In production, implement pagination and filtering
         return {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({'games': []})
+            'body': json.dumps(page)
         }
     except Exception as e:
         return error_response(str(e))
@@ -196,7 +206,10 @@ def get_my_games(query_params: Dict) -> Dict[str, Any]:
         if not user_id:
             return error_response('User ID required', 401)
         
-        games = get_user_games(user_id, limit=100)
+        try:
+            page = get_user_games(user_id, limit=int(query_params.get('limit', 20)), cursor=query_params.get('cursor'))
+        except ValueError as e:
+            return error_response(str(e), 400)
         
         return {
             'statusCode': 200,
@@ -204,16 +217,16 @@ def get_my_games(query_params: Dict) -> Dict[str, Any]:
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({'games': games})
+            'body': json.dumps(page)
         }
     except Exception as e:
         return error_response(str(e))
 
 
-def error_response(message: str) -> Dict[str, Any]:
+def error_response(message: str, status_code: int = 500) -> Dict[str, Any]:
     """Return error response"""
     return {
-        'statusCode': 500,
+        'statusCode': status_code,
         'headers': {
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*'
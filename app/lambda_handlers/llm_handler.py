@@ -4,11 +4,24 @@ Handles LLM API calls (OpenAI, Anthropic, Ollama)
 """
 import json
 import os
-import boto3
 from typing import Dict, Any, Optional, Tuple
 
 # Secrets Manager for API keys
-secrets_client = boto3.client('secretsmanager', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+_secrets_client = None
+
+
+def get_secrets_client():
+    """Secrets Manager client, created on first use so cold starts skip it"""
+    global _secrets_client
+    if _secrets_client is None:
+        import boto3
+        from botocore.config import Config
+        _secrets_client = boto3.client(
+            'secretsmanager',
+            region_name=os.getenv('AWS_REGION', 'us-east-1'),
+            config=Config(connect_timeout=2, read_timeout=5, retries={'mode': 'standard', 'max_attempts': 3}, tcp_keepalive=True)
+        )
+    return _secrets_client
 
 
 def get_openai_api_key() -> Optional[str]:
@@ -18,7 +31,7 @@ def get_openai_api_key() -> Optional[str]:
         if not secret_arn:
             return None
         
-        response = secrets_client.get_secret_value(SecretId=secret_arn)
+        response = get_secrets_client().get_secret_value(SecretId=secret_arn)
         secret = json.loads(response['SecretString'])
         return secret.get('api_key')
     except Exception as e:
@@ -188,7 +201,7 @@ def call_huggingface(model_name: str, prompt: str, game_type: str) -> Tuple[Opti
             try:
                 secret_arn = os.environ.get('HUGGINGFACE_API_TOKEN_SECRET_ARN')
                 if secret_arn:
-                    response = secrets_client.get_secret_value(SecretId=secret_arn)
+                    response = get_secrets_client().get_secret_value(SecretId=secret_arn)
                     secret = json.loads(response['SecretString'])
                     api_token = secret.get('api_token', '')
             except Exception:
@@ -1,11 +1,12 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 
+from .core import lifecycle
 from .core.config import settings
 from .core.logging import configure_logging
+from .core.assets import AssetStaticFiles
+from .core.templating import render_page
 from .routers import games, auth
 from .middleware.security import (
     setup_cors,
@@ -15,6 +16,7 @@ from .middleware.security import (
 )
 
 configure_logging()
+lifecycle.install()
 
 app = FastAPI(
     title=settings.app_name,
@@ -51,8 +53,26 @@ app.add_middleware(
 )
 
 
-app.mount("/static", StaticFiles(directory=str(settings.static_dir)), name="static")
-templates = Jinja2Templates(directory=str(settings.templates_dir))
+@app.on_event("shutdown")
+def flush_archive_queue():
+    # Write games finished just before shutdown; anything left stays in the spool
+    from .services.archive_queue import archive_queue
+    archive_queue.close()
+
+
+@app.on_event("shutdown")
+def flush_token_ledger():
+    # Usage counted since the last flush
+    from .services.token_ledger import token_ledger
+    token_ledger.close()
+
+
+# Hashed build output first (immutable caching, precompressed variants), then the sources
+app.mount(
+    "/static",
+    AssetStaticFiles(directory=str(settings.static_dir), build_directory=str(settings.static_build_dir)),
+    name="static",
+)
 
 app.include_router(games.router, prefix="/api/games", tags=["games"])
 
@@ -68,14 +88,18 @@ if settings.use_cognito:
 else:
     app.include_router(auth.router, prefix="/auth", tags=["auth"])
 
+# Snapshot-safe warm-up before workers fork (SnapStart runs it as a before-snapshot hook)
+if settings.prepare_on_import:
+    lifecycle.prepare()
+
 
 @app.get("/", response_class=HTMLResponse)
 async def landing(request: Request):
     user = request.session.get("user")
-    return templates.TemplateResponse(
+    return render_page(
+        request,
         "landing.html",
         {
-            "request": request,
             "app_name": settings.app_name,
             "use_cognito": settings.use_cognito,
             "user": user,
@@ -97,16 +121,16 @@ async def game(request: Request, game_id: str = None):
     if game_id:
         # Fetch game state to determine game type
         from .services.game_manager import game_manager
-        state = game_manager.get_state(game_id)
-        if state and state.game_type == "racing":
+        game_type = await game_manager.aio.get_game_type(game_id)
+        if game_type == "racing":
             template_name = "racing.html"
-        elif state and state.game_type == "word_association_clash":
+        elif game_type == "word_association_clash":
             template_name = "word_association.html"
     
-    return templates.TemplateResponse(
+    return render_page(
+        request,
         template_name,
         {
-            "request": request,
             "app_name": settings.app_name,
             "default_white": settings.default_white_model,
             "default_black": settings.default_black_model,
@@ -116,10 +140,10 @@ async def game(request: Request, game_id: str = None):
 
 @app.get("/games", response_class=HTMLResponse)
 async def games_list(request: Request):
-    return templates.TemplateResponse(
+    return render_page(
+        request,
         "games_list.html",
         {
-            "request": request,
             "app_name": settings.app_name,
             "use_cognito": settings.use_cognito,
         },
@@ -128,10 +152,10 @@ async def games_list(request: Request):
 
 @app.get("/my-games", response_class=HTMLResponse)
 async def my_games(request: Request):
-    return templates.TemplateResponse(
+    return render_page(
+        request,
         "my_games.html",
         {
-            "request": request,
             "app_name": settings.app_name,
             "use_cognito": settings.use_cognito,
         },
@@ -148,10 +172,10 @@ async def login_page(request: Request):
     """Login page for Cognito auth"""
     if not settings.use_cognito:
         return RedirectResponse(url="/auth/login", status_code=302)
-    return templates.TemplateResponse(
+    return render_page(
+        request,
         "login.html",
         {
-            "request": request,
             "app_name": settings.app_name,
         },
     )
@@ -162,10 +186,10 @@ async def signup_page(request: Request):
     """Signup page for Cognito auth"""
     if not settings.use_cognito:
         return RedirectResponse(url="/", status_code=302)
-    return templates.TemplateResponse(
+    return render_page(
+        request,
         "signup.html",
         {
-            "request": request,
             "app_name": settings.app_name,
         },
     )
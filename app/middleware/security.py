@@ -4,25 +4,76 @@ Provides security headers, CORS, rate limiting, and error handling
 """
 
 import logging
+import math
+import re
 from typing import Callable, List
 from fastapi import Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from ..core.aio import run_blocking
+from ..core.config import settings
+from ..core.rate_limit import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
-# Rate limiter instance
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["100/minute"],
-    storage_uri="memory://",  # Use memory storage (cheapest, works for single Lambda)
-    headers_enabled=True
-)
+# Not rate limited: fingerprinted assets are cached by the browser anyway
+RATE_LIMIT_EXEMPT_PREFIXES = ("/static/",)
+# Counted in the "gameplay" bucket (RATE_LIMIT_GAMEPLAY): a game tab polls GET
+# /api/games/{id} every 1.2-1.5 s and posts process_turn on every AI turn,
+# 50-80 requests a minute on their own
+_GAME_STATE_PATH = re.compile(r"^/api/games/(?P<game_id>[^/]+)(?P<action>/process_turn|/move)?$")
+_NAMED_GAME_ROUTES = {"health", "llm-governor", "llm-breakers", "token-usage", "list", "my-games", "random_duel"}
+
+
+def rate_limit_bucket(method: str, path: str) -> str:
+    match = _GAME_STATE_PATH.match(path)
+    if match is None or match["game_id"] in _NAMED_GAME_ROUTES:
+        return "default"
+    if match["action"] is None:
+        return "gameplay" if method == "GET" else "default"
+    return "gameplay" if method == "POST" else "default"
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Limit requests per client IP to RATE_LIMIT (RATE_LIMIT_GAMEPLAY for game
+    polling and turns), counted in the shared store (see app/core/rate_limit.py),
+    and report X-RateLimit-* headers
+    """
+    
+    async def dispatch(self, request: Request, call_next: Callable):
+        if request.url.path.startswith(RATE_LIMIT_EXEMPT_PREFIXES):
+            return await call_next(request)
+        
+        bucket = rate_limit_bucket(request.method, request.url.path)
+        limiter = get_rate_limiter(bucket)
+        key = request.client.host if request.client else "unknown"
+        if bucket != "default":
+            key = f"{bucket}:{key}"
+        if limiter.needs_sync(key):
+            decision = await run_blocking(limiter.hit, key)  # store round trip
+        else:
+            decision = limiter.hit(key)
+        
+        headers = {
+            "X-RateLimit-Limit": str(decision.limit),
+            "X-RateLimit-Remaining": str(decision.remaining),
+            "X-RateLimit-Reset": str(math.ceil(decision.reset_after)),
+        }
+        if not decision.allowed:
+            headers["Retry-After"] = headers["X-RateLimit-Reset"]
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded. Please slow down."},
+                headers=headers,
+            )
+        
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
 
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -117,9 +168,8 @@ def setup_rate_limiting(app):
     Args:
         app: FastAPI application instance
     """
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-    logger.info("Rate limiting configured")
+    app.add_middleware(RateLimitMiddleware)
+    logger.info(f"Rate limiting configured: {settings.rate_limit} per client, {settings.rate_limit_backend} backend")
 
 
 def add_security_headers(app):
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
-from anthropic import Anthropic
+from anthropic import Anthropic, APIConnectionError, APIStatusError
 
 from ..core.config import settings
-from ..services.chess_engine import ChessEngine
-from .base import ModelAdapter
+from .base import ModelAdapter, ModelUnavailable
+
+if TYPE_CHECKING:
+    from ..services.chess_engine import ChessEngine
 
 
 SYSTEM_PROMPT = (
@@ -33,20 +35,21 @@ class AnthropicAdapter(ModelAdapter):
                 max_tokens=8,
                 temperature=0,
             )
-            
-            # Track token usage from Anthropic response
-            if resp.usage:
-                self.tokens_used += resp.usage.input_tokens + resp.usage.output_tokens
-            
-            content = resp.content[0].text.strip() if resp.content else ""
-            move = self._extract_uci(content)
-            if move in legal:
-                return move, None
-            return None, f"illegal or unparsed move: {content}"
-        except Exception as e:
-            return None, str(e)
+        except (APIConnectionError, APIStatusError) as e:
+            raise ModelUnavailable(str(e)) from e
+
+        # Track token usage from Anthropic response
+        if resp.usage:
+            self.tokens_used += resp.usage.input_tokens + resp.usage.output_tokens
+        content = resp.content[0].text.strip() if resp.content else ""
+        move = self._extract_uci(content)
+        if move in legal:
+            return move, None
+        return None, f"illegal or unparsed move: {content}"
 
     def _extract_uci(self, text: str) -> Optional[str]:
+        if not text.split():
+            return None
         text = text.strip().split()[0].lower()
         if len(text) in (4, 5):
             return text
@@ -2,20 +2,38 @@ from __future__ import annotations
 
 import abc
 import random
-from typing import Optional, Dict, Tuple
+from typing import TYPE_CHECKING, Optional, Dict, Tuple
 
-from ..services.chess_engine import ChessEngine
 from ..core.config import settings
+from ..core.lifecycle import on_prepare
+
+if TYPE_CHECKING:
+    from ..services.chess_engine import ChessEngine
+
+
+class ModelUnavailable(Exception):
+    """
+    Raised by an adapter's get_move when no answer came back from the model:
+    connection errors, timeouts, HTTP errors such as 429. Only these count
+    against the circuit breakers (GuardedAdapter turns them into an error
+    string); a reply that can't be parsed or isn't legal is returned as an
+    ordinary error, because the model is up.
+    """
 
 
 class ModelAdapter(abc.ABC):
     def __init__(self, model_name: str) -> None:
         self.model_name = model_name
         self.tokens_used: int = 0
+        self.fallback_for: Optional[str] = None  # Model URI this adapter stands in for (circuit open)
 
     @abc.abstractmethod
     async def get_move(self, engine: ChessEngine) -> Tuple[Optional[str], Optional[str]]:
-        """Return (uci_move, error). Implementations must produce a legal UCI move or an error message."""
+        """
+        Return (uci_move, error). Implementations must produce a legal UCI move
+        or an error message, and raise ModelUnavailable if the model could not
+        be reached.
+        """
         raise NotImplementedError
 
 
@@ -40,6 +58,29 @@ def parse_model_uri(uri: str) -> Tuple[str, str]:
 
 
 def get_adapter(uri: str) -> ModelAdapter:
+    """
+    Adapter for `uri`, guarded by its provider and model circuit breakers.
+    While they are open: the configured substitute model, else random moves.
+    """
+    from .circuit_breaker import GuardedAdapter, breakers
+
+    if breakers.available(uri):
+        adapter = _build_adapter(uri)
+        if isinstance(adapter, RandomFallbackAdapter):
+            return adapter  # no API key or local model: nothing to guard
+        return GuardedAdapter(adapter, uri, breakers)
+    substitute = breakers.substitute(uri)
+    if substitute is not None:
+        adapter = _build_adapter(substitute)
+        if not isinstance(adapter, RandomFallbackAdapter):
+            adapter = GuardedAdapter(adapter, substitute, breakers)
+    else:
+        adapter = RandomFallbackAdapter(parse_model_uri(uri)[1])
+    adapter.fallback_for = uri
+    return adapter
+
+
+def _build_adapter(uri: str) -> ModelAdapter:
     provider, name = parse_model_uri(uri)
     if provider == "openai":
         from .openai_adapter import OpenAIAdapter
@@ -68,3 +109,15 @@ def get_adapter(uri: str) -> ModelAdapter:
         
         return HuggingFaceAdapter(name)
     return RandomFallbackAdapter(name)
+
+
+@on_prepare
+def load_adapters() -> None:
+    """Import the adapter modules (and their HTTP/SDK clients' code) ahead of the first turn"""
+    import importlib
+
+    for module in ("ollama_adapter", "huggingface_adapter", "openai_adapter", "anthropic_adapter", "local_hf_adapter"):
+        try:
+            importlib.import_module(f".{module}", __package__)
+        except ImportError:
+            pass  # optional SDK not installed
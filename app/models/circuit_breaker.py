@@ -0,0 +1,201 @@
+"""
+Circuit breakers for LLM providers and models
+
+When Ollama is down or a hosted API keeps answering 429, every turn would
+otherwise wait out the adapter's timeout and all of its retries before
+falling back to a random move. get_adapter() consults two breakers per
+call, one for the provider and one for the model URI:
+
+- closed:    calls go through; CIRCUIT_BREAKER_FAILURES consecutive
+             failures open the breaker.
+- open:      get_adapter() returns the fallback straight away: the
+             substitute model configured in LLM_FALLBACK_MODELS (if its own
+             breakers are closed), else RandomFallbackAdapter.
+- half-open: after CIRCUIT_BREAKER_RESET seconds one turn is let through
+             as a probe. Success closes the breaker; failure opens it again
+             for twice as long, up to CIRCUIT_BREAKER_MAX_RESET.
+
+Only failures to get an answer count: adapters raise ModelUnavailable for
+connection errors, timeouts and HTTP errors such as 429. A reply that cannot
+be parsed or is not a legal move means the model is up and counts as a
+success. Breakers are per process.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from ..core.config import settings
+from .base import ModelAdapter, parse_model_uri
+
+if TYPE_CHECKING:
+    from ..services.chess_engine import ChessEngine
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        max_reset_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = settings.circuit_breaker_failures if failure_threshold is None else failure_threshold
+        self.reset_timeout = settings.circuit_breaker_reset if reset_timeout is None else reset_timeout
+        self.max_reset_timeout = settings.circuit_breaker_max_reset if max_reset_timeout is None else max_reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0  # consecutive
+        self.open_for = self.reset_timeout
+        self.opened_at = 0.0
+        self.probing = False
+        self.stats: Dict[str, int] = {"opened": 0, "short_circuited": 0, "probes": 0}
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether a call could go through now (closed, or a probe is due)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            return not self.probing and self.clock() - self.opened_at >= self.open_for
+
+    def acquire(self) -> bool:
+        """Claim the right to call: always when closed, the single probe when half-open"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.probing or self.clock() - self.opened_at < self.open_for:
+                self.stats["short_circuited"] += 1
+                return False
+            self.state, self.probing = HALF_OPEN, True
+            self.stats["probes"] += 1
+            return True
+
+    def cancel(self) -> None:
+        """Give back a probe that was claimed but not used"""
+        with self._lock:
+            if self.state == HALF_OPEN and self.probing:
+                self.state, self.probing = OPEN, False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state, self.failures, self.probing = CLOSED, 0, False
+            self.open_for = self.reset_timeout
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.open_for = min(self.open_for * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == CLOSED and self.failure_threshold > 0 and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        self.state, self.probing = OPEN, False
+        self.opened_at = self.clock()
+        self.stats["opened"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = 0.0 if self.state == CLOSED else max(0.0, self.opened_at + self.open_for - self.clock())
+            return {"state": self.state, "failures": self.failures, "retry_in": round(retry_in, 1), **self.stats}
+
+
+def parse_fallbacks(spec: str) -> Dict[str, str]:
+    """'ollama=openai:gpt-4o-mini, hf:x=ollama:y' -> {'ollama': 'openai:gpt-4o-mini', 'hf:x': 'ollama:y'}"""
+    fallbacks = {}
+    for part in spec.split(","):
+        name, _, substitute = part.partition("=")
+        if name.strip() and substitute.strip():
+            fallbacks[name.strip()] = substitute.strip()
+    return fallbacks
+
+
+class BreakerRegistry:
+    def __init__(self, fallbacks: Optional[Dict[str, str]] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.fallbacks = parse_fallbacks(settings.llm_fallback_models) if fallbacks is None else fallbacks
+        self.clock = clock
+        self.providers: Dict[str, CircuitBreaker] = {}
+        self.models: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, breakers: Dict[str, CircuitBreaker], name: str) -> CircuitBreaker:
+        breaker = breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = breakers.get(name)
+                if breaker is None:
+                    breaker = breakers[name] = CircuitBreaker(name, clock=self.clock)
+        return breaker
+
+    def breakers(self, uri: str) -> Tuple[CircuitBreaker, CircuitBreaker]:
+        provider, _ = parse_model_uri(uri)
+        return self._breaker(self.providers, provider), self._breaker(self.models, uri)
+
+    def available(self, uri: str) -> bool:
+        return all(b.available() for b in self.breakers(uri))
+
+    def substitute(self, uri: str) -> Optional[str]:
+        """Configured stand-in for `uri` (by model URI, then provider) if it is available itself"""
+        provider, _ = parse_model_uri(uri)
+        substitute = self.fallbacks.get(uri) or self.fallbacks.get(provider)
+        if substitute and substitute != uri and self.available(substitute):
+            return substitute
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "providers": {name: b.metrics() for name, b in self.providers.items()},
+            "models": {name: b.metrics() for name, b in self.models.items()},
+        }
+
+
+breakers = BreakerRegistry()
+
+
+class GuardedAdapter(ModelAdapter):
+    """
+    Runs an adapter's calls through the breakers of its model URI
+
+    A pure wrapper: ModelAdapter.__init__ is not called because model_name and
+    tokens_used are the inner adapter's, exposed as read-only properties. Only
+    fallback_for belongs to the wrapper.
+    """
+
+    def __init__(self, inner: ModelAdapter, model_uri: str, registry: BreakerRegistry) -> None:
+        self.inner = inner
+        self.model_uri = model_uri
+        self.registry = registry
+        self.fallback_for: Optional[str] = None
+
+    @property
+    def model_name(self) -> str:
+        return self.inner.model_name
+
+    @property
+    def tokens_used(self) -> int:
+        return self.inner.tokens_used
+
+    async def get_move(self, engine: ChessEngine) -> Tuple[Optional[str], Optional[str]]:
+        provider, model = self.registry.breakers(self.model_uri)
+        if not provider.acquire():
+            return None, f"circuit open for {provider.name}"
+        if not model.acquire():
+            provider.cancel()
+            return None, f"circuit open for {model.name}"
+        try:
+            move, error = await self.inner.get_move(engine)
+        except Exception as e:
+            # ModelUnavailable, or an adapter error that left us without an answer
+            provider.record_failure()
+            model.record_failure()
+            return None, str(e) or type(e).__name__
+        # Any reply, even one that isn't a legal move, means the model is up
+        provider.record_success()
+        model.record_success()
+        return move, error
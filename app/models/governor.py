@@ -0,0 +1,216 @@
+"""
+Concurrency governor for LLM calls
+
+Every AI turn runs its model calls inside `governor.slot(model_uri, game_id,
+user)`, which waits for a free slot in three gates, taken in this order:
+
+- the user:      LLM_USER_CONCURRENCY turns in flight per user (or client
+                 IP), with at most LLM_USER_MAX_QUEUED more waiting;
+- the model:     LLM_MODEL_CONCURRENCY calls to one model;
+- the provider:  LLM_PROVIDER_CONCURRENCY calls per provider, e.g.
+                 "ollama=2,hf=4" (providers not listed use the default).
+
+A gate with waiters hands a freed slot to games in turn (round-robin by
+game) rather than to requests in arrival order, so one busy duel cannot
+starve the others. A turn that cannot get a slot within LLM_QUEUE_TIMEOUT
+seconds, or whose user already has too many turns waiting, raises
+GovernorBusy and is retried by the client on its next poll.
+
+Limits are per process; metrics() reports active slots, queue depth and
+wait times for every gate.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from ..core.config import settings
+from .base import parse_model_uri
+
+
+class GovernorBusy(Exception):
+    """No LLM slot available for this turn right now"""
+
+
+class FairGate:
+    """
+    Counting semaphore whose waiters are queued per game and served
+    round-robin across games
+    """
+
+    def __init__(self, name: str, limit: int, recent: int = 512) -> None:
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._waits: Deque[float] = deque(maxlen=recent)  # seconds, most recent grants
+        self.granted = 0
+        self.timeouts = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    async def acquire(self, game_id: str, timeout: Optional[float] = None) -> None:
+        if self.limit <= 0 or (self.active < self.limit and not self._queues):
+            self.active += 1
+            self._record(0.0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(game_id, deque()).append(fut)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._abandon(game_id, fut)
+            raise
+        except BaseException:  # cancelled while waiting
+            self._abandon(game_id, fut)
+            raise
+        self._record(time.perf_counter() - started)
+
+    def release(self) -> None:
+        self.active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._queues and (self.limit <= 0 or self.active < self.limit):
+            game_id, queue = next(iter(self._queues.items()))
+            fut = queue.popleft()
+            if queue:
+                self._queues.move_to_end(game_id)  # next grant goes to the next game
+            else:
+                del self._queues[game_id]
+            if fut.done():
+                continue
+            self.active += 1
+            fut.set_result(None)
+
+    def _abandon(self, game_id: str, fut: asyncio.Future) -> None:
+        if fut.done() and not fut.cancelled():
+            self.release()  # granted just as we gave up: pass it on
+            return
+        fut.cancel()
+        queue = self._queues.get(game_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(fut)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[game_id]
+
+    def _record(self, waited: float) -> None:
+        self.granted += 1
+        self._waits.append(waited)
+
+    def metrics(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "games_waiting": len(self._queues),
+            "granted": self.granted,
+            "timeouts": self.timeouts,
+            "wait_p50_ms": round(_percentile(waits, 0.5) * 1000, 1),
+            "wait_p95_ms": round(_percentile(waits, 0.95) * 1000, 1),
+            "wait_max_ms": round((waits[-1] if waits else 0.0) * 1000, 1),
+        }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """'ollama=2, hf=4' -> {'ollama': 2, 'hf': 4}"""
+    limits = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class LLMGovernor:
+    def __init__(
+        self,
+        provider_limits: Optional[Dict[str, int]] = None,
+        default_provider_limit: Optional[int] = None,
+        model_limit: Optional[int] = None,
+        user_limit: Optional[int] = None,
+        user_max_queued: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ) -> None:
+        self.provider_limits = parse_limits(settings.llm_provider_concurrency) if provider_limits is None else provider_limits
+        self.default_provider_limit = settings.llm_default_provider_concurrency if default_provider_limit is None else default_provider_limit
+        self.model_limit = settings.llm_model_concurrency if model_limit is None else model_limit
+        self.user_limit = settings.llm_user_concurrency if user_limit is None else user_limit
+        self.user_max_queued = settings.llm_user_max_queued if user_max_queued is None else user_max_queued
+        self.queue_timeout = settings.llm_queue_timeout if queue_timeout is None else queue_timeout
+        self.providers: Dict[str, FairGate] = {}
+        self.models: Dict[str, FairGate] = {}
+        self.users: Dict[str, FairGate] = {}
+        self.rejected = 0
+
+    def _gate(self, gates: Dict[str, FairGate], name: str, limit: int) -> FairGate:
+        gate = gates.get(name)
+        if gate is None:
+            gate = gates[name] = FairGate(name, limit)
+        return gate
+
+    @asynccontextmanager
+    async def slot(self, model_uri: str, game_id: str, user: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a user, model and provider slot for the duration of the block"""
+        provider, _ = parse_model_uri(model_uri)
+        gates = []
+        if user:
+            user_gate = self._gate(self.users, user, self.user_limit)
+            if user_gate.limit > 0 and user_gate.active >= user_gate.limit and user_gate.queued >= self.user_max_queued:
+                self.rejected += 1
+                raise GovernorBusy(f"too many turns queued for {user}")
+            gates.append(user_gate)
+        gates.append(self._gate(self.models, model_uri, self.model_limit))
+        gates.append(self._gate(self.providers, provider, self.provider_limits.get(provider, self.default_provider_limit)))
+
+        deadline = time.monotonic() + self.queue_timeout if self.queue_timeout > 0 else None
+        held: List[FairGate] = []
+        try:
+            for gate in gates:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    await gate.acquire(game_id, timeout)
+                except asyncio.TimeoutError:
+                    self.rejected += 1
+                    raise GovernorBusy(f"no {gate.name} slot within {self.queue_timeout:g}s") from None
+                held.append(gate)
+            yield
+        finally:
+            for gate in reversed(held):
+                gate.release()
+            # Forget idle user gates so every visitor does not leave one behind
+            if user and gates[0].active == 0 and not gates[0].queued:
+                self.users.pop(user, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        busy_users = [g for g in self.users.values() if g.active or g.queued]
+        return {
+            "providers": {name: gate.metrics() for name, gate in self.providers.items()},
+            "models": {name: gate.metrics() for name, gate in self.models.items()},
+            "users": {
+                "active": len(busy_users),
+                "queued": sum(g.queued for g in busy_users),
+            },
+            "rejected": self.rejected,
+        }
+
+
+governor = LLMGovernor()
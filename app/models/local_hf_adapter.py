@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
-from ..services.chess_engine import ChessEngine
 from .base import ModelAdapter, RandomFallbackAdapter
 
+if TYPE_CHECKING:
+    from ..services.chess_engine import ChessEngine
+
 
 class LocalHFAdapter(RandomFallbackAdapter):
     def __init__(self, model_name: str) -> None:
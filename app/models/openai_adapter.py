@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
-from openai import OpenAI
+from openai import APIConnectionError, APIStatusError, OpenAI
 
 from ..core.config import settings
-from ..services.chess_engine import ChessEngine
-from .base import ModelAdapter
+from .base import ModelAdapter, ModelUnavailable
+
+if TYPE_CHECKING:
+    from ..services.chess_engine import ChessEngine
 
 
 SYSTEM_PROMPT = (
@@ -18,7 +20,7 @@ SYSTEM_PROMPT = (
 class OpenAIAdapter(ModelAdapter):
     def __init__(self, model_name: str) -> None:
         super().__init__(model_name)
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url or None)
 
     async def get_move(self, engine: ChessEngine) -> Tuple[Optional[str], Optional[str]]:
         legal = engine.legal_moves_uci()
@@ -35,20 +37,21 @@ class OpenAIAdapter(ModelAdapter):
                 temperature=0,
                 max_tokens=8,
             )
-            
-            # Track token usage from OpenAI response
-            if resp.usage:
-                self.tokens_used += resp.usage.total_tokens
-            
-            content = resp.choices[0].message.content.strip()
-            move = self._extract_uci(content)
-            if move in legal:
-                return move, None
-            return None, f"illegal or unparsed move: {content}"
-        except Exception as e:
-            return None, str(e)
+        except (APIConnectionError, APIStatusError) as e:
+            raise ModelUnavailable(str(e)) from e
+
+        # Track token usage from OpenAI response
+        if resp.usage:
+            self.tokens_used += resp.usage.total_tokens
+        content = (resp.choices[0].message.content or "").strip() if resp.choices else ""
+        move = self._extract_uci(content)
+        if move in legal:
+            return move, None
+        return None, f"illegal or unparsed move: {content}"
 
     def _extract_uci(self, text: str) -> Optional[str]:
+        if not text.split():
+            return None
         text = text.strip().split()[0].lower()
         if len(text) in (4, 5):
             return text
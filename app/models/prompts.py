@@ -0,0 +1,227 @@
+"""
+Prompts and answer parsing shared by the text-completion adapters
+
+build_prompt(engine) works out the game from the engine, lists the legal
+moves and writes the system and user prompts; extract_move(prompt, text)
+pulls a legal move out of the model's reply. The Ollama and HuggingFace
+adapters differ in transport, in the last line (and length) of the word
+association prompt, and Ollama keeps its own looser fallback for
+associations extract_move rejects.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+UCI_REGEX = re.compile(r"\b([a-h][1-8][a-h][1-8][qrbn]?)\b", re.IGNORECASE)
+TTT_REGEX = re.compile(r"\b([0-2]\s*,\s*[0-2])\b")
+RPS_REGEX = re.compile(r"\b(rock|paper|scissors|r|p|s)\b", re.IGNORECASE)
+
+ASSOCIATION_INSTRUCTION = (
+    "Return ONLY a new association in 1-3 words that connects to the prompt. No explanations, just the words."
+)
+
+
+@dataclass(slots=True)
+class TurnPrompt:
+    game_type: str
+    system: str
+    user: str
+    max_tokens: int
+    legal: List[str] = field(default_factory=list)  # empty for word association (any phrase may do)
+
+    @property
+    def text(self) -> str:
+        """System and user prompt as one completion prompt"""
+        return f"{self.system}\n\n{self.user}"
+
+
+def detect_game(engine) -> Optional[str]:
+    """Game type of an engine, from the attributes it exposes"""
+    if hasattr(engine, "board") and hasattr(engine.board, "legal_moves"):
+        return "chess"
+    if hasattr(engine, "board") and isinstance(engine.board, list):
+        return "tic_tac_toe"
+    if hasattr(engine, "white_choice") and hasattr(engine, "black_choice"):
+        return "rock_paper_scissors"
+    if hasattr(engine, "white_position") and hasattr(engine, "black_position"):
+        return "racing"
+    if hasattr(engine, "history") and hasattr(engine, "current_prompt"):
+        return "word_association_clash"
+    return None
+
+
+def format_ttt_board(engine) -> str:
+    """Tic-tac-toe board with free cells shown as their "row,col" move"""
+    rows = []
+    for i, row in enumerate(engine.board):
+        cells = []
+        for j, cell in enumerate(row):
+            if cell == "X":
+                cells.append("X")
+            elif cell == "O":
+                cells.append("O")
+            else:
+                cells.append(f"{i},{j}")
+        rows.append(" | ".join(cells))
+    return "\n".join(rows)
+
+
+def build_prompt(
+    engine,
+    association_instruction: str = ASSOCIATION_INSTRUCTION,
+    association_max_tokens: int = 15,
+) -> Tuple[Optional[TurnPrompt], Optional[str]]:
+    """Return (prompt, error) for the side to move"""
+    game_type = detect_game(engine)
+    if game_type is None:
+        return None, "unknown game type"
+
+    if game_type == "word_association_clash":
+        # Read the live engine fields instead of round-tripping get_state() through JSON
+        prompt_text = engine.current_prompt or "general knowledge"
+        current_turn = engine.get_turn()
+        previous_responses = []
+        for entry in engine.history:
+            if entry.get("white"):
+                previous_responses.append(f"White: {entry['white']}")
+            if entry.get("black"):
+                previous_responses.append(f"Black: {entry['black']}")
+        previous_text = "\n".join(previous_responses) if previous_responses else "None yet."
+        system = (
+            "You are playing Word Association Clash. Respond with 1-3 words that are clearly related to the prompt "
+            "and different from every previous response. Avoid punctuation or explanations—just the association."
+        )
+        user = (
+            f"Prompt: {prompt_text}\n"
+            f"Current side: {'White' if current_turn == 'white' else 'Black'}\n"
+            f"Previous associations:\n{previous_text}\n"
+            f"{association_instruction}"
+        )
+        return TurnPrompt(game_type, system, user, association_max_tokens), None
+
+    legal = engine.legal_moves()
+    if not legal:
+        return None, "no legal moves"
+
+    if game_type == "chess":
+        system = (
+            "You are playing chess. Choose aggressive moves that maximize quick checkmate:"
+            " prefer captures, checks, or strong threats. Respond with ONLY one UCI move like 'e2e4' or 'e7e8q'."
+        )
+        user = (
+            f"FEN: {engine.get_state()}\n"
+            "Return only one legal move in UCI (e.g., e2e4)."
+        )
+        return TurnPrompt(game_type, system, user, 8, legal), None
+
+    if game_type == "tic_tac_toe":
+        system = (
+            "You are playing Tic Tac Toe. Choose the best move strategically."
+            " Respond with ONLY one move in format 'row,col' where row and col are 0, 1, or 2."
+        )
+        user = (
+            f"Current board:\n{format_ttt_board(engine)}\n"
+            "Return only one legal move in format 'row,col' (e.g., '1,1' for center)."
+        )
+        return TurnPrompt(game_type, system, user, 5, legal), None
+
+    if game_type == "rock_paper_scissors":
+        system = (
+            "You are playing Rock Paper Scissors. Choose strategically: "
+            "rock beats scissors, scissors beats paper, paper beats rock."
+            " Respond with ONLY one choice: 'rock', 'paper', or 'scissors'."
+        )
+        opponent_choice = engine.white_choice if engine.current_player == "black" else engine.black_choice
+        if opponent_choice:
+            user = (
+                f"Your opponent chose: {opponent_choice}\n"
+                "Return only one choice: rock, paper, or scissors."
+            )
+        else:
+            user = (
+                "First round - no opponent choice yet.\n"
+                "Return only one choice: rock, paper, or scissors."
+            )
+        return TurnPrompt(game_type, system, user, 3, legal), None
+
+    # racing
+    current_player = engine.get_turn()
+    current_pos = engine.white_position if current_player == "white" else engine.black_position
+    current_speed = engine.white_speed if current_player == "white" else engine.black_speed
+    current_moves = engine.white_moves if current_player == "white" else engine.black_moves
+    opponent_pos = engine.black_position if current_player == "white" else engine.white_position
+    system = (
+        "You are racing to reach position 100 first. You have 20 moves maximum. "
+        "Choose the best action to win the race. "
+        "Respond with ONLY one action: 'accelerate', 'boost', or 'maintain'."
+    )
+    user = (
+        f"Current position: {current_pos}/100 | Speed: {current_speed} | Moves used: {current_moves}/20\n"
+        f"Opponent position: {opponent_pos}/100\n"
+        f"Legal actions: {', '.join(legal)}\n"
+        "Return only one action (accelerate, boost, or maintain)."
+    )
+    return TurnPrompt(game_type, system, user, 4, legal), None
+
+
+def _extract_uci(text: str) -> Optional[str]:
+    m = UCI_REGEX.search(text)
+    return m.group(1).lower() if m else None
+
+
+def _extract_ttt(text: str) -> Optional[str]:
+    m = TTT_REGEX.search(text)
+    if m:
+        parts = m.group(1).split(",")
+        return f"{parts[0].strip()},{parts[1].strip()}"
+    return None
+
+
+def _extract_rps(text: str) -> Optional[str]:
+    m = RPS_REGEX.search(text.lower())
+    if m:
+        choice = m.group(1).lower()
+        # Map short forms to full forms
+        return {"r": "rock", "p": "paper", "s": "scissors"}.get(choice, choice)
+    return None
+
+
+def _extract_racing(text: str) -> Optional[str]:
+    text = text.lower().strip()
+    if "boost" in text:
+        return "boost"
+    if "accelerate" in text or "accel" in text:
+        return "accelerate"
+    if "maintain" in text or "keep" in text:
+        return "maintain"
+    return None
+
+
+def _extract_association(text: str) -> Optional[str]:
+    """A concise fragment: the first three words"""
+    tokens = text.strip().replace("\n", " ").split()
+    if not tokens:
+        return None
+    return " ".join(tokens[:3]).strip().strip(",.;:")
+
+
+def extract_move(prompt: TurnPrompt, content: str) -> Optional[str]:
+    """The legal move in a model reply, or None"""
+    game_type = prompt.game_type
+    if game_type == "word_association_clash":
+        return _extract_association(content) or None
+    if game_type == "chess":
+        move = _extract_uci(content)
+        if move in prompt.legal:
+            return move
+        compact = re.sub(r"[^a-h1-8qrbn]", "", content.lower())
+        return compact if compact in prompt.legal else None
+    extract = {
+        "tic_tac_toe": _extract_ttt,
+        "rock_paper_scissors": _extract_rps,
+        "racing": _extract_racing,
+    }[game_type]
+    move = extract(content)
+    return move if move in prompt.legal else None
@@ -3,47 +3,53 @@ from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 from typing import Optional
 from fastapi.responses import RedirectResponse
-from authlib.integrations.starlette_client import OAuth
-from starlette.config import Config
 from datetime import datetime
-import secrets
 import logging
 
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, get_password_hash
 from app.services.dynamodb_service import dynamodb_service
+from app.services.session_store import session_store
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
-# Initialize OAuth
-config = Config(environ={
-    "GOOGLE_CLIENT_ID": settings.google_client_id,
-    "GOOGLE_CLIENT_SECRET": settings.google_client_secret,
-})
-
-oauth = OAuth(config)
-
-oauth.register(
-    name='google',
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={
-        'scope': 'openid email profile'
-    },
-    # Add these to help with session/state handling
-    authorize_params={
-        'access_type': 'offline',
-        'prompt': 'consent'
-    }
-)
+_oauth = None
+
+
+def get_oauth():
+    """Google OAuth client, registered on first use (authlib is slow to import)"""
+    global _oauth
+    if _oauth is None:
+        from authlib.integrations.starlette_client import OAuth
+        from starlette.config import Config
+
+        config = Config(environ={
+            "GOOGLE_CLIENT_ID": settings.google_client_id,
+            "GOOGLE_CLIENT_SECRET": settings.google_client_secret,
+        })
+        oauth = OAuth(config)
+        oauth.register(
+            name='google',
+            server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+            client_kwargs={
+                'scope': 'openid email profile'
+            },
+            # Add these to help with session/state handling
+            authorize_params={
+                'access_type': 'offline',
+                'prompt': 'consent'
+            }
+        )
+        _oauth = oauth
+    return _oauth
 
 
-# In-memory session store (for simplicity, use Redis in production)
-sessions = {}
+# Legacy Google OAuth sessions live in the shared session store (expiring, bounded)
+SESSION_TTL = 30 * 24 * 60 * 60  # 30 days, same as the cookie
 
 
-def get_current_user(request: Request):
+async def get_current_user(request: Request):
     """Get current logged-in user from session"""
     # Check for Starlette Session (Cognito)
     if 'user' in request.session:
@@ -68,14 +74,20 @@ def get_current_user(request: Request):
 
     # Fallback to custom session_id (Google OAuth legacy)
     session_id = request.cookies.get("session_id")
-    if not session_id or session_id not in sessions:
+    if not session_id:
         return None
     
     # The session store already holds the user data for legacy Google OAuth
     # We can construct a UserObj from it directly.
-    session_data = sessions[session_id]
+    if session_store.needs_read(session_id):
+        session_data = await session_store.aio.get_session(session_id)  # DynamoDB read
+    else:
+        session_data = session_store.get_session(session_id)
     if not session_data:
         return None
+    if session_store.needs_extend(session_id):
+        # Sliding expiration: an active session gets a fresh TTL shortly before it runs out
+        await session_store.aio.extend_session(session_id, SESSION_TTL)
     
     class UserObj:
         def __init__(self, data):
@@ -106,7 +118,7 @@ async def login(request: Request):
         )
     
     logger.info("[OAuth] /auth/login invoked. Session before authorize: %s", dict(request.session))
-    response = await oauth.google.authorize_redirect(request, redirect_uri)
+    response = await get_oauth().google.authorize_redirect(request, redirect_uri)
     logger.info("[OAuth] authorize_redirect returned. Session after authorize: %s", dict(request.session))
     logger.info("[OAuth] Response headers include set-cookie: %s", response.headers.get('set-cookie'))
     return response
@@ -119,7 +131,7 @@ async def auth_callback(request: Request):
     try:
         logger.info("[OAuth] /auth/callback invoked. Incoming session: %s", dict(request.session))
         # Authorize access token with the request that includes session data
-        token = await oauth.google.authorize_access_token(request)
+        token = await get_oauth().google.authorize_access_token(request)
         logger.info("[OAuth] Access token obtained successfully")
         user_info = token.get('userinfo')
         
@@ -149,13 +161,12 @@ async def auth_callback(request: Request):
         db.commit()
         
         # Create session
-        session_id = secrets.token_urlsafe(32)
-        sessions[session_id] = {
+        session_id = await session_store.aio.create_session({
             "email": user.email,
             "name": user.name,
             "picture": user.picture,
             "user_id": user.id
-        }
+        }, ttl_seconds=SESSION_TTL)
         
         # Redirect to home with session cookie
         response = RedirectResponse(url="/", status_code=302)
@@ -163,7 +174,7 @@ async def auth_callback(request: Request):
             key="session_id",
             value=session_id,
             httponly=True,
-            max_age=30 * 24 * 60 * 60,  # 30 days
+            max_age=SESSION_TTL,
             samesite="lax"
         )
         logger.info("[OAuth] Login successful for %s. session_id cookie set.", user.email)
@@ -178,8 +189,8 @@ async def auth_callback(request: Request):
 async def logout(request: Request):
     """Logout user"""
     session_id = request.cookies.get("session_id")
-    if session_id and session_id in sessions:
-        del sessions[session_id]
+    if session_id:
+        await session_store.aio.delete_session(session_id)
     
     response = RedirectResponse(url="/", status_code=302)
     response.delete_cookie("session_id")
@@ -189,7 +200,7 @@ async def logout(request: Request):
 @router.get("/user")
 async def get_user_info(request: Request):
     """Get current user info (API endpoint for frontend)"""
-    user = get_current_user(request, db)
+    user = await get_current_user(request, db)
     if not user:
         return {"logged_in": False}
     
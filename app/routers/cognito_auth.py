@@ -11,17 +11,14 @@ import logging
 import secrets
 
 from app.core.config import settings
+from app.core.security import get_bearer_token
 from app.services.dynamodb_service import dynamodb_service
 from app.services.cognito_service import cognito_service
+from app.services.session_store import session_store
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# In-memory session store (for JWT tokens)
-# In production, use Redis or DynamoDB
-sessions = {}
-
-
 # Request/Response Models
 class SignUpRequest(BaseModel):
     email: EmailStr
@@ -55,14 +52,7 @@ class RefreshTokenRequest(BaseModel):
 
 def get_current_user(request: Request):
     """Get current logged-in user from JWT token"""
-    # Try to get token from Authorization header
-    auth_header = request.headers.get("Authorization", "")
-    if auth_header.startswith("Bearer "):
-        token = auth_header.split("Bearer ")[1]
-    else:
-        # Try to get from cookie
-        token = request.cookies.get("access_token")
-    
+    token = get_bearer_token(request)
     if not token:
         return None
     
@@ -111,7 +101,7 @@ async def signup(request: SignUpRequest):
         raise HTTPException(status_code=500, detail="Cognito is not enabled")
     
     # Check if user already exists in DynamoDB
-    existing_user = dynamodb_service.get_user(request.email)
+    existing_user = await dynamodb_service.aio.get_user(request.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="User already exists")
     
@@ -174,7 +164,7 @@ async def login(request: LoginRequest):
     
     # Get or create user in DynamoDB
     email = user_info['email']
-    user_data = dynamodb_service.get_user(email)
+    user_data = await dynamodb_service.aio.get_user(email)
     
     if not user_data:
         user_data = {
@@ -184,19 +174,19 @@ async def login(request: LoginRequest):
             'created_at': datetime.utcnow().isoformat(),
             'last_login': datetime.utcnow().isoformat()
         }
-        dynamodb_service.create_user(email, user_data)
+        await dynamodb_service.aio.create_user(email, user_data)
     else:
-        dynamodb_service.update_user_login(email)
+        await dynamodb_service.aio.update_user_login(email)
     
     # Create session
-    session_id = secrets.token_urlsafe(32)
-    sessions[session_id] = {
+    expires_in = result.get('expires_in', 3600)
+    session_id = await session_store.aio.create_session({
         "access_token": access_token,
         "refresh_token": result.get('refresh_token'),
         "id_token": result.get('id_token'),
         "email": email,
         "user_id": user_info['sub']
-    }
+    }, ttl_seconds=expires_in)
     
     # Return tokens
     response = JSONResponse({
@@ -217,10 +207,19 @@ async def login(request: LoginRequest):
         key="access_token",
         value=access_token,
         httponly=True,
-        max_age=result.get('expires_in', 3600),
+        max_age=expires_in,
         samesite="lax",
         secure=False  # Set to True in production with HTTPS
     )
+    # Lets logout find and delete the session
+    response.set_cookie(
+        key="session_id",
+        value=session_id,
+        httponly=True,
+        max_age=expires_in,
+        samesite="lax",
+        secure=False
+    )
     
     return response
 
@@ -260,8 +259,12 @@ async def refresh_token(request: RefreshTokenRequest):
 async def logout(request: Request):
     """Logout user"""
     session_id = request.cookies.get("session_id")
-    if session_id and session_id in sessions:
-        del sessions[session_id]
+    if session_id:
+        await session_store.aio.delete_session(session_id)
+    token = get_bearer_token(request)
+    if token:
+        # Verifying the token may fetch the JWKS: off the event loop
+        await cognito_service.aio.revoke_token(token)
     
     response = RedirectResponse(url="/", status_code=302)
     response.delete_cookie("access_token")
@@ -287,6 +290,12 @@ async def get_user_info(request: Request):
     }
 
 
+@router.get("/token-cache")
+async def token_cache_metrics():
+    """Verified-token cache counters and hit rate"""
+    return cognito_service.verified.metrics()
+
+
 @router.post("/forgot-password")
 async def forgot_password(request: ForgotPasswordRequest):
     """Initiate forgot password flow"""
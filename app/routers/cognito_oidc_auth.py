@@ -6,44 +6,42 @@ Implements OAuth 2.0 / OpenID Connect flow with Cognito Hosted UI
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.responses import RedirectResponse
 from typing import Optional
-import httpx
-import jwt
-from jwt.algorithms import RSAAlgorithm
 import json
-import base64
-import struct
 import logging
 
 from app.core.config import settings
-from app.core.security import create_access_token
+from app.core.security import create_access_token, get_bearer_token
 from app.services.dynamodb_service import dynamodb_service
-from authlib.integrations.starlette_client import OAuth
-from starlette.config import Config
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Initialize OAuth with authlib (similar to Flask example)
-# Note: OAuth client needs to be initialized without Config for proper session handling
-oauth = OAuth()
+_oauth = None
 
-# Register Cognito as OIDC provider (similar to Flask example)
-# Build registration kwargs
-register_kwargs = {
-    'name': 'cognito',
-    'authority': settings.cognito_authority,
-    'client_id': settings.cognito_client_id,
-    'server_metadata_url': settings.cognito_server_metadata_url,
-    'client_kwargs': {
-        'scope': settings.cognito_scopes  # These must match Cognito App Client allowed scopes
-    },
-}
 
-# Only add client_secret if provided (web apps typically don't need it)
-if settings.cognito_client_secret:
-    register_kwargs['client_secret'] = settings.cognito_client_secret
+def get_oauth():
+    """authlib OAuth registry with Cognito as OIDC provider, built on first use"""
+    global _oauth
+    if _oauth is None:
+        from authlib.integrations.starlette_client import OAuth
 
-oauth.register(**register_kwargs)
+        # Note: OAuth client needs to be initialized without Config for proper session handling
+        oauth = OAuth()
+        register_kwargs = {
+            'name': 'cognito',
+            'authority': settings.cognito_authority,
+            'client_id': settings.cognito_client_id,
+            'server_metadata_url': settings.cognito_server_metadata_url,
+            'client_kwargs': {
+                'scope': settings.cognito_scopes  # These must match Cognito App Client allowed scopes
+            },
+        }
+        # Only add client_secret if provided (web apps typically don't need it)
+        if settings.cognito_client_secret:
+            register_kwargs['client_secret'] = settings.cognito_client_secret
+        oauth.register(**register_kwargs)
+        _oauth = oauth
+    return _oauth
 
 
 def get_current_user(request: Request):
@@ -158,7 +156,7 @@ async def login(request: Request):
         
         # Create redirect - authlib will add state to session
         # IMPORTANT: authlib stores state with key: _state_cognito_{state_value}
-        response = await oauth.cognito.authorize_redirect(
+        response = await get_oauth().cognito.authorize_redirect(
             request, 
             redirect_uri,
             scope=settings.cognito_scopes  # Use configured scopes - must match Cognito App Client settings
@@ -323,7 +321,7 @@ async def authorize(request: Request):
         # authlib will verify the state parameter automatically
         # If state verification fails, it might be due to session cookie issues
         try:
-            token = await oauth.cognito.authorize_access_token(request)
+            token = await get_oauth().cognito.authorize_access_token(request)
         except Exception as state_error:
             error_str = str(state_error)
             logger.error(f"[Cognito OIDC] State verification failed: {error_str}")
@@ -397,7 +395,7 @@ async def authorize(request: Request):
                 # Use the access token to fetch userinfo
                 access_token = token.get('access_token')
                 if access_token:
-                    resp = await oauth.cognito.get('userinfo', token={'access_token': access_token})
+                    resp = await get_oauth().cognito.get('userinfo', token={'access_token': access_token})
                     user_info = resp.json()
                     logger.info(f"[Cognito OIDC] Userinfo fetched: {list(user_info.keys())}")
                 else:
@@ -423,7 +421,7 @@ async def authorize(request: Request):
             from ..services.dynamodb_service import dynamodb_service
             email = user_info.get('email')
             if email:
-                dynamodb_service.update_user_login(email)
+                await dynamodb_service.aio.update_user_login(email)
                 logger.info(f"[Cognito OIDC] Updated DynamoDB for user {email}")
         except Exception as e:
             logger.error(f"[Cognito OIDC] Failed to update DynamoDB: {e}")
@@ -455,6 +453,13 @@ async def logout(request: Request):
     # Clear session
     request.session.pop('user', None)
     
+    # Refuse the bearer token from now on instead of trusting it until it expires
+    token = get_bearer_token(request)
+    if token:
+        from app.services.cognito_service import cognito_service
+        # Verifying the token may fetch the JWKS: off the event loop
+        await cognito_service.aio.revoke_token(token)
+    
     # Optionally redirect to Cognito logout URL
     if settings.cognito_domain:
         logout_url = f"https://{settings.cognito_domain}.auth.{settings.cognito_region}.amazoncognito.com/logout?client_id={settings.cognito_client_id}&logout_uri={settings.cognito_logout_url}"
@@ -1,74 +1,56 @@
-import boto3
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from botocore.exceptions import ClientError
+from ..core.aio import AsyncCalls
+from ..core.aws import get_resource
+from ..core.lifecycle import on_restore
 from ..core.config import settings
-from .game_manager import GameState, MoveRecord
+from .game_manager import GameHeader, GameState
+from .serialization import HEADER_ATTRIBUTES, game_status, header_from_item, state_from_item, state_to_item
+
+# GSI over active games: status partition ("ongoing#03", see game_status) + created_at,
+# newest first. Every item is in it; game_listing queries all shards of a status.
+LISTING_INDEX = "status-created_at-index"
+LISTING_ATTRIBUTES = ('game_type', 'white_model', 'black_model', 'over', 'result', 'turn', 'move_count')
 
 logger = logging.getLogger(__name__)
 
-class ActiveGameService:
+class ActiveGameService(AsyncCalls):
     def __init__(self):
         self.table_name = "LLM-Duel-ActiveGames"
         self.region = settings.aws_region
-        
-        try:
-            if settings.aws_access_key_id and settings.aws_secret_access_key:
-                self.dynamodb = boto3.resource(
-                    'dynamodb',
-                    region_name=self.region,
-                    aws_access_key_id=settings.aws_access_key_id,
-                    aws_secret_access_key=settings.aws_secret_access_key
-                )
-            else:
-                self.dynamodb = boto3.resource('dynamodb', region_name=self.region)
-                
-            self.table = self.dynamodb.Table(self.table_name)
-        except Exception as e:
-            logger.error(f"Failed to initialize ActiveGameService: {e}")
-            self.table = None
+        self._table = None
+
+    @property
+    def dynamodb(self):
+        return get_resource('dynamodb')
+
+    @property
+    def table(self):
+        # Created on first use from the shared session (app/core/aws.py)
+        if self._table is None:
+            try:
+                self._table = self.dynamodb.Table(self.table_name)
+            except Exception as e:
+                logger.error(f"Failed to initialize ActiveGameService: {e}")
+        return self._table
+
+    @table.setter
+    def table(self, value) -> None:
+        self._table = value
+
+    def reset_connections(self) -> None:
+        """Rebind the table to a fresh client on next use (after fork/restore)"""
+        self._table = None
 
     def save_state(self, state: GameState) -> bool:
         if not self.table:
             return False
             
         try:
-            print(f"[ActiveGameService] Saving state: game_id={state.game_id}, turn={state.turn}, moves={len(state.moves)}")
-            # Serialize GameState to dict
-            item = {
-                'game_id': state.game_id,
-                'game_type': state.game_type,
-                'state': state.state,
-                'turn': state.turn,
-                'over': state.over,
-                'result': state.result,
-                'white_model': state.white_model,
-                'black_model': state.black_model,
-                'white_tokens': state.white_tokens,
-                'black_tokens': state.black_tokens,
-                'moves': [
-                    {
-                        'ply': m.ply,
-                        'side': m.side,
-                        'move_uci': m.move_uci,
-                        'move_san': m.move_san,
-                        'model_name': m.model_name,
-                        'error': m.error,
-                        'from_square': m.from_square,
-                        'to_square': m.to_square,
-                        'captured_piece': m.captured_piece,
-                        'tokens_used': m.tokens_used
-                    }
-                    for m in state.moves
-                ]
-            }
-            
-            # DynamoDB doesn't like floats, ensure numbers are Decimal or int?
-            # Boto3 handles int/float usually, but let's be safe with JSON serialization if needed.
-            # Actually boto3 handles standard types.
-            
-            self.table.put_item(Item=item)
+            logger.debug("Saving state: game_id=%s, turn=%s, moves=%s", state.game_id, state.turn, len(state.moves))
+            self.table.put_item(Item=state_to_item(state))
             return True
         except ClientError as e:
             logger.error(f"Error saving game state {state.game_id}: {e}")
@@ -84,40 +66,89 @@ class ActiveGameService:
             if not item:
                 return None
             
-            print(f"[ActiveGameService] Loading state: game_id={game_id}, turn={item.get('turn')}, moves={len(item.get('moves', []))}")
-                
-            # Deserialize to GameState
-            moves = [
-                MoveRecord(
-                    ply=int(m['ply']),
-                    side=m['side'],
-                    move_uci=m['move_uci'],
-                    move_san=m.get('move_san'),
-                    model_name=m.get('model_name'),
-                    error=m.get('error'),
-                    from_square=m.get('from_square'),
-                    to_square=m.get('to_square'),
-                    captured_piece=m.get('captured_piece'),
-                    tokens_used=int(m.get('tokens_used', 0))
-                )
-                for m in item.get('moves', [])
-            ]
-            
-            return GameState(
-                game_id=item['game_id'],
-                game_type=item['game_type'],
-                state=item['state'],
-                turn=item['turn'],
-                over=item['over'],
-                result=item.get('result', {}),
-                white_model=item.get('white_model'),
-                black_model=item.get('black_model'),
-                white_tokens=int(item.get('white_tokens', 0)),
-                black_tokens=int(item.get('black_tokens', 0)),
-                moves=moves
+            logger.debug(
+                "Loading state: game_id=%s, turn=%s, moves=%s",
+                game_id, item.get('turn'), item.get('move_count', len(item.get('moves', []))),
             )
+            return state_from_item(item)
         except ClientError as e:
             logger.error(f"Error loading game state {game_id}: {e}")
             return None
 
+    def load_attributes(self, game_id: str, attributes: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Read only the given attributes of a game (ProjectionExpression)"""
+        if not self.table:
+            return None
+
+        # Attribute names go through placeholders; several (state, result, over) are reserved words
+        names = {f"#a{i}": name for i, name in enumerate(attributes)}
+        try:
+            response = self.table.get_item(
+                Key={'game_id': game_id},
+                ProjectionExpression=", ".join(names),
+                ExpressionAttributeNames=names,
+            )
+            return response.get('Item')
+        except ClientError as e:
+            logger.error(f"Error loading attributes of game {game_id}: {e}")
+            return None
+
+    def load_header(self, game_id: str) -> Optional[GameHeader]:
+        item = self.load_attributes(game_id, HEADER_ATTRIBUTES)
+        if not item:
+            return None
+        return header_from_item(item)
+
+    def update_header(self, header: GameHeader) -> bool:
+        """Write the header attributes of an existing game; the moves are left untouched"""
+        if not self.table:
+            return False
+
+        fields = ('state', 'turn', 'over', 'result', 'white_tokens', 'black_tokens')
+        values = {f":{f}": getattr(header, f) for f in fields}
+        values[":status"] = game_status(header.over, header.game_id)
+        try:
+            logger.debug("Updating header: game_id=%s, turn=%s, over=%s", header.game_id, header.turn, header.over)
+            self.table.update_item(
+                Key={'game_id': header.game_id},
+                UpdateExpression="SET " + ", ".join(f"#{f} = :{f}" for f in (*fields, "status")),
+                ConditionExpression="attribute_exists(game_id)",
+                ExpressionAttributeNames={f"#{f}": f for f in (*fields, "status")},
+                ExpressionAttributeValues=values,
+            )
+            return True
+        except ClientError as e:
+            logger.error(f"Error updating game header {header.game_id}: {e}")
+            return False
+
+    def query_listing(
+        self,
+        partition: str,
+        limit: int,
+        start_key: Optional[Dict[str, Any]] = None,
+        filter_expression: Any = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """One page of a listing index partition ("ongoing#03"), newest first; returns (items, LastEvaluatedKey)"""
+        if not self.table:
+            return [], None
+        from boto3.dynamodb.conditions import Key
+
+        kwargs: Dict[str, Any] = {
+            'IndexName': LISTING_INDEX,
+            'KeyConditionExpression': Key('status').eq(partition),
+            'ScanIndexForward': False,
+            'Limit': limit,
+        }
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        if filter_expression is not None:
+            kwargs['FilterExpression'] = filter_expression
+        try:
+            response = self.table.query(**kwargs)
+            return response.get('Items', []), response.get('LastEvaluatedKey')
+        except ClientError as e:
+            logger.error(f"Error querying {LISTING_INDEX} ({partition}): {e}")
+            return [], None
+
 active_game_service = ActiveGameService()
+on_restore(active_game_service.reset_connections)
@@ -0,0 +1,344 @@
+"""
+Background archiving of completed games
+
+Request handlers only enqueue a finished game; a worker thread records each
+one with DynamoDBService.add_game_result: one TransactWriteItems that writes
+the history item only if the game isn't recorded yet and increments the
+user's total_games_played with it. A game is therefore counted once even when
+several workers, Lambda instances or a restarted process archive it; a repeat
+only refreshes the history item.
+
+- The queue is bounded. When it is full the record stays in the spool only and
+  is picked up from there once the worker catches up.
+- Throttling, network errors and other transient failures are retried with
+  exponential backoff and jitter. Records that still fail stay in the spool
+  for the next process; an unexpected error never stops the worker.
+- Every record is appended to a local spool file (JSON lines) before it is
+  queued and marked done once written. The spool is best-effort: it lives on
+  the local disk, so it survives a crash or restart of the same host and the
+  next invocation of a warm Lambda container, but not a container that is
+  never reused. The spool is truncated whenever nothing is pending.
+
+Recently archived (email, game_id) pairs are remembered in a small LRU so
+repeat saves from this process skip the request; correctness does not depend
+on it.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from ..core.config import settings
+from ..core.lifecycle import on_restore
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 25  # records taken per spool update
+_RETRYABLE_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "InternalServerError",
+    "ServiceUnavailable",
+    "TransactionConflict",  # another writer is recording the same game
+    "TransactionInProgressException",
+}
+
+RecordKey = Tuple[str, str]
+
+
+def _retryable(error: ClientError) -> bool:
+    code = error.response["Error"]["Code"]
+    if code == "TransactionCanceledException":
+        # Cancelled transactions carry the real cause per item
+        reasons = error.response.get("CancellationReasons") or []
+        return any(r.get("Code") in _RETRYABLE_ERRORS or r.get("Code") == "ThrottlingError" for r in reasons)
+    return code in _RETRYABLE_ERRORS
+
+
+@dataclass(slots=True)
+class ArchiveRecord:
+    email: str
+    game_id: str
+    game_data: Dict[str, Any]
+
+    @property
+    def key(self) -> RecordKey:
+        return (self.email, self.game_id)
+
+
+class ArchiveSpool:
+    """Append-only JSON-lines journal of records not yet written to DynamoDB"""
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[RecordKey, ArchiveRecord]" = OrderedDict()
+        if self.path:
+            self._pending.update((r.key, r) for r in self._read())
+
+    def _read(self) -> Iterable[ArchiveRecord]:
+        if not os.path.exists(self.path):
+            return []
+        pending: "OrderedDict[RecordKey, ArchiveRecord]" = OrderedDict()
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn write at crash time
+                if entry.get("op") == "add":
+                    record = ArchiveRecord(entry["email"], entry["game_id"], entry["game_data"])
+                    pending[record.key] = record
+                elif entry.get("op") == "done":
+                    for email, game_id in entry["keys"]:
+                        pending.pop((email, game_id), None)
+        return list(pending.values())
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+            fh.flush()
+
+    def add(self, record: ArchiveRecord) -> None:
+        with self._lock:
+            self._pending[record.key] = record
+            if self.path:
+                try:
+                    self._append({"op": "add", "email": record.email, "game_id": record.game_id, "game_data": record.game_data})
+                except OSError as e:
+                    logger.warning(f"Archive spool write failed ({self.path}): {e}")
+
+    def done(self, keys: List[RecordKey]) -> None:
+        with self._lock:
+            for key in keys:
+                self._pending.pop(key, None)
+            if not self.path:
+                return
+            try:
+                if self._pending:
+                    self._append({"op": "done", "keys": keys})
+                else:
+                    # Nothing pending: start the journal over
+                    open(self.path, "w").close()
+            except OSError as e:
+                logger.warning(f"Archive spool write failed ({self.path}): {e}")
+
+    def pending(self) -> List[ArchiveRecord]:
+        with self._lock:
+            return list(self._pending.values())
+
+
+class GameArchiveQueue:
+    def __init__(
+        self,
+        db=None,
+        maxsize: Optional[int] = None,
+        spool_path: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        dedupe_size: int = 4096,
+    ) -> None:
+        self._db = db
+        self.maxsize = settings.archive_queue_size if maxsize is None else maxsize
+        self.spool_path = settings.archive_spool_path if spool_path is None else spool_path
+        self.flush_interval = settings.archive_flush_interval if flush_interval is None else flush_interval
+        self.max_retries = settings.archive_max_retries if max_retries is None else max_retries
+        self.dedupe_size = dedupe_size
+
+        self._queue: "queue.Queue[ArchiveRecord]" = queue.Queue(maxsize=self.maxsize)
+        self._spool: Optional[ArchiveSpool] = None
+        self._archived: "OrderedDict[RecordKey, None]" = OrderedDict()
+        self._queued: set = set()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._overflowed = threading.Event()
+        self.stats: Counter = Counter()
+
+    @property
+    def db(self):
+        if self._db is None:
+            from .dynamodb_service import dynamodb_service
+            self._db = dynamodb_service
+        return self._db
+
+    def _ensure_started(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            if self._spool is None:
+                self._spool = ArchiveSpool(self.spool_path)
+                replay = self._spool.pending()
+                if replay:
+                    logger.info(f"Replaying {len(replay)} archived games from {self.spool_path}")
+                    self._overflowed.set()
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="game-archive", daemon=True)
+            self._worker.start()
+
+    def enqueue(self, email: str, game_id: str, game_data: Dict[str, Any]) -> bool:
+        """Queue a finished game for archiving; never blocks. False if it was a recent duplicate."""
+        record = ArchiveRecord(email, str(game_id), game_data)
+        self._ensure_started()
+        with self._lock:
+            if record.key in self._archived or record.key in self._queued:
+                self.stats["duplicates"] += 1
+                return False
+            self._queued.add(record.key)
+        self._spool.add(record)
+        try:
+            self._queue.put_nowait(record)
+            self.stats["enqueued"] += 1
+        except queue.Full:
+            # Kept in the spool; the worker reloads it once the queue drains
+            with self._lock:
+                self._queued.discard(record.key)
+            self.stats["overflowed"] += 1
+            self._overflowed.set()
+            logger.warning(f"Archive queue full; game {game_id} kept in spool")
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._take_batch(timeout=self.flush_interval)
+            if batch:
+                try:
+                    self._flush(batch)
+                except Exception:
+                    logger.exception(f"Archive flush failed; {len(batch)} games kept in {self.spool_path}")
+                finally:
+                    # Whatever happened, these may be enqueued again and flush() must not wait on them
+                    with self._lock:
+                        self._queued.difference_update(record.key for record in batch)
+                    for _ in batch:
+                        self._queue.task_done()
+            elif self._overflowed.is_set():
+                self._reload_spool()
+
+    def _take_batch(self, timeout: float) -> List[ArchiveRecord]:
+        batch: List[ArchiveRecord] = []
+        try:
+            batch.append(self._queue.get(timeout=timeout))
+        except queue.Empty:
+            return batch
+        while len(batch) < BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _reload_spool(self) -> None:
+        self._overflowed.clear()
+        for record in self._spool.pending():
+            with self._lock:
+                if record.key in self._archived or record.key in self._queued:
+                    continue
+                self._queued.add(record.key)
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                with self._lock:
+                    self._queued.discard(record.key)
+                self._overflowed.set()
+                return
+
+    def _flush(self, batch: List[ArchiveRecord]) -> None:
+        # The latest data for a game wins
+        records: "OrderedDict[RecordKey, ArchiveRecord]" = OrderedDict()
+        for record in batch:
+            records[record.key] = record
+
+        written: List[ArchiveRecord] = []
+        failed: List[ArchiveRecord] = []
+        for record in records.values():
+            (written if self._write(record) else failed).append(record)
+
+        with self._lock:
+            for record in written:
+                self._archived[record.key] = None
+                self._archived.move_to_end(record.key)
+            while len(self._archived) > self.dedupe_size:
+                self._archived.popitem(last=False)
+        self._spool.done([r.key for r in written])
+        self.stats["written"] += len(written)
+        if failed:
+            # Still in the spool: retried by the next process that starts the queue
+            self.stats["failed"] += len(failed)
+            logger.error(f"Archive flush left {len(failed)} games unwritten; kept in {self.spool_path}")
+
+    def _write(self, record: ArchiveRecord) -> bool:
+        """Record one game (counted at most once); False if it could not be written"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                if not self.db.add_game_result(record.email, record.game_id, record.game_data):
+                    self.stats["already_recorded"] += 1
+                return True
+            except ClientError as e:
+                if not _retryable(e) or attempt == self.max_retries:
+                    logger.error(f"Archiving game {record.game_id} for {record.email} failed: {e}")
+                    return False
+                self.stats["throttled"] += 1
+            except BotoCoreError as e:
+                # Connection errors and timeouts: nothing was recorded, try again
+                if attempt == self.max_retries:
+                    logger.error(f"Archiving game {record.game_id} for {record.email} failed: {e}")
+                    return False
+                self.stats["network_errors"] += 1
+            except Exception as e:
+                # Tables unavailable or anything unexpected: the record stays pending
+                if attempt == self.max_retries:
+                    logger.error(f"Archiving game {record.game_id} for {record.email} failed: {e}")
+                    return False
+            self.stats["retries"] += 1
+            time.sleep(min(5.0, 0.05 * (2 ** attempt)) * random.uniform(0.5, 1.5))
+        return False
+
+    def reset_after_fork(self) -> None:
+        """
+        Give a forked child its own queue, locks and worker. Records still
+        queued belong to the parent (and its spool); the child starts empty.
+        """
+        self._queue = queue.Queue(maxsize=self.maxsize)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._overflowed = threading.Event()
+        self._queued = set()
+        self._worker = None
+        if self._spool is not None:
+            self._spool._lock = threading.Lock()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until everything queued so far is written (or failed); True if drained in time"""
+        if self._worker is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def close(self, timeout: float = 10.0) -> None:
+        self.flush(timeout)
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.flush_interval + 1)
+            self._worker = None
+
+
+archive_queue = GameArchiveQueue()
+atexit.register(archive_queue.close)
+on_restore(archive_queue.reset_after_fork)
@@ -3,30 +3,21 @@ AWS Cognito Authentication Service
 Handles user signup, login, token verification, and user management
 """
 import os
-import json
-import boto3
-import jwt
-import requests
 from typing import Optional, Dict, Any
 from datetime import datetime
 from botocore.exceptions import ClientError
 import logging
 
+from ..core.aio import AsyncCalls
+from ..core.aws import get_client
 from ..core.config import settings
+from ..core.lifecycle import on_restore
+from .jwks_cache import JWKSCache
+from .token_cache import VerifiedTokenCache
 
 logger = logging.getLogger(__name__)
 
-# Initialize Cognito client
-# Use AWS profile if specified, otherwise use default credentials
-if settings.aws_profile:
-    session = boto3.Session(profile_name=settings.aws_profile)
-    cognito_client = session.client('cognito-idp', region_name=settings.cognito_region)
-else:
-    # Use default credentials (from ~/.aws/credentials or environment variables)
-    cognito_client = boto3.client('cognito-idp', region_name=settings.cognito_region)
-
-
-class CognitoService:
+class CognitoService(AsyncCalls):
     """Service for AWS Cognito authentication operations"""
     
     def __init__(self):
@@ -34,9 +25,23 @@ class CognitoService:
         self.client_id = settings.cognito_client_id
         self.region = settings.cognito_region
         self.domain = settings.cognito_domain
+        self.jwks = JWKSCache(
+            self.get_jwks,
+            ttl=settings.cognito_jwks_ttl,
+            min_refresh_interval=settings.cognito_jwks_min_refresh_interval,
+            snapshot_path=settings.cognito_jwks_snapshot_path,
+        )
+        self.verified = VerifiedTokenCache(settings.cognito_token_cache_size)
+    
+    @property
+    def client(self):
+        """Shared cognito-idp client, created on first use"""
+        return get_client('cognito-idp', region_name=self.region)
         
     def get_jwks(self) -> Dict[str, Any]:
         """Fetch JWKS (JSON Web Key Set) from Cognito"""
+        import requests
+
         jwks_url = f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
         try:
             response = requests.get(jwks_url, timeout=5)
@@ -48,21 +53,22 @@ class CognitoService:
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify and decode JWT token from Cognito"""
+        decoded = self.verified.get(token)
+        if decoded is not None:
+            return decoded
+        if self.verified.is_revoked(token):
+            logger.info("Rejected revoked token")
+            return None
+
+        import jwt
+
         try:
-            # Get JWKS
-            jwks = self.get_jwks()
-            
             # Decode token header to get key ID
             unverified_header = jwt.get_unverified_header(token)
             kid = unverified_header.get('kid')
             
-            # Find the matching key
-            key = None
-            for jwk in jwks.get('keys', []):
-                if jwk.get('kid') == kid:
-                    from jwt.algorithms import RSAAlgorithm
-                    key = RSAAlgorithm.from_jwk(json.dumps(jwk))
-                    break
+            # Find the matching key (cached; fetched only on expiry or key rotation)
+            key = self.jwks.get_key(kid)
             
             if not key:
                 logger.error("No matching key found in JWKS")
@@ -78,6 +84,7 @@ class CognitoService:
                 issuer=issuer
             )
             
+            self.verified.put(token, decoded)
             return decoded
             
         except jwt.ExpiredSignatureError:
@@ -90,6 +97,14 @@ class CognitoService:
             logger.error(f"Token verification failed: {e}")
             return None
     
+    def revoke_token(self, token: str) -> bool:
+        """Stop accepting a token in this process until it expires (logout); False if it was not valid"""
+        decoded = self.verify_token(token)
+        if not decoded:
+            return False
+        self.verified.revoke(token, decoded.get('exp'))
+        return True
+    
     def sign_up(self, email: str, password: str, name: Optional[str] = None) -> Dict[str, Any]:
         """Register a new user in Cognito"""
         try:
@@ -105,7 +120,7 @@ class CognitoService:
             if name:
                 sign_up_params['UserAttributes'].append({'Name': 'name', 'Value': name})
             
-            response = cognito_client.sign_up(**sign_up_params)
+            response = self.client.sign_up(**sign_up_params)
             
             return {
                 'success': True,
@@ -132,7 +147,7 @@ class CognitoService:
     def confirm_sign_up(self, email: str, confirmation_code: str) -> Dict[str, Any]:
         """Confirm user signup with verification code"""
         try:
-            response = cognito_client.confirm_sign_up(
+            response = self.client.confirm_sign_up(
                 ClientId=self.client_id,
                 Username=email,
                 ConfirmationCode=confirmation_code
@@ -156,7 +171,7 @@ class CognitoService:
     def initiate_auth(self, email: str, password: str) -> Dict[str, Any]:
         """Authenticate user and get tokens"""
         try:
-            response = cognito_client.admin_initiate_auth(
+            response = self.client.admin_initiate_auth(
                 UserPoolId=self.user_pool_id,
                 ClientId=self.client_id,
                 AuthFlow='ADMIN_NO_SRP_AUTH',
@@ -189,7 +204,7 @@ class CognitoService:
     def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Get user information using access token"""
         try:
-            response = cognito_client.get_user(AccessToken=access_token)
+            response = self.client.get_user(AccessToken=access_token)
             
             user_attributes = {attr['Name']: attr['Value'] for attr in response.get('UserAttributes', [])}
             
@@ -208,7 +223,7 @@ class CognitoService:
     def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
         """Refresh access token using refresh token"""
         try:
-            response = cognito_client.admin_initiate_auth(
+            response = self.client.admin_initiate_auth(
                 UserPoolId=self.user_pool_id,
                 ClientId=self.client_id,
                 AuthFlow='REFRESH_TOKEN_AUTH',
@@ -239,7 +254,7 @@ class CognitoService:
     def forgot_password(self, email: str) -> Dict[str, Any]:
         """Initiate forgot password flow"""
         try:
-            response = cognito_client.forgot_password(
+            response = self.client.forgot_password(
                 ClientId=self.client_id,
                 Username=email
             )
@@ -262,7 +277,7 @@ class CognitoService:
     def confirm_forgot_password(self, email: str, confirmation_code: str, new_password: str) -> Dict[str, Any]:
         """Confirm password reset"""
         try:
-            response = cognito_client.confirm_forgot_password(
+            response = self.client.confirm_forgot_password(
                 ClientId=self.client_id,
                 Username=email,
                 ConfirmationCode=confirmation_code,
@@ -306,4 +321,6 @@ class CognitoService:
 
 # Global instance
 cognito_service = CognitoService()
+on_restore(cognito_service.jwks.reset_after_fork)
+on_restore(cognito_service.verified.reset_after_fork)
 
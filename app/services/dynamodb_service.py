@@ -1,42 +1,68 @@
-import boto3
 from botocore.exceptions import ClientError
 from datetime import datetime
 import uuid
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+from ..core.aio import AsyncCalls
+from ..core.aws import get_resource
+from ..core.lifecycle import on_restore
 from ..core.config import settings
 
+# Local secondary index of the game history table: a user's games by completion time
+HISTORY_COMPLETED_INDEX = "completed_at-index"
+# Sort value for legacy history entries that never recorded a completion time
+_UNKNOWN_COMPLETED_AT = "1970-01-01T00:00:00.000000Z"
+
 logger = logging.getLogger(__name__)
 
-class DynamoDBService:
+class DynamoDBService(AsyncCalls):
     def __init__(self):
         self.table_name = settings.dynamodb_table_name
+        self.history_table_name = settings.game_history_table_name
         self.region = settings.aws_region
-        
-        # Initialize boto3 client
-        # It will automatically use environment variables or AWS profile
+        self._table = None
+        self._history_table = None
+        # Users whose history_migrated flag has been seen or set; never cleared, the flag only goes one way
+        self._migrated: set = set()
+
+    @property
+    def dynamodb(self):
+        return get_resource('dynamodb')
+
+    def _open(self, name: str):
+        # Tables come from the shared session (app/core/aws.py) on first use
         try:
-            if settings.aws_access_key_id and settings.aws_secret_access_key:
-                self.dynamodb = boto3.resource(
-                    'dynamodb',
-                    region_name=self.region,
-                    aws_access_key_id=settings.aws_access_key_id,
-                    aws_secret_access_key=settings.aws_secret_access_key
-                )
-            else:
-                session_kwargs = {'region_name': self.region}
-                if settings.aws_profile:
-                    session_kwargs['profile_name'] = settings.aws_profile
-                
-                session = boto3.Session(**session_kwargs)
-                self.dynamodb = session.resource('dynamodb')
-                
-            self.table = self.dynamodb.Table(self.table_name)
-            logger.info(f"DynamoDB Service initialized for table: {self.table_name}")
-            
+            table = self.dynamodb.Table(name)
+            logger.info(f"DynamoDB Service initialized for table: {name}")
+            return table
         except Exception as e:
             logger.error(f"Failed to initialize DynamoDB Service: {e}")
-            self.table = None
+            return None
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = self._open(self.table_name)
+        return self._table
+
+    @table.setter
+    def table(self, value) -> None:
+        self._table = value
+
+    @property
+    def history_table(self):
+        if self._history_table is None:
+            self._history_table = self._open(self.history_table_name)
+        return self._history_table
+
+    @history_table.setter
+    def history_table(self, value) -> None:
+        self._history_table = value
+
+    def reset_connections(self) -> None:
+        """Rebind the tables to a fresh client on next use (after fork/restore)"""
+        self._table = None
+        self._history_table = None
 
     def get_user(self, email: str) -> Optional[Dict[str, Any]]:
         """Retrieve user data by email"""
@@ -65,8 +91,8 @@ class DynamoDBService:
             # Try to update existing user first
             self.table.update_item(
                 Key={'email': email},
-                UpdateExpression="SET last_login = :t, game_list = if_not_exists(game_list, :empty_map), total_games_played = if_not_exists(total_games_played, :zero)",
-                ExpressionAttributeValues={':t': timestamp, ':empty_map': {}, ':zero': 0},
+                UpdateExpression="SET last_login = :t, total_games_played = if_not_exists(total_games_played, :zero)",
+                ExpressionAttributeValues={':t': timestamp, ':zero': 0},
                 ConditionExpression="attribute_exists(email)"
             )
             return True
@@ -78,8 +104,9 @@ class DynamoDBService:
                         Item={
                             'email': email,
                             'total_games_played': 0,
-                            'game_list': {},
-                            'last_login': timestamp
+                            'last_login': timestamp,
+                            # New users never had a legacy game_list
+                            'history_migrated': True
                         }
                     )
                     logger.info(f"Created new user in DynamoDB: {email}")
@@ -94,98 +121,157 @@ class DynamoDBService:
     def add_game_result(self, email: str, game_id: str, game_data: Dict[str, Any]) -> bool:
         """
         Add a game result to the user's history.
-        Increments total_games_played and adds to game_list map.
+
+        One TransactWriteItems request writes the history item (only if the game
+        isn't recorded yet) and increments total_games_played on the user item.
+        If the game was already recorded the transaction is cancelled and the
+        history item is refreshed with a plain put, without counting it twice:
+        at most two requests, and safe to repeat from any worker or instance.
+
+        Returns True if the game was counted, False if it was already recorded.
+        Other DynamoDB errors are raised so the caller can retry them, and so is
+        RuntimeError when the tables are not available: nothing was recorded.
         """
-        if not self.table:
-            return False
-            
+        if not self.table or not self.history_table:
+            raise RuntimeError("DynamoDB tables not initialized")
+
+        item = {**game_data, 'email': email, 'game_id': str(game_id)}
+        # The resource's client serializes plain Python values, like Table calls
+        client = self.dynamodb.meta.client
         try:
-            # Ensure game_id is a string
-            game_uuid = str(game_id)
-            
-            # Prepare the update expression
-            # We use a map for game_list where key is the game_uuid
-            update_expr = "SET game_list.#gid = :g, total_games_played = total_games_played + :inc"
-            expr_names = {'#gid': game_uuid}
-            expr_values = {
-                ':g': game_data,
-                ':inc': 1
-            }
-            
-            # Try to add new game and increment counter (only if game doesn't exist)
-            try:
-                self.table.update_item(
-                    Key={'email': email},
-                    UpdateExpression=update_expr,
-                    ExpressionAttributeNames=expr_names,
-                    ExpressionAttributeValues=expr_values,
-                    ConditionExpression="attribute_not_exists(game_list.#gid)"
-                )
-                logger.info(f"Added new game {game_uuid} to user {email}")
-                return True
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
-                    # Game already exists, just update the game data without incrementing counter
-                    logger.info(f"Game {game_uuid} already exists for {email}. Updating without increment.")
-                    self.table.update_item(
-                        Key={'email': email},
-                        UpdateExpression="SET game_list.#gid = :g",
-                        ExpressionAttributeNames=expr_names,
-                        ExpressionAttributeValues={':g': game_data}
-                    )
-                    return True
-                elif e.response['Error']['Code'] == 'ValidationException':
-                    # Likely "The provided expression refers to an attribute that does not exist in the item"
-                    # This means 'game_list' map doesn't exist. Initialize it and retry.
-                    logger.warning(f"ValidationException for {email}, likely missing game_list. Initializing and retrying.")
-                    try:
-                        # First, ensure game_list exists
-                        self.table.update_item(
-                            Key={'email': email},
-                            UpdateExpression="SET game_list = :empty_map, total_games_played = if_not_exists(total_games_played, :zero)",
-                            ExpressionAttributeValues={':empty_map': {}, ':zero': 0},
-                            ConditionExpression="attribute_not_exists(game_list)"
-                        )
-                    except ClientError as init_error:
-                        if init_error.response['Error']['Code'] != 'ConditionalCheckFailedException':
-                            logger.error(f"Failed to initialize game_list for {email}: {init_error}")
-                            return False
-                    
-                    # Retry the original update (new game + increment)
-                    try:
-                        self.table.update_item(
-                            Key={'email': email},
-                            UpdateExpression=update_expr,
-                            ExpressionAttributeNames=expr_names,
-                            ExpressionAttributeValues=expr_values,
-                            ConditionExpression="attribute_not_exists(game_list.#gid)"
-                        )
-                        logger.info(f"Added game {game_uuid} to user {email} (after init)")
-                        return True
-                    except ClientError as retry_error:
-                        if retry_error.response['Error']['Code'] == 'ConditionalCheckFailedException':
-                             # Race condition: game added during init? Just update.
-                            self.table.update_item(
-                                Key={'email': email},
-                                UpdateExpression="SET game_list.#gid = :g",
-                                ExpressionAttributeNames=expr_names,
-                                ExpressionAttributeValues={':g': game_data}
-                            )
-                            return True
-                        logger.error(f"Retry failed for {email}: {retry_error}")
-                        return False
-                else:
-                    raise e
+            client.transact_write_items(
+                TransactItems=[
+                    {
+                        'Put': {
+                            'TableName': self.history_table_name,
+                            'Item': item,
+                            'ConditionExpression': 'attribute_not_exists(game_id)',
+                        }
+                    },
+                    {
+                        # ADD creates the counter (and user item) if missing
+                        'Update': {
+                            'TableName': self.table_name,
+                            'Key': {'email': email},
+                            'UpdateExpression': 'ADD total_games_played :inc',
+                            'ExpressionAttributeValues': {':inc': 1},
+                        }
+                    },
+                ]
+            )
+            logger.info(f"Added new game {game_id} to user {email}")
+            return True
+        except ClientError as e:
+            if not _history_put_condition_failed(e):
+                raise
 
+        # Already recorded: refresh the data, don't count it twice
+        logger.info(f"Game {game_id} already recorded for {email}. Updating without increment.")
+        self.history_table.put_item(Item=item)
+        return False
+
+    def get_game_history(
+        self,
+        email: str,
+        limit: int = 20,
+        start_key: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """One page of a user's games, most recently completed first; returns (items, LastEvaluatedKey)"""
+        if not self.history_table:
+            return [], None
+        from boto3.dynamodb.conditions import Key
+
+        kwargs: Dict[str, Any] = {
+            'IndexName': HISTORY_COMPLETED_INDEX,
+            'KeyConditionExpression': Key('email').eq(email),
+            'ScanIndexForward': False,
+            'Limit': limit,
+        }
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        try:
+            response = self.history_table.query(**kwargs)
+            return response.get('Items', []), response.get('LastEvaluatedKey')
         except ClientError as e:
-            logger.error(f"Error adding game result for {email}: {e}")
-            return False
+            logger.error(f"Error querying game history for {email}: {e}")
+            return [], None
 
-# Global instance
-dynamodb_service = DynamoDBService()
+    def migrate_legacy_game_list(self, email: str) -> int:
+        """
+        Move a user's legacy `game_list` map (history stored on the user item) into
+        the history table, then drop the map. total_games_played already counts
+        these games and is left unchanged. Returns the number of games moved.
+
+        Completion is recorded as `history_migrated` on the user item, in the same
+        write that drops the map. Once a process has seen the flag it skips the
+        user without a request, so the check costs one get_item per user per
+        process instead of one per history page.
+        """
+        if not self.table or not self.history_table or email in self._migrated:
+            return 0
 
+        try:
+            response = self.table.get_item(
+                Key={'email': email}, ProjectionExpression='game_list, history_migrated'
+            )
+        except ClientError as e:
+            logger.error(f"Error reading legacy game_list for {email}: {e}")
+            return 0
+        item = response.get('Item') or {}
+        if item.get('history_migrated'):
+            self._migrated.add(email)
+            return 0
+
+        game_list = item.get('game_list') or {}
+        try:
+            if game_list:
+                with self.history_table.batch_writer(overwrite_by_pkeys=['email', 'game_id']) as batch:
+                    for game_id, game_data in game_list.items():
+                        batch.put_item(Item=_history_item_from_legacy(email, game_id, game_data))
+            # Conditional so a missing user item isn't created just to hold the flag
+            self.table.update_item(
+                Key={'email': email},
+                UpdateExpression="SET history_migrated = :t REMOVE game_list",
+                ExpressionAttributeValues={':t': True},
+                ConditionExpression="attribute_exists(email)",
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                # No user item, so no legacy games; users created later start out flagged
+                self._migrated.add(email)
+                return 0
+            logger.error(f"Error migrating game_list for {email}: {e}")
+            return 0
+        self._migrated.add(email)
+        if game_list:
+            logger.info(f"Migrated {len(game_list)} legacy games for {email}")
+        return len(game_list)
 
 
+def _history_put_condition_failed(error: ClientError) -> bool:
+    """True if a cancelled add_game_result transaction failed only on the history put condition"""
+    if error.response['Error']['Code'] != 'TransactionCanceledException':
+        return False
+    reasons = error.response.get('CancellationReasons') or []
+    return bool(reasons) and reasons[0].get('Code') == 'ConditionalCheckFailed'
 
 
+def _history_item_from_legacy(email: str, game_id: str, game_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize both legacy game_list entry shapes (full and game/p1/p2) to a history item"""
+    item = dict(game_data)
+    if 'game' in item:
+        item.setdefault('game_type', item.pop('game'))
+    if 'p1' in item:
+        item.setdefault('white_model', item.pop('p1'))
+    if 'p2' in item:
+        item.setdefault('black_model', item.pop('p2'))
+    if isinstance(item.get('result'), str):
+        item['result'] = {'result': item['result'], 'winner': item['result']}
+    item.setdefault('completed_at', _UNKNOWN_COMPLETED_AT)
+    item['email'] = email
+    item['game_id'] = str(game_id)
+    return item
 
+# Global instance
+dynamodb_service = DynamoDBService()
+on_restore(dynamodb_service.reset_connections)
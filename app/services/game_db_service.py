@@ -1,13 +1,14 @@
 """Service to save games to DynamoDB"""
-from typing import List, Optional
-from datetime import datetime
+from typing import Optional, Union
 
-from app.services.game_manager import GameState
+from app.services.game_manager import GameHeader, GameState, utc_now_iso
 from app.services.dynamodb_service import dynamodb_service
+from app.services.archive_queue import archive_queue
+from app.services.serialization import decode_cursor, encode_cursor, plain
 import json
 
 
-def save_game_to_db(game_state: GameState, user_id: str = None):
+def save_game_to_db(game_state: Union[GameState, GameHeader], user_id: str = None):
     """Save a completed game to DynamoDB user's game history"""
     if not game_state.over:
         return  # Only save completed games
@@ -21,29 +22,49 @@ def save_game_to_db(game_state: GameState, user_id: str = None):
         'black_model': game_state.black_model,
         'white_tokens': game_state.white_tokens,
         'black_tokens': game_state.black_tokens,
-        'total_moves': len(game_state.moves),
-        'completed_at': datetime.utcnow().isoformat() + "Z"
+        'total_moves': len(game_state.moves) if isinstance(game_state, GameState) else game_state.move_count,
+        # Sort key of the history table's completed_at-index: fixed width so string order is time order
+        'completed_at': utc_now_iso()
     }
     
     # If user_id is provided, save to that user's history
     # Otherwise, we could infer from the models or skip user association
     if user_id:
-        dynamodb_service.add_game_result(user_id, game_state.game_id, game_data)
+        # Written in the background; the request doesn't wait on history persistence
+        archive_queue.enqueue(user_id, game_state.game_id, game_data)
 
 
-def get_user_games(user_id: str) -> List[dict]:
-    """Get all games for a user from DynamoDB"""
-    user_data = dynamodb_service.get_user(user_id)
-    if not user_data:
-        return []
-    
-    game_list = user_data.get('game_list', {})
-    # Convert the map to a list of games
-    games = []
-    for game_id, game_data in game_list.items():
-        game_data['game_id'] = game_id  # Add the ID to the game data
-        games.append(game_data)
-    
-    # Sort by completed_at descending (most recent first)
-    games.sort(key=lambda x: x.get('completed_at', ''), reverse=True)
-    return games
+def _history_summary(item: dict) -> dict:
+    return {
+        "game_id": item["game_id"],
+        "game_type": item.get("game_type", "unknown"),
+        "white_model": item.get("white_model") or "Unknown",
+        "black_model": item.get("black_model") or "Unknown",
+        "moves_count": item.get("total_moves", 0),
+        "over": True,  # All games in history are over
+        "result": item.get("result") or {},
+        "white_tokens": item.get("white_tokens", 0),
+        "black_tokens": item.get("black_tokens", 0),
+        "created_at": item.get("completed_at"),
+    }
+
+
+def get_user_games(user_id: str, limit: int = 20, cursor: Optional[str] = None) -> dict:
+    """
+    One page of a user's finished games, most recent first.
+
+    Returns {"games": [...], "next_cursor": str | None}; pass next_cursor back
+    to get the following page. Raises ValueError for an invalid cursor.
+    """
+    limit = max(1, min(int(limit), 100))
+    start_key = decode_cursor(cursor) if cursor else None
+    if start_key is None:
+        # Users from before the history table still have their games on the user item
+        # (no request once the user is known to be migrated)
+        dynamodb_service.migrate_legacy_game_list(user_id)
+
+    items, last_key = dynamodb_service.get_game_history(user_id, limit, start_key)
+    return {
+        "games": [plain(_history_summary(item)) for item in items],
+        "next_cursor": encode_cursor(last_key) if last_key else None,
+    }
@@ -0,0 +1,265 @@
+"""
+Listing of active games
+
+Pages come from the `status-created_at-index` GSI on the active games table,
+projecting only the summary attributes. Each status (ongoing/over) is spread
+over LISTING_SHARDS partitions ("ongoing#00".."ongoing#07") so per-move writes
+don't all land on one index partition; a page queries every shard of the
+status in parallel and merges them newest first. No scans, so a page costs the
+same at ten games or ten thousand.
+
+Cursors are opaque base64 strings wrapping the status being read and where each
+shard stopped. Listing "all" reads ongoing games first, then finished ones.
+Results are cached for a few seconds per query, so the live games page (polled
+by every open browser) costs one fan-out per cache window per process.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+
+from ..core.config import settings
+from ..core.lifecycle import on_restore
+from .active_game_db import active_game_service
+from .serialization import (
+    LISTING_SHARDS,
+    STATUS_ONGOING,
+    STATUS_OVER,
+    decode_cursor,
+    encode_cursor,
+    listing_partition,
+    plain,
+)
+
+STATUS_ALL = "all"
+STATUSES = (STATUS_ONGOING, STATUS_OVER)
+
+MAX_PAGE_SIZE = 100
+# Index pages read per request when filters discard most items
+MAX_QUERY_PAGES = 5
+
+
+# Where each shard of a status stopped: its last returned key, None once exhausted
+# (shards not in the map start from the top)
+Positions = Dict[int, Optional[Dict[str, Any]]]
+
+
+def _encode_listing_cursor(status: str, positions: Positions) -> str:
+    return encode_cursor({"s": status, "k": {str(shard): key for shard, key in positions.items()}})
+
+
+def _decode_listing_cursor(cursor: str) -> Tuple[str, Positions]:
+    payload = decode_cursor(cursor)
+    status, keys = payload.get("s"), payload.get("k")
+    if status not in STATUSES or not isinstance(keys, dict):
+        raise ValueError("Invalid cursor")
+    try:
+        positions = {int(shard): key for shard, key in keys.items()}
+    except ValueError:
+        raise ValueError("Invalid cursor") from None
+    if any(shard not in range(LISTING_SHARDS) or not (key is None or isinstance(key, dict)) for shard, key in positions.items()):
+        raise ValueError("Invalid cursor")
+    return status, positions
+
+
+def _sort_key(item: Dict[str, Any]) -> Tuple[str, str]:
+    # Index order within a shard: created_at, then the base table key
+    return (item.get("created_at") or "", item["game_id"])
+
+
+def _index_key(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {"game_id": item["game_id"], "status": item["status"], "created_at": item["created_at"]}
+
+
+def _summary(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "game_id": item["game_id"],
+        "game_type": item.get("game_type"),
+        "white_model": item.get("white_model") or "Unknown",
+        "black_model": item.get("black_model") or "Unknown",
+        "moves_count": int(item.get("move_count", 0)),
+        "over": bool(item.get("over")),
+        "result": plain(item.get("result") or {}),
+        "turn": item.get("turn"),
+        "created_at": item.get("created_at"),
+    }
+
+
+def _filter_expression(game_type: Optional[str], model: Optional[str]) -> Any:
+    if not (game_type or model):
+        return None
+    from boto3.dynamodb.conditions import Attr
+
+    condition = None
+    if game_type:
+        condition = Attr("game_type").eq(game_type)
+    if model:
+        by_model = Attr("white_model").eq(model) | Attr("black_model").eq(model)
+        condition = by_model if condition is None else condition & by_model
+    return condition
+
+
+class TTLCache:
+    """Small thread-safe cache with per-entry expiry and an LRU size cap"""
+
+    def __init__(self, ttl: float, max_entries: int = 256) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _shard_executor() -> ThreadPoolExecutor:
+    # Not the storage pool: list_games already runs on it and must not wait on its own workers
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=LISTING_SHARDS, thread_name_prefix="listing")
+    return _executor
+
+
+def _reset_shard_executor() -> None:
+    global _executor
+    _executor = None
+
+
+on_restore(_reset_shard_executor)
+
+
+class GameListingService:
+    def __init__(self, db=active_game_service, cache_ttl: Optional[float] = None) -> None:
+        self.db = db
+        self.cache = TTLCache(settings.games_list_cache_ttl if cache_ttl is None else cache_ttl)
+
+    def list_games(
+        self,
+        status: str = STATUS_ALL,
+        game_type: Optional[str] = None,
+        model: Optional[str] = None,
+        limit: int = 24,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of game summaries: {"games": [...], "next_cursor": str | None}
+
+        Raises ValueError for an unknown status or an invalid cursor.
+        """
+        if status not in (STATUS_ALL, *STATUSES):
+            raise ValueError(f"Unknown status: {status}")
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        cache_key = (status, game_type, model, limit, cursor)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        page = self._read_page(status, game_type, model, limit, cursor)
+        self.cache.set(cache_key, page)
+        return page
+
+    def _read_page(
+        self,
+        status: str,
+        game_type: Optional[str],
+        model: Optional[str],
+        limit: int,
+        cursor: Optional[str],
+    ) -> Dict[str, Any]:
+        statuses = list(STATUSES) if status == STATUS_ALL else [status]
+        positions: Positions = {}
+        if cursor:
+            cursor_status, positions = _decode_listing_cursor(cursor)
+            if cursor_status not in statuses:
+                raise ValueError("Cursor does not match the requested status")
+            statuses = statuses[statuses.index(cursor_status):]
+
+        filter_expression = _filter_expression(game_type, model)
+        games: List[Dict[str, Any]] = []
+        reads = 0
+        while statuses and len(games) < limit and reads < MAX_QUERY_PAGES:
+            items, positions = self._merge_shards(statuses[0], positions, limit - len(games), filter_expression)
+            reads += 1
+            games.extend(_summary(item) for item in items)
+            if all(positions.get(shard, {}) is None for shard in range(LISTING_SHARDS)):
+                statuses.pop(0)
+                positions = {}
+
+        if not statuses:
+            return self._page(games, None, {})
+        # Page full, or read budget spent (sparse filter matches); hand back where to continue
+        return self._page(games, statuses[0], positions)
+
+    def _merge_shards(
+        self, status: str, positions: Positions, limit: int, filter_expression: Any
+    ) -> Tuple[List[Dict[str, Any]], Positions]:
+        """
+        Up to `limit` items of a status, newest first across its shards, and the
+        new shard positions. Only items no unread part of any shard can beat are
+        returned, so pages stay in order even when a filter thins out a shard.
+        """
+        shards = [shard for shard in range(LISTING_SHARDS) if positions.get(shard, {}) is not None]
+
+        def query(shard: int):
+            return self.db.query_listing(listing_partition(status, shard), limit, positions.get(shard), filter_expression)
+
+        results = dict(zip(shards, _shard_executor().map(query, shards)))
+
+        # Unread items of a shard sort below its LastEvaluatedKey
+        horizon = max((_sort_key(last) for _, last in results.values() if last), default=None)
+        candidates = [
+            (shard, item)
+            for shard, (items, _) in results.items()
+            for item in items
+            if horizon is None or _sort_key(item) >= horizon
+        ]
+        candidates.sort(key=lambda c: _sort_key(c[1]), reverse=True)
+        taken = candidates[:limit]
+
+        new_positions = dict(positions)
+        for shard, (items, last_key) in results.items():
+            used = sum(1 for s, _ in taken if s == shard)
+            if used == len(items):
+                new_positions[shard] = last_key  # None: nothing left in this shard
+            elif used:
+                new_positions[shard] = _index_key(items[used - 1])
+        return [item for _, item in taken], new_positions
+
+    @staticmethod
+    def _page(games: List[Dict[str, Any]], status: Optional[str], positions: Positions) -> Dict[str, Any]:
+        next_cursor = None
+        if status is not None:
+            next_cursor = _encode_listing_cursor(status, positions)
+        return {"games": games, "next_cursor": next_cursor}
+
+
+game_listing = GameListingService()
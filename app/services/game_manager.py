@@ -1,21 +1,65 @@
 from __future__ import annotations
 
+import importlib
+import logging
 import uuid
+from datetime import datetime, timezone
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Literal
 
+from ..core.aio import AsyncCalls
+from ..core.lifecycle import on_prepare
 from .base_game import BaseGameEngine
-from .chess_engine import ChessEngine
-from .tic_tac_toe_engine import TicTacToeEngine
-from .rps_engine import RPSEngine
-from .racing_engine import RacingEngine
-from .word_association_engine import WordAssociationEngine
+
+logger = logging.getLogger(__name__)
 
 Side = Literal["white", "black"]
 GameType = Literal["chess", "tic_tac_toe", "rock_paper_scissors", "racing", "word_association_clash"]
 
 
-@dataclass
+# Engine class per game type as "module:Class", imported on first use.
+# Most requests never build an engine, and python-chess alone is a sizeable
+# share of a cold start.
+ENGINES: Dict[str, str] = {
+    "chess": ".chess_engine:ChessEngine",
+    "tic_tac_toe": ".tic_tac_toe_engine:TicTacToeEngine",
+    "rock_paper_scissors": ".rps_engine:RPSEngine",
+    "racing": ".racing_engine:RacingEngine",
+    "word_association_clash": ".word_association_engine:WordAssociationEngine",
+}
+_engine_classes: Dict[str, type] = {}
+
+
+def register_engine(game_type: str, target: str) -> None:
+    """Register (or replace) the engine for a game type, e.g. "my_pkg.engine:MyEngine"."""
+    ENGINES[game_type] = target
+    _engine_classes.pop(game_type, None)
+
+
+def engine_class(game_type: str) -> type:
+    cls = _engine_classes.get(game_type)
+    if cls is None:
+        target = ENGINES.get(game_type)
+        if target is None:
+            raise ValueError(f"Unknown game type: {game_type}")
+        module_name, _, class_name = target.partition(":")
+        cls = getattr(importlib.import_module(module_name, __package__), class_name)
+        _engine_classes[game_type] = cls
+    return cls
+
+
+@on_prepare
+def load_engines() -> None:
+    for game_type in ENGINES:
+        engine_class(game_type)
+
+
+def utc_now_iso() -> str:
+    # Fixed width so timestamps sort lexically (DynamoDB range key)
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+@dataclass(slots=True)
 class MoveRecord:
     ply: int
     side: Side
@@ -29,7 +73,7 @@ class MoveRecord:
     tokens_used: int = 0  # Tokens used for this move
 
 
-@dataclass
+@dataclass(slots=True)
 class GameState:
     game_id: str
     game_type: GameType
@@ -37,32 +81,50 @@ class GameState:
     turn: Side
     over: bool
     result: Dict[str, str]
-    moves: List[MoveRecord] = field(default_factory=list)
+    moves: List[MoveRecord] = field(default_factory=list)  # MoveLog once loaded from storage
     white_model: str | None = None
     black_model: str | None = None
     white_tokens: int = 0  # Total tokens used by white model
     black_tokens: int = 0  # Total tokens used by black model
+    created_at: str | None = None  # ISO-8601 UTC, sort key of the listing index
 
 
-class GameManager:
+@dataclass(slots=True)
+class GameHeader:
+    """Everything about a game except its moves"""
+    game_id: str
+    game_type: GameType
+    state: str
+    turn: Side
+    over: bool
+    result: Dict[str, str]
+    white_model: str | None = None
+    black_model: str | None = None
+    white_tokens: int = 0
+    black_tokens: int = 0
+    move_count: int = 0
+    created_at: str | None = None
+
+
+class GameManager(AsyncCalls):
     def __init__(self) -> None:
         # Stateless manager - no in-memory storage
-        from .active_game_db import active_game_service
-        self.db = active_game_service
+        self._db = None
+
+    @property
+    def db(self):
+        # Resolved on first use: active_game_db imports this module
+        if self._db is None:
+            from .active_game_db import active_game_service
+            self._db = active_game_service
+        return self._db
+
+    @db.setter
+    def db(self, value) -> None:
+        self._db = value
     
     def _create_engine(self, game_type: GameType, initial_state: Optional[str] = None) -> BaseGameEngine:
-        if game_type == "chess":
-            return ChessEngine(initial_state)
-        elif game_type == "tic_tac_toe":
-            return TicTacToeEngine(initial_state)
-        elif game_type == "rock_paper_scissors":
-            return RPSEngine(initial_state)
-        elif game_type == "racing":
-            return RacingEngine(initial_state)
-        elif game_type == "word_association_clash":
-            return WordAssociationEngine(initial_state)
-        else:
-            raise ValueError(f"Unknown game type: {game_type}")
+        return engine_class(game_type)(initial_state)
 
     def create_game(self, game_type: GameType, white_model: Optional[str], black_model: Optional[str], initial_state: Optional[str] = None) -> GameState:
         game_id = uuid.uuid4().hex
@@ -79,6 +141,7 @@ class GameManager:
             result=engine.result(),
             white_model=white_model,
             black_model=black_model,
+            created_at=utc_now_iso(),
         )
         
         # Save to DynamoDB
@@ -97,12 +160,27 @@ class GameManager:
         # let's trust the saved state is accurate.
         return state
 
+    def get_header(self, game_id: str) -> Optional[GameHeader]:
+        # Header attributes only; the moves blob is not read
+        return self.db.load_header(game_id)
+
+    def get_game_type(self, game_id: str) -> Optional[GameType]:
+        item = self.db.load_attributes(game_id, ("game_type",))
+        return item["game_type"] if item else None
+
+    def exists(self, game_id: str) -> bool:
+        return self.db.load_attributes(game_id, ("game_id",)) is not None
+
     def push_move(self, game_id: str, move_str: str, model_name: Optional[str] = None, error: Optional[str] = None, tokens_used: int = 0) -> Optional[GameState]:
-        # Load state
         state = self.db.load_state(game_id)
         if not state:
             return None
-            
+        self.apply_move(state, move_str, model_name=model_name, error=error, tokens_used=tokens_used)
+        self.db.save_state(state)
+        return state
+
+    def apply_move(self, state: GameState, move_str: str, model_name: Optional[str] = None, error: Optional[str] = None, tokens_used: int = 0) -> GameState:
+        """Play move_str on state in memory (push_move loads and saves around it)"""
         # Reconstruct engine
         engine = self._create_engine(state.game_type, state.state)
         
@@ -113,7 +191,7 @@ class GameManager:
         # Let's assume get_state() returns full JSON for complex games.
         
         side: Side = engine.get_turn() if hasattr(engine, 'get_turn') else state.turn
-        print(f"[GameManager] Before move: side={side}, state.turn={state.turn}")
+        logger.debug("Before move: side=%s, state.turn=%s", side, state.turn)
 
         from_square = None
         to_square = None
@@ -172,21 +250,17 @@ class GameManager:
         # Update total token counts
         if side == "white":
             state.white_tokens += tokens_used
-            print(f"[GameManager] Updated White Tokens: {state.white_tokens} (added {tokens_used})")
+            logger.debug("Updated White Tokens: %s (added %s)", state.white_tokens, tokens_used)
         else:
             state.black_tokens += tokens_used
-            print(f"[GameManager] Updated Black Tokens: {state.black_tokens} (added {tokens_used})")
+            logger.debug("Updated Black Tokens: %s (added %s)", state.black_tokens, tokens_used)
         
         # Update state object with new engine state
         state.state = engine.get_state()
         state.turn = engine.get_turn() if hasattr(engine, 'get_turn') else state.turn
-        print(f"[GameManager] After move: state.turn={state.turn}, state.state={state.state}")
+        logger.debug("After move: state.turn=%s, state.state=%s", state.turn, state.state)
         state.over = engine.is_game_over()
         state.result = engine.result()
-        
-        # Save updated state
-        self.db.save_state(state)
-        
         return state
 
     def reset(self, game_id: str, initial_state: Optional[str] = None) -> Optional[GameState]:
@@ -0,0 +1,182 @@
+"""
+Cognito signing keys (JWKS), cached in memory by key id
+
+Verifying a token needs the user pool's public key for the token's `kid`.
+Fetching the JWKS document and parsing the RSA key on every request made
+each verification an outbound HTTPS call; here the parsed keys are kept
+in memory and the document is refetched only when:
+
+- it is older than COGNITO_JWKS_TTL: the stale keys keep being served and the
+  document is refetched on a background thread (stale-while-revalidate), so
+  no verification waits on the network for a key it already has;
+- a token names a `kid` we do not know (Cognito rotated its keys): the only
+  case where the caller waits for the fetch.
+
+Either way at most one fetch is attempted per COGNITO_JWKS_MIN_REFRESH_INTERVAL,
+successful or not, so forged `kid`s cannot turn into a request flood and an
+unreachable Cognito endpoint does not add the fetch timeout to every
+verification. Refetches are single-flight: concurrent callers wait for the one
+fetch in progress instead of starting their own. If a refetch fails the keys
+we already have keep being served, stale, until a later attempt succeeds. The last document is also written to
+COGNITO_JWKS_SNAPSHOT_PATH, so a cold start (new Lambda container, fresh
+worker) begins with the keys instead of a fetch.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+JWKS = Dict[str, Any]
+
+
+class JWKSCache:
+    def __init__(
+        self,
+        fetch: Callable[[], JWKS],
+        ttl: float,
+        min_refresh_interval: float,
+        snapshot_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.fetch = fetch
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.snapshot_path = snapshot_path
+        self.clock = clock
+
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at = 0.0  # when the current keys were fetched (snapshot keeps it)
+        self._attempted_at = float("-inf")  # last fetch attempt, successful or not
+        self._generation = 0
+        self._loaded = False
+        self._revalidating = False  # a background refresh is running
+        self._lock = threading.Lock()  # guards the fields above
+        self._fetch_lock = threading.Lock()  # one fetch at a time
+        self.stats: Counter = Counter()
+
+    def get_key(self, kid: Optional[str]):
+        """Public key object for `kid`, or None if the pool has no such key"""
+        if not self._loaded:
+            self._load_snapshot()
+        now = self.clock()
+        key = self._keys.get(kid)
+        if key is not None and now - self._fetched_at < self.ttl:
+            self.stats["hits"] += 1
+            return key
+
+        if key is not None:
+            # Past the TTL: serve the key we have, refetch without making the caller wait
+            self.stats["stale_hits"] += 1
+            if now - self._attempted_at >= self.min_refresh_interval:
+                self._revalidate()
+            return key
+
+        self.stats["unknown_kid"] += 1
+        if now - self._attempted_at < self.min_refresh_interval:
+            # Fetched (or failed to) moments ago: don't retry the fetch on every verification
+            return None
+        self._refresh()
+        return self._keys.get(kid)
+
+    def _revalidate(self) -> None:
+        """Start a background refresh unless one is already running"""
+        with self._lock:
+            if self._revalidating:
+                return
+            self._revalidating = True
+        threading.Thread(target=self._revalidate_run, name="jwks-refresh", daemon=True).start()
+
+    def _revalidate_run(self) -> None:
+        try:
+            self._refresh()
+        finally:
+            self._revalidating = False
+
+    def _refresh(self) -> None:
+        generation = self._generation
+        with self._fetch_lock:
+            if self._generation != generation:
+                return  # another caller fetched while we waited
+            self._attempted_at = self.clock()
+            try:
+                jwks = self.fetch()
+                keys = self._parse(jwks)
+            except Exception as e:
+                self.stats["fetch_errors"] += 1
+                logger.warning(f"JWKS refresh failed, keeping {len(self._keys)} cached keys: {e}")
+                return
+            self.stats["fetches"] += 1
+            self._install(keys, self._attempted_at)
+            self._save_snapshot(jwks)
+
+    def _install(self, keys: Dict[str, Any], fetched_at: float) -> None:
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = fetched_at
+            self._generation += 1
+            self._loaded = True
+
+    @staticmethod
+    def _parse(jwks: JWKS) -> Dict[str, Any]:
+        from jwt.algorithms import RSAAlgorithm
+
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("kid") and jwk.get("kty") == "RSA":
+                keys[jwk["kid"]] = RSAAlgorithm.from_jwk(jwk)
+        if not keys:
+            raise ValueError("JWKS document has no RSA keys")
+        return keys
+
+    def _load_snapshot(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+        if not self.snapshot_path:
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as fh:
+                snapshot = json.load(fh)
+            keys = self._parse(snapshot["jwks"])
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring JWKS snapshot {self.snapshot_path}: {e}")
+            return
+        # Keep the original fetch time: an old snapshot is refreshed on first use
+        self._install(keys, float(snapshot.get("fetched_at", 0)))
+        self.stats["snapshot_loads"] += 1
+
+    def _save_snapshot(self, jwks: JWKS) -> None:
+        if not self.snapshot_path:
+            return
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({"fetched_at": self._fetched_at, "jwks": jwks}, fh)
+            os.replace(tmp, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"JWKS snapshot write failed ({self.snapshot_path}): {e}")
+
+    def clear(self) -> None:
+        """Forget the in-memory keys (the snapshot is reloaded on next use)"""
+        with self._lock:
+            self._keys = {}
+            self._fetched_at = 0.0
+            self._attempted_at = float("-inf")
+            self._generation += 1
+            self._loaded = False
+
+    def reset_after_fork(self) -> None:
+        """Keys are safe to share; locks a parent thread may have held are not"""
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._revalidating = False  # the parent's refresh thread does not exist here
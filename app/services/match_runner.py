@@ -1,24 +1,38 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import logging
 import random
-from dataclasses import dataclass
-from typing import Dict, Optional
-
-import chess
+from typing import Any, Dict, Optional
 
 from .game_manager import game_manager
-from ..models.base import get_adapter
+from .token_ledger import token_ledger
+from ..models.base import RandomFallbackAdapter, get_adapter
+from ..models.governor import GovernorBusy, governor
+from ..core.aio import run_blocking
 from ..core.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+def is_legal_move(game_type: str, engine, move: str) -> bool:
+    """Whether the engine would accept move (checked before anything is saved)"""
+    if game_type == "chess":
+        # ChessEngine expects UCI
+        return move in engine.legal_moves_uci()
+    return move in engine.legal_moves()
+
 
 class MatchRunner:
-    async def process_turn(self, game_id: str) -> Dict[str, Any]:
+    async def process_turn(self, game_id: str, user: Optional[str] = None) -> Dict[str, Any]:
         """
         Process a single turn for the given game.
+        `user` (email or client IP) is who asked, for per-user LLM quotas.
         Returns a dict with status info.
         """
-        state = game_manager.get_state(game_id)
+        # Header only: the move log is not needed to pick and prompt the model
+        state = await game_manager.aio.get_header(game_id)
         if not state:
             return {"status": "error", "message": "Game not found"}
             
@@ -40,14 +54,28 @@ class MatchRunner:
         token_budget = settings.token_budget_per_match
         if total_tokens >= token_budget:
             # End game due to budget
-            game_manager.push_move(game_id, "0000", model_name="system", error="token budget exceeded")
+            await game_manager.aio.push_move(game_id, "0000", model_name="system", error="token budget exceeded")
             return {"status": "game_over", "message": "Token budget exceeded"}
 
+        # Daily budget of whoever asked for this turn
+        if token_ledger.needs_read(user):
+            budget = await run_blocking(token_ledger.check_budget, user)
+        else:
+            budget = token_ledger.check_budget(user)
+        if not budget.allowed:
+            return {
+                "status": "budget_exceeded",
+                "message": f"Daily token budget used ({budget.used}/{budget.limit})",
+            }
+
         # Initialize adapter
         try:
             adapter = get_adapter(current_model)
         except Exception as e:
             return {"status": "error", "message": f"Failed to load model: {e}"}
+        # Circuit open: random moves need no LLM slot, a substitute model is billed as itself
+        random_fallback = isinstance(adapter, RandomFallbackAdapter) and adapter.fallback_for is not None
+        llm_model = getattr(adapter, "model_uri", current_model)
 
         # Reconstruct engine to check for timeouts/legal moves
         # We need to access the engine to pass to adapter.get_move
@@ -63,12 +91,11 @@ class MatchRunner:
                 engine.register_timeout()
                 # We need to save this state change. 
                 # Since we modified engine directly, we need to manually update state in DB.
-                # GameManager doesn't have a generic "update_from_engine" method exposed.
-                # Let's manually update state object and save.
+                # Only header attributes change, so the moves are left as stored.
                 state.state = engine.get_state()
                 state.over = engine.is_game_over()
                 state.result = engine.result()
-                game_manager.db.save_state(state)
+                await game_manager.db.aio.update_header(state)
                 
                 if state.over:
                      from .game_db_service import save_game_to_db
@@ -81,43 +108,33 @@ class MatchRunner:
         error = None
         tokens_before = adapter.tokens_used
         
-        for _ in range(retry_limit + 1):
-            move_str, err = await adapter.get_move(engine)
-            if move_str is None:
-                error = err or "failed to produce move"
-                await asyncio.sleep(0.1)
-                continue
-            
-            # Validate move by trying to push it (preview)
-            # But push_move in GameManager now saves to DB! We don't want to save invalid moves.
-            # We should validate against engine first.
-            # Engine logic is duplicated in GameManager.push_move.
-            # Let's use engine.legal_moves() to validate if possible, or clone engine.
-            
-            # Simple validation: check if move is legal in engine
-            is_legal = False
-            if state.game_type == "chess":
-                # ChessEngine expects UCI
-                if move_str in engine.legal_moves_uci():
-                    is_legal = True
-            elif state.game_type == "tic_tac_toe":
-                if move_str in engine.legal_moves():
-                    is_legal = True
-            else:
-                # Other games
-                if move_str in engine.legal_moves():
-                    is_legal = True
-            
-            if is_legal:
-                move = move_str
-                break
-            else:
-                error = f"illegal move: {move_str}"
-                await asyncio.sleep(0.1)
+        try:
+            # One provider/model/user slot for the whole turn, retries included
+            slot = contextlib.nullcontext() if random_fallback else governor.slot(llm_model, game_id, user)
+            async with slot:
+                for _ in range(retry_limit + 1):
+                    move_str, err = await adapter.get_move(engine)
+                    if move_str is None:
+                        error = err or "failed to produce move"
+                        await asyncio.sleep(0.1)
+                        continue
+                    
+                    # Validate against the engine first: push_move saves, invalid moves must not reach the DB
+                    is_legal = is_legal_move(state.game_type, engine, move_str)
+                    
+                    if is_legal:
+                        move = move_str
+                        break
+                    else:
+                        error = f"illegal move: {move_str}"
+                        await asyncio.sleep(0.1)
+        except GovernorBusy as e:
+            # Nothing was played; the client asks again on its next poll
+            return {"status": "busy", "message": str(e)}
 
         # Calculate tokens
         tokens_this_move = max(0, adapter.tokens_used - tokens_before)
-        if tokens_this_move == 0 and move is not None:
+        if tokens_this_move == 0 and move is not None and not random_fallback:
              # Fallback token estimation
             if state.game_type == "chess": tokens_this_move = 80
             elif state.game_type == "tic_tac_toe": tokens_this_move = 60
@@ -126,14 +143,15 @@ class MatchRunner:
             elif state.game_type == "word_association_clash": tokens_this_move = 100
             else: tokens_this_move = 50
 
-        print(f"[MatchRunner] Move: {move}, Tokens: {tokens_this_move}")
+        logger.debug("Move: %s, Tokens: %s", move, tokens_this_move)
+        token_ledger.record(user, llm_model, tokens_this_move)
 
         if move:
             # Apply move
-            new_state = game_manager.push_move(
+            new_state = await game_manager.aio.push_move(
                 game_id, 
                 move, 
-                model_name=adapter.model_name, 
+                model_name=f"fallback:{adapter.model_name}" if random_fallback else adapter.model_name,
                 tokens_used=tokens_this_move
             )
             
@@ -141,6 +159,8 @@ class MatchRunner:
                 from .game_db_service import save_game_to_db
                 save_game_to_db(new_state)
                 
+            if random_fallback:
+                return {"status": "fallback", "move": move, "message": f"{current_model} unavailable"}
             return {"status": "success", "move": move}
         else:
             # Handle failure (fallback or abort)
@@ -152,7 +172,7 @@ class MatchRunner:
             legal = engine.legal_moves()
             if legal and len(legal) > 0:
                 fallback_move = random.choice(legal)
-                game_manager.push_move(
+                await game_manager.aio.push_move(
                     game_id, 
                     fallback_move, 
                     model_name=f"fallback:{adapter.model_name}", 
@@ -172,7 +192,7 @@ class MatchRunner:
                     state.state = engine.get_state()
                     state.over = engine.is_game_over()
                     state.result = engine.result()
-                    game_manager.db.save_state(state)
+                    await game_manager.db.aio.update_header(state)
                     
                     if state.over:
                         from .game_db_service import save_game_to_db
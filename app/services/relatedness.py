@@ -0,0 +1,261 @@
+"""
+Relatedness backends for Word Association Clash
+
+The referee asks a backend whether a response is related to the current prompt
+(or to the other answers of the round). Two backends are provided:
+
+- TokenOverlapChecker: the original lexical check (shared non-stopword tokens,
+  short answers pass).
+- EmbeddingRelatednessChecker: cosine similarity over a small local word-vector
+  table. The table is memory-mapped on first use, so nothing is loaded at import
+  and everything runs offline.
+
+Embedding table format (little-endian):
+    8 bytes   magic b"WAEMB\\x00\\x01\\x00"
+    uint32    number of words
+    uint32    vector dimension
+    float32   count * dim values, each vector L2-normalized
+    utf-8     newline-separated vocabulary, same order as the vectors
+
+Use `write_embedding_table` (or `python build_word_embeddings.py src dest`)
+to convert a GloVe/word2vec text file into this format.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import mmap
+import operator
+import re
+import struct
+import sys
+import threading
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = {
+    "the",
+    "and",
+    "or",
+    "of",
+    "in",
+    "to",
+    "a",
+    "an",
+    "for",
+    "with",
+    "by",
+    "on",
+    "from",
+    "at",
+    "over",
+    "about",
+}
+
+_TOKEN_RE = re.compile(r"[a-zA-Z]+")
+
+EMBEDDING_MAGIC = b"WAEMB\x00\x01\x00"
+_HEADER = struct.Struct("<8sII")
+
+Vector = Tuple[float, ...]
+
+
+def token_set(text: str) -> set[str]:
+    return {token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS}
+
+
+class RelatednessChecker:
+    """Base class for relatedness backends"""
+
+    def is_related(self, response: str, prompt: Optional[str], others: Iterable[Optional[str]] = ()) -> bool:
+        raise NotImplementedError
+
+
+class TokenOverlapChecker(RelatednessChecker):
+    """Lexical overlap with the prompt or the other answers of the round"""
+
+    def is_related(self, response: str, prompt: Optional[str], others: Iterable[Optional[str]] = ()) -> bool:
+        response_tokens = token_set(response)
+        if not response_tokens:
+            return False
+
+        if token_set(prompt or "") & response_tokens:
+            return True
+
+        for other in others:
+            if other and token_set(other) & response_tokens:
+                return True
+
+        # Allow short single tokens to pass (e.g., names) to avoid being overly strict
+        return len(response_tokens) <= 2
+
+
+class EmbeddingTable:
+    """Memory-mapped word vectors; the file is opened on first lookup"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.dim = 0
+        self._index: Dict[str, int] = {}
+        self._vectors: Optional[memoryview] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self) -> None:
+        if self._vectors is not None:
+            return
+        with self._lock:
+            if self._vectors is not None:
+                return
+            with open(self.path, "rb") as fh:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, dim = _HEADER.unpack_from(mapped, 0)
+            if magic != EMBEDDING_MAGIC:
+                mapped.close()
+                raise ValueError(f"{self.path} is not a word association embedding table")
+
+            vectors_end = _HEADER.size + count * dim * 4
+            vocab = mapped[vectors_end:].decode("utf-8").split("\n")
+            self._index = {word: i for i, word in enumerate(vocab[:count])}
+            self.dim = dim
+            self._mmap = mapped
+            view = memoryview(mapped)[_HEADER.size:vectors_end]
+            if sys.byteorder == "little":
+                self._vectors = view.cast("f")
+            else:
+                # Vectors are stored little-endian; big-endian hosts need a swapped copy
+                swapped = array("f")
+                swapped.frombytes(view)
+                swapped.byteswap()
+                self._vectors = memoryview(swapped)
+            logger.info(f"Loaded embedding table {self.path} ({count} words, dim={dim})")
+
+    def __contains__(self, word: str) -> bool:
+        self._ensure_loaded()
+        return word in self._index
+
+    def vector(self, word: str) -> Optional[memoryview]:
+        self._ensure_loaded()
+        idx = self._index.get(word)
+        if idx is None:
+            return None
+        start = idx * self.dim
+        return self._vectors[start:start + self.dim]  # type: ignore[index]
+
+
+class EmbeddingRelatednessChecker(RelatednessChecker):
+    """
+    Cosine similarity between the response and the prompt / other answers.
+
+    Phrase vectors are the normalized mean of their token vectors and are kept
+    in an LRU cache, so a check is a handful of short dot products. Responses
+    whose tokens are all out of vocabulary are judged by the lexical fallback.
+    """
+
+    def __init__(
+        self,
+        table: EmbeddingTable,
+        threshold: float = 0.35,
+        cache_size: int = 4096,
+        fallback: Optional[RelatednessChecker] = None,
+    ) -> None:
+        self.table = table
+        self.threshold = threshold
+        self.fallback = fallback or TokenOverlapChecker()
+        self._phrase_vector = lru_cache(maxsize=cache_size)(self._compute_phrase_vector)
+
+    def _compute_phrase_vector(self, text: str) -> Optional[Vector]:
+        vectors = [v for v in (self.table.vector(t) for t in token_set(text)) if v is not None]
+        if not vectors:
+            return None
+        summed = [sum(column) for column in zip(*vectors)]
+        norm = math.sqrt(sum(x * x for x in summed))
+        if norm == 0.0:
+            return None
+        return tuple(x / norm for x in summed)
+
+    @staticmethod
+    def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+        return sum(map(operator.mul, a, b))
+
+    def is_related(self, response: str, prompt: Optional[str], others: Iterable[Optional[str]] = ()) -> bool:
+        response_tokens = token_set(response)
+        if not response_tokens:
+            return False
+
+        # Sharing a word with the prompt is always accepted
+        if token_set(prompt or "") & response_tokens:
+            return True
+
+        response_vec = self._phrase_vector(response)
+        if response_vec is None:
+            return self.fallback.is_related(response, prompt, others)
+
+        for candidate in (prompt, *others):
+            if not candidate:
+                continue
+            candidate_vec = self._phrase_vector(candidate)
+            if candidate_vec is not None and self._cosine(response_vec, candidate_vec) >= self.threshold:
+                return True
+        return False
+
+
+def write_embedding_table(source: Path, dest: Path, limit: Optional[int] = None) -> int:
+    """Convert a GloVe/word2vec text file ("word v1 v2 ...") into the binary table format"""
+    words: list[str] = []
+    rows: list[bytes] = []
+    dim = 0
+    with open(source, "r", encoding="utf-8") as fh:
+        for line in fh:
+            parts = line.rstrip().split(" ")
+            if len(parts) < 3 or not parts[0].isalpha():
+                continue  # skips word2vec headers and punctuation entries
+            values = [float(x) for x in parts[1:]]
+            if dim == 0:
+                dim = len(values)
+            if len(values) != dim:
+                continue
+            norm = math.sqrt(sum(x * x for x in values)) or 1.0
+            words.append(parts[0].lower())
+            rows.append(struct.pack(f"<{dim}f", *(x / norm for x in values)))
+            if limit and len(words) >= limit:
+                break
+
+    with open(dest, "wb") as out:
+        out.write(_HEADER.pack(EMBEDDING_MAGIC, len(words), dim))
+        out.writelines(rows)
+        out.write("\n".join(words).encode("utf-8"))
+    return len(words)
+
+
+_checker: Optional[RelatednessChecker] = None
+
+
+def get_relatedness_checker() -> RelatednessChecker:
+    """Backend selected by settings; the embedding table is only mapped on first check"""
+    global _checker
+    if _checker is None:
+        path = settings.word_embeddings_path
+        if path and Path(path).exists():
+            _checker = EmbeddingRelatednessChecker(
+                EmbeddingTable(Path(path)),
+                threshold=settings.word_similarity_threshold,
+            )
+        else:
+            if path:
+                logger.warning(f"Word embeddings not found at {path}; using token overlap")
+            _checker = TokenOverlapChecker()
+    return _checker
+
+
+def set_relatedness_checker(checker: Optional[RelatednessChecker]) -> None:
+    """Override the backend (None re-reads settings on next use)"""
+    global _checker
+    _checker = checker
+
@@ -13,7 +13,8 @@ class RPSEngine(BaseGameEngine):
         else:
             self.white_choice = None
             self.black_choice = None
-        self.current_player = 'white'  # white goes first, then black
+        # white goes first, then black; a restored state resumes with black once white has chosen
+        self.current_player = 'black' if self.white_choice and not self.black_choice else 'white'
     
     def _parse_state(self, state_str: str) -> tuple[Optional[str], Optional[str]]:
         """Parse state string: format is 'white_choice,black_choice' or 'white_choice' if black hasn't chosen"""
@@ -28,7 +29,7 @@ class RPSEngine(BaseGameEngine):
         else:
             self.white_choice = None
             self.black_choice = None
-        self.current_player = 'white'
+        self.current_player = 'black' if self.white_choice and not self.black_choice else 'white'
     
     def get_state(self) -> str:
         """Return state as 'white_choice,black_choice'"""
@@ -0,0 +1,435 @@
+"""
+Serialization layer for GameState
+
+One place for every GameState conversion:
+- storage: DynamoDB item with header attributes and a single binary `moves_blob`
+- API: JSON bytes for responses, built without pydantic validation
+
+The moves blob is column-oriented (parallel arrays for ply, side, uci, san,
+tokens, ...; mostly-empty columns stored sparse) and compressed with zlib, or
+zstd when `zstandard` is installed and selected. Loaded games keep the blob in
+a MoveLog and only decode it when the moves are actually read.
+
+Optional fast codecs are used when installed: msgpack for the moves blob and
+orjson for responses. Both fall back to the standard library.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import sys
+import zlib
+from collections.abc import MutableSequence
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..core.config import settings
+from .game_manager import GameHeader, GameState, MoveRecord, utc_now_iso
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Positional layout of a move inside the blob; append new fields at the end only
+MOVE_FIELDS = (
+    "ply",
+    "side",
+    "move_uci",
+    "move_san",
+    "model_name",
+    "error",
+    "from_square",
+    "to_square",
+    "captured_piece",
+    "tokens_used",
+)
+
+# First byte of moves_blob identifies the codec
+BLOB_MSGPACK = b"M"  # row-oriented msgpack (uncompressed)
+BLOB_JSON = b"J"  # row-oriented JSON (uncompressed)
+BLOB_COLUMNS_ZLIB = b"C"
+BLOB_COLUMNS_ZSTD = b"Z"
+
+# Listing index (status-created_at-index) partitions: "<status>#<shard>". Every
+# move rewrites the projected turn/move_count, so live games are spread over
+# LISTING_SHARDS partitions instead of one hot "ongoing" partition. Only ever
+# raise the shard count: games keep the shard they were last saved with.
+STATUS_ONGOING = "ongoing"
+STATUS_OVER = "over"
+LISTING_SHARDS = 8
+
+# Columns where fewer than half the moves have a value are stored as index/value lists
+_SPARSE_RATIO = 0.5
+
+# Low-cardinality string columns; decoded values are interned so games share them
+_INTERNED_FIELDS = ("side", "model_name")
+
+
+def move_to_dict(move: MoveRecord) -> Dict[str, Any]:
+    return {name: getattr(move, name) for name in MOVE_FIELDS}
+
+
+def move_from_dict(data: Dict[str, Any]) -> MoveRecord:
+    return MoveRecord(
+        ply=int(data["ply"]),
+        side=data["side"],
+        move_uci=data["move_uci"],
+        move_san=data.get("move_san"),
+        model_name=data.get("model_name"),
+        error=data.get("error"),
+        from_square=data.get("from_square"),
+        to_square=data.get("to_square"),
+        captured_piece=data.get("captured_piece"),
+        tokens_used=int(data.get("tokens_used", 0)),
+    )
+
+
+def _pack(payload: Any) -> bytes:
+    if msgpack is not None:
+        return BLOB_MSGPACK + msgpack.packb(payload, use_bin_type=True)
+    return BLOB_JSON + json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _unpack(data: bytes) -> Any:
+    tag, payload = data[:1], data[1:]
+    if tag == BLOB_MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack is required to decode this moves blob")
+        return msgpack.unpackb(payload, raw=False)
+    if tag == BLOB_JSON:
+        return json.loads(payload)
+    raise ValueError(f"Unknown moves blob format: {tag!r}")
+
+
+Columns = Dict[str, List[Any]]
+
+
+def _columns_of(moves: Iterable[MoveRecord]) -> Columns:
+    moves = list(moves)
+    return {name: [getattr(m, name) for m in moves] for name in MOVE_FIELDS}
+
+
+def _encode_columns(columns: Columns) -> Dict[str, Any]:
+    count = len(columns["ply"])
+    encoded: Dict[str, Any] = {"n": count}
+    for name in MOVE_FIELDS:
+        values = columns[name]
+        present = [(i, v) for i, v in enumerate(values) if v is not None]
+        if len(present) < count * _SPARSE_RATIO:
+            encoded[name] = {"i": [i for i, _ in present], "v": [v for _, v in present]}
+        else:
+            encoded[name] = values
+    return encoded
+
+
+def _decode_columns(encoded: Dict[str, Any]) -> Columns:
+    count = encoded["n"]
+    columns: Columns = {}
+    for name in MOVE_FIELDS:
+        column = encoded.get(name)
+        if isinstance(column, dict):
+            values: List[Any] = [None] * count
+            for i, v in zip(column["i"], column["v"]):
+                values[i] = v
+            column = values
+        elif column is None:
+            column = [None] * count
+        if name in _INTERNED_FIELDS:
+            column = [sys.intern(v) if isinstance(v, str) else v for v in column]
+        columns[name] = column
+    return columns
+
+
+def _compress_columns(columns: Columns, codec: Optional[str] = None) -> bytes:
+    codec = codec or settings.moves_blob_codec
+    packed = _pack(_encode_columns(columns))
+    if codec == "zstd" and zstandard is not None:
+        return BLOB_COLUMNS_ZSTD + zstandard.ZstdCompressor(level=3).compress(packed)
+    if codec == "none":
+        return packed
+    return BLOB_COLUMNS_ZLIB + zlib.compress(packed, 6)
+
+
+def _decompress_columns(blob: Any) -> Columns:
+    # boto3 returns Binary wrappers for B attributes
+    data = bytes(getattr(blob, "value", blob))
+    if not data:
+        return _columns_of([])
+    tag = data[:1]
+    if tag == BLOB_COLUMNS_ZLIB:
+        return _decode_columns(_unpack(zlib.decompress(data[1:])))
+    if tag == BLOB_COLUMNS_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstandard is required to decode this moves blob")
+        return _decode_columns(_unpack(zstandard.ZstdDecompressor().decompress(data[1:])))
+    payload = _unpack(data)
+    if isinstance(payload, dict):
+        return _decode_columns(payload)
+    # Row-oriented blobs written before the columnar format
+    return _columns_of(MoveRecord(*row[:len(MOVE_FIELDS)]) for row in payload)
+
+
+def encode_moves(moves: Iterable[MoveRecord], codec: Optional[str] = None) -> bytes:
+    """Column-oriented, compressed moves blob"""
+    return _compress_columns(_columns_of(moves), codec)
+
+
+def decode_moves(blob: Any) -> List[MoveRecord]:
+    columns = _decompress_columns(blob)
+    return [MoveRecord(*row) for row in zip(*(columns[name] for name in MOVE_FIELDS))]
+
+
+class MoveLog(MutableSequence):
+    """
+    Array-backed moves of a game.
+
+    Moves are kept as parallel columns and MoveRecord objects are only built
+    when a move is read. A log loaded from storage keeps the blob and decodes
+    it on first access: len() is answered from the stored move count, and an
+    untouched log is written back with its original blob, so header-only
+    code paths never decode, build or re-encode moves.
+    """
+
+    __slots__ = ("_blob", "_count", "_columns")
+
+    def __init__(self, blob: Any = None, count: int = 0) -> None:
+        self._blob: Optional[bytes] = bytes(getattr(blob, "value", blob)) if blob is not None else None
+        self._count = count
+        self._columns: Optional[Columns] = None if self._blob else _columns_of([])
+
+    @classmethod
+    def from_moves(cls, moves: Iterable[MoveRecord]) -> "MoveLog":
+        log = cls()
+        log._columns = _columns_of(moves)
+        return log
+
+    @property
+    def materialized(self) -> bool:
+        return self._columns is not None
+
+    def _cols(self) -> Columns:
+        if self._columns is None:
+            self._columns = _decompress_columns(self._blob)
+            self._blob = None  # re-encoded from the columns on save
+        return self._columns
+
+    def _record(self, index: int) -> MoveRecord:
+        columns = self._cols()
+        return MoveRecord(*(columns[name][index] for name in MOVE_FIELDS))
+
+    def to_blob(self) -> bytes:
+        if self._columns is None and self._blob is not None:
+            return self._blob
+        return _compress_columns(self._cols())
+
+    def iter_dicts(self) -> Iterable[Dict[str, Any]]:
+        """Moves as plain dicts, without building MoveRecord objects"""
+        columns = self._cols()
+        for row in zip(*(columns[name] for name in MOVE_FIELDS)):
+            yield dict(zip(MOVE_FIELDS, row))
+
+    def __len__(self) -> int:
+        return self._count if self._columns is None else len(self._cols()["ply"])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self)))]
+        return self._record(index)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            records = list(self)
+            records[index] = value
+            self._columns = _columns_of(records)
+            return
+        for name, column in self._cols().items():
+            column[index] = getattr(value, name)
+
+    def __delitem__(self, index) -> None:
+        for column in self._cols().values():
+            del column[index]
+
+    def insert(self, index: int, value: MoveRecord) -> None:
+        for name, column in self._cols().items():
+            column.insert(index, getattr(value, name))
+
+    def append(self, value: MoveRecord) -> None:
+        for name, column in self._cols().items():
+            column.append(getattr(value, name))
+
+    def clear(self) -> None:
+        self._blob = None
+        self._count = 0
+        self._columns = _columns_of([])
+
+    def __iter__(self):
+        columns = self._cols()
+        for row in zip(*(columns[name] for name in MOVE_FIELDS)):
+            yield MoveRecord(*row)
+
+    def __eq__(self, other: object) -> bool:
+        return list(self) == list(other) if isinstance(other, (list, MoveLog)) else NotImplemented
+
+    def __repr__(self) -> str:
+        if self._columns is None:
+            return f"MoveLog(<{self._count} moves, not decoded>)"
+        return f"MoveLog({list(self)!r})"
+
+
+def listing_partition(status: str, shard: int) -> str:
+    return f"{status}#{shard:02d}"
+
+
+def game_status(over: bool, game_id: str) -> str:
+    """Partition key of the listing index: the game's status in the game's shard"""
+    shard = zlib.crc32(game_id.encode()) % LISTING_SHARDS
+    return listing_partition(STATUS_OVER if over else STATUS_ONGOING, shard)
+
+
+def state_to_item(state: GameState) -> Dict[str, Any]:
+    """GameState -> DynamoDB item"""
+    if state.created_at is None:
+        # Games saved before created_at existed join the listing index on their next save
+        state.created_at = utc_now_iso()
+    return {
+        'game_id': state.game_id,
+        'game_type': state.game_type,
+        'state': state.state,
+        'turn': state.turn,
+        'over': state.over,
+        'result': state.result,
+        'white_model': state.white_model,
+        'black_model': state.black_model,
+        'white_tokens': state.white_tokens,
+        'black_tokens': state.black_tokens,
+        'status': game_status(state.over, state.game_id),
+        'created_at': state.created_at,
+        'move_count': len(state.moves),
+        'moves_blob': state.moves.to_blob() if isinstance(state.moves, MoveLog) else encode_moves(state.moves),
+    }
+
+
+def state_from_item(item: Dict[str, Any]) -> GameState:
+    """DynamoDB item -> GameState (also reads items saved with a plain `moves` list)"""
+    if 'moves_blob' in item:
+        moves = MoveLog(item['moves_blob'], int(item.get('move_count', 0)))
+    else:
+        moves = [move_from_dict(m) for m in item.get('moves', [])]
+
+    return GameState(
+        game_id=item['game_id'],
+        game_type=item['game_type'],
+        state=item['state'],
+        turn=item['turn'],
+        over=item['over'],
+        result=item.get('result', {}),
+        white_model=item.get('white_model'),
+        black_model=item.get('black_model'),
+        white_tokens=int(item.get('white_tokens', 0)),
+        black_tokens=int(item.get('black_tokens', 0)),
+        moves=moves,  # type: ignore[arg-type]
+        created_at=item.get('created_at'),
+    )
+
+
+# Item attributes read by header-only loads (everything but the moves)
+HEADER_ATTRIBUTES = (
+    'game_id',
+    'game_type',
+    'state',
+    'turn',
+    'over',
+    'result',
+    'white_model',
+    'black_model',
+    'white_tokens',
+    'black_tokens',
+    'move_count',
+    'created_at',
+)
+
+
+def header_from_item(item: Dict[str, Any]) -> GameHeader:
+    """DynamoDB item (full or projected) -> GameHeader"""
+    return GameHeader(
+        game_id=item['game_id'],
+        game_type=item['game_type'],
+        state=item['state'],
+        turn=item['turn'],
+        over=item['over'],
+        result=item.get('result', {}),
+        white_model=item.get('white_model'),
+        black_model=item.get('black_model'),
+        white_tokens=int(item.get('white_tokens', 0)),
+        black_tokens=int(item.get('black_tokens', 0)),
+        move_count=int(item.get('move_count', len(item.get('moves', [])))),
+        created_at=item.get('created_at'),
+    )
+
+
+def state_to_dict(state: GameState) -> Dict[str, Any]:
+    """GameState -> response payload (same shape as schemas.GameState)"""
+    return {
+        "game_id": state.game_id,
+        "game_type": state.game_type,
+        "state": state.state,
+        "fen": state.state,  # Keep for backward compatibility
+        "turn": state.turn,
+        "over": state.over,
+        "result": state.result,
+        "moves": list(state.moves.iter_dicts()) if isinstance(state.moves, MoveLog) else [move_to_dict(m) for m in state.moves],
+        "white_model": state.white_model,
+        "black_model": state.black_model,
+        "white_tokens": state.white_tokens,
+        "black_tokens": state.black_tokens,
+    }
+
+
+def dumps(payload: Any) -> bytes:
+    """Fast JSON encoding for API responses"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def state_to_json(state: GameState) -> bytes:
+    return dumps(state_to_dict(state))
+
+
+def plain(value: Any) -> Any:
+    """DynamoDB value -> JSON-friendly value (boto3 returns numbers as Decimal)"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {k: plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [plain(v) for v in value]
+    return value
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Opaque pagination cursor (url-safe base64 JSON, e.g. wrapping a LastEvaluatedKey)"""
+    raw = json.dumps(plain(payload), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Inverse of encode_cursor; raises ValueError for anything that is not a cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
@@ -3,50 +3,60 @@ DynamoDB-backed session store for AWS Lambda deployment
 Provides persistent session storage with automatic expiration
 """
 
+import heapq
 import json
 import time
 import logging
 import secrets
-from typing import Optional, Dict, Any
+import threading
+from collections import Counter, OrderedDict
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from datetime import datetime, timedelta
 
-import boto3
 from botocore.exceptions import ClientError
 
+from ..core.aio import AsyncCalls
+from ..core.aws import get_resource
+from ..core.lifecycle import on_restore
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class DynamoDBSessionStore:
+class DynamoDBSessionStore(AsyncCalls):
     """
     DynamoDB-backed session store with TTL support
     Cheaper than Redis for low-medium traffic applications
     """
     
-    def __init__(self, table_name: str = None):
+    def __init__(self, table_name: str = None, clock: Callable[[], float] = time.time):
         """
         Initialize DynamoDB session store
         
         Args:
             table_name: Name of DynamoDB table for sessions
+            clock: Epoch seconds used for TTLs (benchmarks simulate time)
         """
         self.table_name = table_name or settings.session_table_name
+        self.clock = clock
         
-        # Initialize DynamoDB client
-        if settings.aws_access_key_id and settings.aws_secret_access_key:
-            self.dynamodb = boto3.resource(
-                'dynamodb',
-                region_name=settings.aws_region,
-                aws_access_key_id=settings.aws_access_key_id,
-                aws_secret_access_key=settings.aws_secret_access_key
-            )
-        else:
-            # Use default credentials (IAM role in Lambda)
-            self.dynamodb = boto3.resource('dynamodb', region_name=settings.aws_region)
-        
-        self.table = self.dynamodb.Table(self.table_name)
-        logger.info(f"DynamoDB session store initialized with table: {self.table_name}")
+        # Shared resource (app/core/aws.py); the table is bound on first use
+        self._table = None
+    
+    @property
+    def dynamodb(self):
+        return get_resource('dynamodb')
+    
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = self.dynamodb.Table(self.table_name)
+            logger.info(f"DynamoDB session store initialized with table: {self.table_name}")
+        return self._table
+    
+    def reset_connections(self) -> None:
+        """Rebind the table to a fresh client on next use (after fork/restore)"""
+        self._table = None
     
     def create_session(self, user_data: Dict[str, Any], ttl_seconds: int = 3600) -> str:
         """
@@ -60,7 +70,7 @@ class DynamoDBSessionStore:
             session_id: Generated session ID
         """
         session_id = secrets.token_urlsafe(32)
-        ttl = int(time.time()) + ttl_seconds
+        ttl = int(self.clock()) + ttl_seconds
         
         try:
             self.table.put_item(
@@ -78,6 +88,14 @@ class DynamoDBSessionStore:
             logger.error(f"Failed to create session: {e}")
             raise
     
+    def needs_read(self, session_id: str) -> bool:
+        """True if get_session(session_id) will read DynamoDB (callers may move it off the event loop)"""
+        return True
+
+    def needs_extend(self, session_id: str) -> bool:
+        """Always: without the cache the stored TTL is unknown, so every lookup slides it"""
+        return True
+
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve session data
@@ -89,27 +107,39 @@ class DynamoDBSessionStore:
             User data dict or None if session not found/expired
         """
         try:
-            response = self.table.get_item(Key={'session_id': session_id})
-            
-            if 'Item' not in response:
-                logger.debug(f"Session {session_id[:8]}... not found")
-                return None
-            
-            item = response['Item']
-            
-            # Check if session has expired (belt-and-suspenders with DynamoDB TTL)
-            if int(time.time()) > item.get('ttl', 0):
-                logger.debug(f"Session {session_id[:8]}... expired")
-                self.delete_session(session_id)  # Clean up
-                return None
-            
-            user_data = json.loads(item['user_data'])
-            logger.debug(f"Retrieved session {session_id[:8]}...")
-            return user_data
-        
+            item = self.get_session_item(session_id)
         except ClientError as e:
             logger.error(f"Failed to get session: {e}")
             return None
+        return item['user_data'] if item else None
+    
+    def get_session_item(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve session data with its expiry
+        
+        Returns:
+            {'user_data': ..., 'expires_at': epoch seconds} or None if session not found/expired
+        
+        Raises:
+            ClientError: DynamoDB errors, so callers can tell them from a missing session
+        """
+        response = self.table.get_item(Key={'session_id': session_id})
+        
+        if 'Item' not in response:
+            logger.debug(f"Session {session_id[:8]}... not found")
+            return None
+        
+        item = response['Item']
+        
+        # Check if session has expired (belt-and-suspenders with DynamoDB TTL)
+        if int(self.clock()) > item.get('ttl', 0):
+            logger.debug(f"Session {session_id[:8]}... expired")
+            self.delete_session(session_id)  # Clean up
+            return None
+        
+        user_data = json.loads(item['user_data'])
+        logger.debug(f"Retrieved session {session_id[:8]}...")
+        return {'user_data': user_data, 'expires_at': int(item['ttl'])}
     
     def update_session(self, session_id: str, user_data: Dict[str, Any]) -> bool:
         """
@@ -167,7 +197,7 @@ class DynamoDBSessionStore:
         Returns:
             True if successful, False otherwise
         """
-        new_ttl = int(time.time()) + ttl_seconds
+        new_ttl = int(self.clock()) + ttl_seconds
         
         try:
             self.table.update_item(
@@ -185,56 +215,322 @@ class DynamoDBSessionStore:
             return False
 
 
-class InMemorySessionStore:
+class _Session:
+    __slots__ = ('user_data', 'expires_at', 'size')
+    
+    def __init__(self, user_data: Dict[str, Any], expires_at: float):
+        self.user_data = user_data
+        self.expires_at = expires_at
+        self.size = _approx_size(user_data)
+
+
+def _approx_size(user_data: Dict[str, Any]) -> int:
+    """Rough bytes held by one session: its data serialized, plus per-entry overhead"""
+    return len(json.dumps(user_data, default=str)) + SESSION_OVERHEAD
+
+
+# Session id string, entry object, dict/LRU slot and heap tuple
+SESSION_OVERHEAD = 400
+
+
+class InMemorySessionStore(AsyncCalls):
     """
     In-memory session store for local development
     Falls back to this when DynamoDB is not available/configured
+    
+    Bounded, so a long-running process does not grow with every login:
+    - expirations sit in a min-heap that a background thread sweeps every
+      SESSION_SWEEP_INTERVAL seconds (reads still check expiry themselves);
+    - above SESSION_MAX_ENTRIES the least recently used session is evicted.
     """
     
-    def __init__(self):
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, max_entries: Optional[int] = None, sweep_interval: Optional[float] = None,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = settings.session_max_entries if max_entries is None else max_entries
+        self.sweep_interval = settings.session_sweep_interval if sweep_interval is None else sweep_interval
+        self.clock = clock
+        self.sessions: "OrderedDict[str, _Session]" = OrderedDict()  # least recently used first
+        # (expires_at, session_id); entries left behind by extend/delete are skipped when popped
+        self._expiries: List[Tuple[float, str]] = []
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats: Counter = Counter()
         logger.info("In-memory session store initialized (local development mode)")
     
+    def _ensure_sweeper(self) -> None:
+        # Started on first login rather than at import (no threads before fork/snapshot)
+        if self.sweep_interval <= 0 or (self._sweeper is not None and self._sweeper.is_alive()):
+            return
+        with self._lock:
+            if self._sweeper is not None and self._sweeper.is_alive():
+                return
+            self._stop.clear()
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+            self._sweeper.start()
+    
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            self.sweep()
+    
+    def _remove(self, session_id: str) -> None:
+        session = self.sessions.pop(session_id)
+        self._bytes -= session.size
+    
+    def _schedule(self, session_id: str, expires_at: float) -> None:
+        heapq.heappush(self._expiries, (expires_at, session_id))
+        # Extensions leave stale heap entries behind; rebuild once they dominate
+        if len(self._expiries) > 2 * len(self.sessions) + 64:
+            self._expiries = [(s.expires_at, sid) for sid, s in self.sessions.items()]
+            heapq.heapify(self._expiries)
+    
+    def sweep(self) -> int:
+        """Drop every expired session; returns how many"""
+        now = self.clock()
+        removed = 0
+        with self._lock:
+            while self._expiries and self._expiries[0][0] <= now:
+                expires_at, session_id = heapq.heappop(self._expiries)
+                session = self.sessions.get(session_id)
+                if session is not None and session.expires_at == expires_at:
+                    self._remove(session_id)
+                    removed += 1
+            self.stats['expired'] += removed
+            self.stats['sweeps'] += 1
+        return removed
+    
     def create_session(self, user_data: Dict[str, Any], ttl_seconds: int = 3600) -> str:
         session_id = secrets.token_urlsafe(32)
-        self.sessions[session_id] = {
-            'user_data': user_data,
-            'expires_at': time.time() + ttl_seconds
-        }
+        session = _Session(user_data, self.clock() + ttl_seconds)
+        with self._lock:
+            self.sessions[session_id] = session
+            self._bytes += session.size
+            self._schedule(session_id, session.expires_at)
+            while len(self.sessions) > self.max_entries:
+                self._remove(next(iter(self.sessions)))
+                self.stats['evicted'] += 1
+        self._ensure_sweeper()
         return session_id
     
+    def needs_read(self, session_id: str) -> bool:
+        """Never: sessions live in this process"""
+        return False
+
+    def needs_extend(self, session_id: str) -> bool:
+        """True if the session has less than SESSION_EXTEND_THRESHOLD seconds left"""
+        with self._lock:
+            session = self.sessions.get(session_id)
+        return session is not None and session.expires_at - self.clock() < settings.session_extend_threshold
+
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        if session_id not in self.sessions:
-            return None
-        
-        session = self.sessions[session_id]
-        
-        # Check expiration
-        if time.time() > session['expires_at']:
-            del self.sessions[session_id]
-            return None
-        
-        return session['user_data']
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            
+            # Check expiration
+            if self.clock() > session.expires_at:
+                self._remove(session_id)
+                self.stats['expired'] += 1
+                return None
+            
+            self.sessions.move_to_end(session_id)
+            return session.user_data
     
     def update_session(self, session_id: str, user_data: Dict[str, Any]) -> bool:
-        if session_id not in self.sessions:
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return False
+            
+            self._bytes -= session.size
+            session.user_data = user_data
+            session.size = _approx_size(user_data)
+            self._bytes += session.size
+            self.sessions.move_to_end(session_id)
+            return True
+    
+    def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id in self.sessions:
+                self._remove(session_id)
+                return True
             return False
+    
+    def extend_session(self, session_id: str, ttl_seconds: int = 3600) -> bool:
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return False
+            
+            session.expires_at = self.clock() + ttl_seconds
+            self._schedule(session_id, session.expires_at)
+            self.sessions.move_to_end(session_id)
+            return True
+    
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                'sessions': len(self.sessions),
+                'max_entries': self.max_entries,
+                'heap_entries': len(self._expiries),
+                'approx_bytes': self._bytes,
+            }
+    
+    def reset_after_fork(self) -> None:
+        """Sessions are copied into the child; its lock and sweeper thread are its own"""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper = None
+
+
+class CachedSessionStore(AsyncCalls):
+    """
+    Read-through cache in front of DynamoDBSessionStore
+    
+    Polling clients look up the same session every few seconds. Lookups are
+    answered from a per-process LRU for SESSION_CACHE_TTL seconds, including
+    "no such session" answers (negative caching), so a bad or stale cookie
+    does not cost a read per request either. Writes go through to DynamoDB
+    and update the cached copy. Another worker's update or delete is seen
+    once the cached entry ages out.
+    
+    Sliding expiration is batched: get_current_user only extends a session
+    once needs_extend() says the stored TTL has less than
+    SESSION_EXTEND_THRESHOLD seconds left, instead of on every request, and
+    extend_session skips the write when called earlier than that.
+    """
+    
+    def __init__(
+        self,
+        backend: DynamoDBSessionStore,
+        ttl: Optional[float] = None,
+        maxsize: Optional[int] = None,
+        extend_threshold: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.clock = clock
+        self.ttl = settings.session_cache_ttl if ttl is None else ttl
+        self.maxsize = settings.session_cache_size if maxsize is None else maxsize
+        self.extend_threshold = settings.session_extend_threshold if extend_threshold is None else extend_threshold
+        # session_id -> (cached_at, user_data or None, expires_at)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+    
+    def _lookup(self, session_id: str, now: float):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if now - entry[0] >= self.ttl:
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return entry
+    
+    def _store(self, session_id: str, user_data: Optional[Dict[str, Any]], expires_at: float, now: float) -> None:
+        with self._lock:
+            self._entries[session_id] = (now, user_data, expires_at)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def create_session(self, user_data: Dict[str, Any], ttl_seconds: int = 3600) -> str:
+        now = self.clock()
+        session_id = self.backend.create_session(user_data, ttl_seconds)
+        self._store(session_id, user_data, int(now) + ttl_seconds, now)
+        return session_id
+    
+    def needs_read(self, session_id: str) -> bool:
+        """True if get_session(session_id) will read DynamoDB (not cached, or aged out)"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+        return entry is None or self.clock() - entry[0] >= self.ttl
+
+    def needs_extend(self, session_id: str) -> bool:
+        """True if the cached session has less than SESSION_EXTEND_THRESHOLD seconds left"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+        return entry is not None and entry[1] is not None and entry[2] - self.clock() <= self.extend_threshold
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = self.clock()
+        entry = self._lookup(session_id, now)
+        if entry is not None:
+            _, user_data, expires_at = entry
+            self.stats['reads_avoided'] += 1
+            if user_data is None or now > expires_at:
+                self.stats['negative_hits'] += 1
+                return None
+            self.stats['hits'] += 1
+            return dict(user_data)
         
-        self.sessions[session_id]['user_data'] = user_data
-        return True
+        self.stats['reads'] += 1
+        try:
+            item = self.backend.get_session_item(session_id)
+        except ClientError as e:
+            # Not cached: DynamoDB trouble is not evidence the session is gone
+            logger.error(f"Failed to get session: {e}")
+            return None
+        if item is None:
+            self._store(session_id, None, 0, now)
+            return None
+        self._store(session_id, item['user_data'], item['expires_at'], now)
+        return dict(item['user_data'])
+    
+    def update_session(self, session_id: str, user_data: Dict[str, Any]) -> bool:
+        ok = self.backend.update_session(session_id, user_data)
+        with self._lock:
+            entry = self._entries.get(session_id)
+        if ok and entry is not None and entry[1] is not None:
+            self._store(session_id, user_data, entry[2], self.clock())
+        else:
+            self.invalidate(session_id)
+        return ok
     
     def delete_session(self, session_id: str) -> bool:
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
+        ok = self.backend.delete_session(session_id)
+        if ok:
+            self._store(session_id, None, 0, self.clock())
+        else:
+            self.invalidate(session_id)
+        return ok
     
     def extend_session(self, session_id: str, ttl_seconds: int = 3600) -> bool:
-        if session_id not in self.sessions:
-            return False
-        
-        self.sessions[session_id]['expires_at'] = time.time() + ttl_seconds
-        return True
+        now = self.clock()
+        entry = self._lookup(session_id, now)
+        if entry is not None and entry[1] is not None and entry[2] - now > self.extend_threshold:
+            # Stored TTL is still far off: the next extension past the threshold writes it
+            self.stats['extends_skipped'] += 1
+            return True
+        ok = self.backend.extend_session(session_id, ttl_seconds)
+        self.stats['extends_written'] += 1
+        if ok and entry is not None and entry[1] is not None:
+            self._store(session_id, entry[1], int(now) + ttl_seconds, now)
+        return ok
+    
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+    
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.stats['reads_avoided'] + self.stats['reads']
+        return {
+            **self.stats,
+            'size': size,
+            'hit_rate': round(self.stats['reads_avoided'] / lookups, 4) if lookups else 0.0,
+        }
+    
+    def reset_connections(self) -> None:
+        """Fresh lock and client after fork/restore; the cached sessions stay valid"""
+        self._lock = threading.Lock()
+        self.backend.reset_connections()
 
 
 # Global session store instance
@@ -244,10 +540,17 @@ def get_session_store():
     Get the appropriate session store based on deployment mode
     """
     if settings.use_dynamodb_sessions and not settings.is_local:
-        return DynamoDBSessionStore()
+        store = DynamoDBSessionStore()
+        if settings.session_cache_ttl > 0:
+            return CachedSessionStore(store)
+        return store
     else:
         return InMemorySessionStore()
 
 
 # Singleton instance
 session_store = get_session_store()
+if isinstance(session_store, (DynamoDBSessionStore, CachedSessionStore)):
+    on_restore(session_store.reset_connections)
+else:
+    on_restore(session_store.reset_after_fork)
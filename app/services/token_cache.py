@@ -0,0 +1,122 @@
+"""
+Verified Cognito tokens, cached until they expire
+
+A polling page sends the same access token every few seconds, and each
+verification repeats the RS256 signature check. Once a token has verified,
+its decoded claims are kept in a bounded LRU keyed by the token's SHA-256
+(the token itself is never stored) until the token's `exp`.
+
+Logout revokes the token: it is dropped from the cache and its hash is
+remembered until `exp`, so the still-validly-signed token is rejected by
+this process instead of being verified again. Revocation is per process;
+other workers stop accepting the token when it expires.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Claims = Dict[str, Any]
+
+# Longest Cognito access/ID token validity, for tokens without `exp`
+MAX_TOKEN_LIFETIME = 86400
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time.time) -> None:
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Claims]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}  # hash -> exp
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    def get(self, token: str) -> Optional[Claims]:
+        """Claims of a token verified earlier and not yet expired, else None"""
+        if self.maxsize <= 0:
+            return None
+        key = token_key(token)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            exp, claims = entry
+            if now >= exp:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return claims
+
+    def put(self, token: str, claims: Claims) -> None:
+        """Remember a token that just verified; tokens without `exp` are not cached"""
+        exp = claims.get("exp")
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = token_key(token)
+        with self._lock:
+            if key in self._revoked:
+                return
+            self._entries[key] = (float(exp), claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def revoke(self, token: str, exp: Optional[float] = None) -> None:
+        """Forget a verified token and refuse it until `exp` (call on logout)"""
+        key = token_key(token)
+        now = self.clock()
+        if exp is None:
+            exp = now + MAX_TOKEN_LIFETIME
+        with self._lock:
+            self._entries.pop(key, None)
+            # Only verified tokens get here, so this holds at most the logouts
+            # of the last token lifetime
+            for revoked, revoked_exp in list(self._revoked.items()):
+                if now >= revoked_exp:
+                    del self._revoked[revoked]
+            if now < exp:
+                self._revoked[key] = float(exp)
+            self.stats["revoked"] += 1
+
+    def is_revoked(self, token: str) -> bool:
+        key = token_key(token)
+        with self._lock:
+            exp = self._revoked.get(key)
+            if exp is None:
+                return False
+            if self.clock() >= exp:
+                del self._revoked[key]
+                return False
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            size, revoked = len(self._entries), len(self._revoked)
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": size,
+            "maxsize": self.maxsize,
+            "revoked_tracked": revoked,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    def reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
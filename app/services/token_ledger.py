@@ -0,0 +1,343 @@
+"""
+Token usage ledger
+
+Every LLM turn records the tokens it used against three dimensions, per UTC
+day: the user who asked for the turn (email or client IP), the model URI and
+the provider. Recording only bumps in-memory counters; a background thread
+adds them to the store every TOKEN_LEDGER_FLUSH_INTERVAL seconds, one write
+per (dimension, day, name) however many turns contributed to it.
+
+Storage (TOKEN_LEDGER_BACKEND):
+
+- memory:   this process only (local development)
+- dynamodb: TOKEN_USAGE_TABLE_NAME, pk "<dimension>#<day>", sk the name,
+            atomic ADD on `tokens` and `calls`, expired by TTL on `ttl`
+
+so "tokens by model this week" is seven Query calls, not a scan of games.
+
+Daily budgets: process_turn asks check_budget(user) before any LLM call.
+The user's total for today is read from the store at most every
+TOKEN_LEDGER_BUDGET_REFRESH seconds and topped up with this process's
+unsent usage, so other workers' usage shows up within that delay. If the
+store is unreachable turns are let through (fail open).
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+from ..core.aio import AsyncCalls
+from ..core.config import settings
+from ..core.lifecycle import on_restore
+from ..models.base import parse_model_uri
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ("user", "model", "provider")
+RETENTION_DAYS = 90
+
+UsageKey = Tuple[str, str, str]  # (dimension, day, name)
+
+
+def day_of(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+# --- Usage stores ------------------------------------------------------------
+# add() applies {key: (tokens, calls)} increments and returns the new token
+# totals; get() reads one total; totals() reads every name of a dimension/day.
+
+
+class MemoryUsageStore:
+    def __init__(self) -> None:
+        self._usage: Dict[UsageKey, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, increments: Dict[UsageKey, Tuple[int, int]]) -> Dict[UsageKey, int]:
+        totals = {}
+        with self._lock:
+            for key, (tokens, calls) in increments.items():
+                old_tokens, old_calls = self._usage.get(key, (0, 0))
+                self._usage[key] = (old_tokens + tokens, old_calls + calls)
+                totals[key] = old_tokens + tokens
+        return totals
+
+    def get(self, dimension: str, day: str, name: str) -> int:
+        with self._lock:
+            return self._usage.get((dimension, day, name), (0, 0))[0]
+
+    def totals(self, dimension: str, day: str) -> Dict[str, int]:
+        with self._lock:
+            return {k[2]: v[0] for k, v in self._usage.items() if k[0] == dimension and k[1] == day}
+
+
+class DynamoDBUsageStore:
+    def __init__(self, table=None, table_name: Optional[str] = None) -> None:
+        self._table = table
+        self.table_name = table_name or settings.token_usage_table_name
+
+    @property
+    def table(self):
+        if self._table is None:
+            from ..core.aws import get_resource
+
+            self._table = get_resource("dynamodb").Table(self.table_name)
+        return self._table
+
+    def add(self, increments: Dict[UsageKey, Tuple[int, int]]) -> Dict[UsageKey, int]:
+        # No batch ADD in DynamoDB: one UpdateItem per aggregated key
+        expires = int(time.time()) + RETENTION_DAYS * 86400
+        totals = {}
+        for (dimension, day, name), (tokens, calls) in increments.items():
+            response = self.table.update_item(
+                Key={"pk": f"{dimension}#{day}", "sk": name},
+                UpdateExpression="ADD tokens :t, calls :c SET #ttl = if_not_exists(#ttl, :ttl)",
+                ExpressionAttributeNames={"#ttl": "ttl"},
+                ExpressionAttributeValues={":t": tokens, ":c": calls, ":ttl": expires},
+                ReturnValues="UPDATED_NEW",
+            )
+            totals[(dimension, day, name)] = int(response["Attributes"]["tokens"])
+        return totals
+
+    def get(self, dimension: str, day: str, name: str) -> int:
+        response = self.table.get_item(Key={"pk": f"{dimension}#{day}", "sk": name}, ProjectionExpression="tokens")
+        return int(response.get("Item", {}).get("tokens", 0))
+
+    def totals(self, dimension: str, day: str) -> Dict[str, int]:
+        from boto3.dynamodb.conditions import Key
+
+        totals: Dict[str, int] = {}
+        kwargs = {
+            "KeyConditionExpression": Key("pk").eq(f"{dimension}#{day}"),
+            "ProjectionExpression": "sk, tokens",
+        }
+        while True:
+            response = self.table.query(**kwargs)
+            for item in response.get("Items", []):
+                totals[item["sk"]] = int(item.get("tokens", 0))
+            if "LastEvaluatedKey" not in response:
+                return totals
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def reset_connections(self) -> None:
+        self._table = None
+
+
+def get_usage_store(backend: Optional[str] = None):
+    backend = (backend or settings.token_ledger_backend).lower()
+    if backend == "dynamodb":
+        return DynamoDBUsageStore()
+    if backend != "memory":
+        logger.warning(f"Unknown TOKEN_LEDGER_BACKEND {backend!r}; using memory")
+    return MemoryUsageStore()
+
+
+# --- Ledger ------------------------------------------------------------------
+
+
+@dataclass
+class BudgetCheck:
+    allowed: bool
+    used: int  # tokens today, as far as this process knows
+    limit: int  # 0: no budget
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.limit <= 0 else max(0, self.limit - self.used)
+
+
+class TokenLedger(AsyncCalls):
+    def __init__(
+        self,
+        store=None,
+        daily_budget: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        budget_refresh: Optional[float] = None,
+        max_users: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._store = store
+        self.daily_budget = settings.token_budget_per_user_day if daily_budget is None else daily_budget
+        self.flush_interval = settings.token_ledger_flush_interval if flush_interval is None else flush_interval
+        self.budget_refresh = settings.token_ledger_budget_refresh if budget_refresh is None else budget_refresh
+        self.max_users = max_users
+        self.clock = clock
+        self._pending: Dict[UsageKey, Tuple[int, int]] = {}
+        self._in_flight: Counter = Counter()  # user tokens taken by a running flush
+        # (day, user) -> (store total when last read or written, read at)
+        self._known: "OrderedDict[Tuple[str, str], Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats: Counter = Counter()
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_usage_store()
+        return self._store
+
+    def _ensure_started(self) -> None:
+        if self.flush_interval <= 0 or (self._worker is not None and self._worker.is_alive()):
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="token-ledger", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def record(self, user: Optional[str], model_uri: str, tokens: int) -> None:
+        """Count `tokens` used by one LLM turn; never blocks on storage"""
+        if tokens <= 0:
+            return
+        day = day_of(self.clock())
+        provider, _ = parse_model_uri(model_uri)
+        names = {"user": user, "model": model_uri, "provider": provider}
+        with self._lock:
+            for dimension in DIMENSIONS:
+                if not names[dimension]:
+                    continue
+                key = (dimension, day, names[dimension])
+                old_tokens, old_calls = self._pending.get(key, (0, 0))
+                self._pending[key] = (old_tokens + tokens, old_calls + 1)
+            self.stats["recorded"] += 1
+            self.stats["tokens"] += tokens
+        if self.flush_interval > 0:
+            self._ensure_started()
+        else:
+            self.flush()
+
+    def flush(self) -> None:
+        """Add every pending count to the store"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                for (dimension, day, name), (tokens, _) in batch.items():
+                    if dimension == "user":
+                        self._in_flight[(day, name)] += tokens
+            try:
+                totals = self.store.add(batch)
+            except Exception as e:
+                # Keep the counts for the next flush. A partly applied batch
+                # is counted twice rather than lost.
+                with self._lock:
+                    for key, (tokens, calls) in batch.items():
+                        old_tokens, old_calls = self._pending.get(key, (0, 0))
+                        self._pending[key] = (old_tokens + tokens, old_calls + calls)
+                    self._in_flight.clear()
+                    self.stats["flush_errors"] += 1
+                logger.warning(f"Token ledger flush failed, will retry: {e}")
+                return
+            now = self.clock()
+            with self._lock:
+                for (dimension, day, name), total in totals.items():
+                    if dimension == "user":
+                        self._remember(day, name, total, now)
+                self._in_flight.clear()
+                self.stats["flushes"] += 1
+                self.stats["writes"] += len(batch)
+
+    def _remember(self, day: str, user: str, total: int, now: float) -> None:
+        self._known[(day, user)] = (total, now)
+        self._known.move_to_end((day, user))
+        while len(self._known) > self.max_users:
+            self._known.popitem(last=False)
+
+    def _unsent(self, day: str, user: str) -> int:
+        return self._pending.get(("user", day, user), (0, 0))[0] + self._in_flight[(day, user)]
+
+    def used_today(self, user: str) -> int:
+        """Tokens `user` used today: the store total (read at most every budget_refresh seconds) plus unsent usage"""
+        now = self.clock()
+        day = day_of(now)
+        with self._lock:
+            known = self._known.get((day, user))
+        if known is None or now - known[1] >= self.budget_refresh:
+            try:
+                total = self.store.get("user", day, user)
+            except Exception as e:
+                logger.warning(f"Token ledger unavailable, checking budget locally: {e}")
+                total = known[0] if known else 0
+            with self._lock:
+                self._remember(day, user, total, now)
+                self.stats["budget_reads"] += 1
+            known = (total, now)
+        with self._lock:
+            return known[0] + self._unsent(day, user)
+
+    def check_budget(self, user: Optional[str]) -> BudgetCheck:
+        """Whether `user` may start another LLM turn today"""
+        if not user or self.daily_budget <= 0:
+            return BudgetCheck(True, 0, 0)
+        used = self.used_today(user)
+        allowed = used < self.daily_budget
+        if not allowed:
+            self.stats["over_budget"] += 1
+        return BudgetCheck(allowed, used, self.daily_budget)
+
+    def needs_read(self, user: Optional[str]) -> bool:
+        """True if check_budget(user) will read the store (callers may move it off the event loop)"""
+        if not user or self.daily_budget <= 0 or isinstance(self.store, MemoryUsageStore):
+            return False
+        now = self.clock()
+        with self._lock:
+            known = self._known.get((day_of(now), user))
+        return known is None or now - known[1] >= self.budget_refresh
+
+    def usage(self, dimension: str, days: int = 7) -> Dict[str, int]:
+        """Tokens per name of `dimension` over the last `days` UTC days, today included"""
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension {dimension!r}")
+        today = datetime.fromtimestamp(self.clock(), tz=timezone.utc).date()
+        wanted = {(today - timedelta(days=n)).strftime("%Y-%m-%d") for n in range(days)}
+        totals: Counter = Counter()
+        for day in wanted:
+            totals.update(self.store.totals(dimension, day))
+        with self._lock:
+            for (dim, day, name), (tokens, _) in self._pending.items():
+                if dim == dimension and day in wanted:
+                    totals[name] += tokens
+        return dict(totals.most_common())
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "pending_keys": len(self._pending), "known_users": len(self._known)}
+
+    def reset_after_fork(self) -> None:
+        """Unsent counts were the parent's to flush; the child starts clean"""
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pending = {}
+        self._in_flight = Counter()
+        self._known = OrderedDict()
+        self._worker = None
+        reset = getattr(self._store, "reset_connections", None)
+        if reset is not None:
+            reset()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.flush_interval + 1)
+            self._worker = None
+        self.flush()
+
+
+token_ledger = TokenLedger()
+atexit.register(token_ledger.close)
+on_restore(token_ledger.reset_after_fork)
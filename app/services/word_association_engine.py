@@ -4,28 +4,23 @@ import json
 import random
 import re
 import time
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from .base_game import BaseGameEngine
+from .relatedness import RelatednessChecker, get_relatedness_checker
 
-STOPWORDS = {
-    "the",
-    "and",
-    "or",
-    "of",
-    "in",
-    "to",
-    "a",
-    "an",
-    "for",
-    "with",
-    "by",
-    "on",
-    "from",
-    "at",
-    "over",
-    "about",
-}
+try:
+    import msgpack
+except ImportError:  # optional: packed states fall back to compact JSON bytes
+    msgpack = None
+
+# Leading byte of a msgpack-packed state; JSON states always start with "{"
+PACKED_STATE_MARKER = b"\x01"
+
+# Rounds of history (and of the repeat check) kept in the state. Twice
+# MAX_ROUNDS, so regular games keep all of it; longer games keep the most
+# recent rounds and their state stops growing there.
+HISTORY_WINDOW = 24
 
 
 def _normalize_text(text: str) -> str:
@@ -33,9 +28,24 @@ def _normalize_text(text: str) -> str:
     return " ".join(tokens)
 
 
-def _token_set(text: str) -> set[str]:
-    tokens = {token for token in re.findall(r"[a-zA-Z]+", text.lower()) if token not in STOPWORDS}
-    return tokens
+def pack_state(data: Dict[str, Any]) -> bytes:
+    """Binary encoding of an engine state dict (msgpack when installed)"""
+    if msgpack is not None:
+        return PACKED_STATE_MARKER + msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def unpack_state(state: Union[str, bytes, Dict[str, Any]]) -> Dict[str, Any]:
+    """Decode a state produced by get_state() or pack_state()"""
+    if isinstance(state, dict):
+        return state
+    if isinstance(state, (bytes, bytearray)):
+        if state[:1] == PACKED_STATE_MARKER:
+            if msgpack is None:
+                raise ValueError("msgpack is required to load a packed word association state")
+            return msgpack.unpackb(state[1:], raw=False)
+        state = state.decode("utf-8")
+    return json.loads(state)
 
 
 class WordAssociationEngine(BaseGameEngine):
@@ -58,7 +68,8 @@ class WordAssociationEngine(BaseGameEngine):
     TURN_TIMEOUT = 30.0  # seconds - increased for LLM response time
     MAX_RETRIES = 2
 
-    def __init__(self, initial_state: Optional[str] = None) -> None:
+    def __init__(self, initial_state: Optional[Union[str, bytes]] = None, relatedness: Optional[RelatednessChecker] = None) -> None:
+        self.relatedness = relatedness or get_relatedness_checker()
         self._prompts: List[str] = []
         self.current_round: int = 0
         self.current_prompt: Optional[str] = None
@@ -76,38 +87,31 @@ class WordAssociationEngine(BaseGameEngine):
 
         if initial_state:
             # Check if initial_state is a JSON string with custom prompts or a game state
-            try:
-                data = json.loads(initial_state)
-                # If it has custom_prompts, use them; otherwise load as game state
-                if "custom_prompts" in data:
-                    self._prompts = data["custom_prompts"]
-                    self.MAX_ROUNDS = min(len(self._prompts), self.MAX_ROUNDS)
-                    self.reset()
-                else:
-                    self._load_state(initial_state)
-            except (json.JSONDecodeError, TypeError):
-                # Not JSON, treat as game state string or use defaults
-                self._load_state(initial_state) if initial_state else self.reset()
+            # Parse once: custom prompts start a new game, anything else is a saved state
+            data = unpack_state(initial_state)
+            if "custom_prompts" in data:
+                self._prompts = data["custom_prompts"]
+                self.MAX_ROUNDS = min(len(self._prompts), self.MAX_ROUNDS)
+                self.reset()
+            else:
+                self._load_state(data)
         else:
             self.reset()
 
-    def reset(self, initial_state: Optional[str] = None) -> None:
+    def reset(self, initial_state: Optional[Union[str, bytes]] = None) -> None:
         if initial_state:
-            try:
-                data = json.loads(initial_state)
-                if "custom_prompts" in data:
-                    self._prompts = data["custom_prompts"]
-                    self.MAX_ROUNDS = min(len(self._prompts), self.MAX_ROUNDS)
-                else:
-                    self._load_state(initial_state)
-                    return
-            except (json.JSONDecodeError, TypeError):
-                self._load_state(initial_state)
+            data = unpack_state(initial_state)
+            if "custom_prompts" in data:
+                self._prompts = data["custom_prompts"]
+                self.MAX_ROUNDS = min(len(self._prompts), self.MAX_ROUNDS)
+            else:
+                self._load_state(data)
                 return
 
         # Use default prompts if no custom prompts provided
         if not self._prompts:
             self._prompts = random.sample(self.PROMPTS, k=len(self.PROMPTS))
+        del self._prompts[self.MAX_ROUNDS:]  # never played, so not worth saving on every move
         
         self.current_round = 0
         self.history = []
@@ -130,7 +134,7 @@ class WordAssociationEngine(BaseGameEngine):
 
         self.current_round += 1
         self.current_prompt = self._prompts.pop(0)
-        self.history.append(
+        self._append_entry(
             {
                 "round": self.current_round,
                 "prompt": self.current_prompt,
@@ -145,6 +149,16 @@ class WordAssociationEngine(BaseGameEngine):
         self.turn = "white"
         self._refresh_deadline()
 
+    def _append_entry(self, entry: Dict[str, Optional[str]]) -> None:
+        self.history.append(entry)
+        if len(self.history) > HISTORY_WINDOW:
+            # Responses of rounds leaving the window are no longer checked for repeats
+            for dropped in self.history[:-HISTORY_WINDOW]:
+                for side in ("white", "black"):
+                    if dropped.get(f"{side}_valid"):
+                        self._used_responses.discard(_normalize_text(dropped[side] or ""))
+            del self.history[:-HISTORY_WINDOW]
+
     def _refresh_deadline(self) -> None:
         self.turn_deadline = time.time() + self.TURN_TIMEOUT
 
@@ -178,7 +192,7 @@ class WordAssociationEngine(BaseGameEngine):
                 "white_reason": None,
                 "black_reason": None,
             }
-            self.history.append(entry)
+            self._append_entry(entry)
 
         key = "white" if side == "white" else "black"
         if entry is not None:
@@ -194,23 +208,9 @@ class WordAssociationEngine(BaseGameEngine):
         self.turn_deadline = time.time()
 
     def _is_related(self, response: str) -> bool:
-        prompt_tokens = _token_set(self.current_prompt or "")
-        response_tokens = _token_set(response)
-        if not response_tokens:
-            return False
-
-        if prompt_tokens & response_tokens:
-            return True
-
         entry = self._current_entry()
-        if entry:
-            white_tokens = _token_set(entry.get("white") or "")
-            black_tokens = _token_set(entry.get("black") or "")
-            if white_tokens & response_tokens or black_tokens & response_tokens:
-                return True
-
-        # Allow short single tokens to pass (e.g., names) to avoid being overly strict
-        return len(response_tokens) <= 2
+        others = (entry.get("white"), entry.get("black")) if entry else ()
+        return self.relatedness.is_related(response, self.current_prompt, others)
 
     def push_move(self, move: str) -> bool:
         if self.is_game_over():
@@ -245,7 +245,7 @@ class WordAssociationEngine(BaseGameEngine):
                     "white_reason": None,
                     "black_reason": None,
                 }
-                self.history.append(entry)
+                self._append_entry(entry)
             entry["white_retries"] = 0
             entry["black_retries"] = entry.get("black_retries", 0)
             self._register_valid("white", response)
@@ -318,28 +318,37 @@ class WordAssociationEngine(BaseGameEngine):
             return {"status": "completed", "winner": winner, "result": f"{winner} wins"}
         return {"status": "completed", "result": "draw"}
 
+    def _state_dict(self) -> Dict[str, Any]:
+        return {
+            "current_round": self.current_round,
+            "max_rounds": self.MAX_ROUNDS,
+            "current_prompt": self.current_prompt,
+            "turn": self.turn,
+            "turn_deadline": self.turn_deadline,
+            "turn_timeout": self.TURN_TIMEOUT,
+            # At most HISTORY_WINDOW rounds, so load/save cost stays flat as rounds grow
+            "history": self.history,
+            "scores": self.scores,
+            "failure_side": self.failure_side,
+            "failure_reason": self.failure_reason,
+            "winner": self.winner,
+            "remaining_prompts": self._prompts,
+            "completed": self.completed,
+            # Precomputed so loading never re-normalizes the whole history
+            "used_responses": sorted(self._used_responses),
+        }
+
     def get_state(self) -> str:
-        return json.dumps(
-            {
-                "current_round": self.current_round,
-                "max_rounds": self.MAX_ROUNDS,
-                "current_prompt": self.current_prompt,
-                "turn": self.turn,
-                "turn_deadline": self.turn_deadline,
-                "turn_timeout": self.TURN_TIMEOUT,
-                "history": self.history,
-                "scores": self.scores,
-                "failure_side": self.failure_side,
-                "failure_reason": self.failure_reason,
-                "winner": self.winner,
-                "remaining_prompts": self._prompts,
-                "completed": self.completed,
-            }
-        )
+        return json.dumps(self._state_dict(), separators=(",", ":"))
 
-    def _load_state(self, state: str) -> None:
-        data = json.loads(state)
+    def get_state_packed(self) -> bytes:
+        """Compact binary form of get_state(); accepted by the constructor and reset()"""
+        return pack_state(self._state_dict())
+
+    def _load_state(self, state: Union[str, bytes, Dict[str, Any]]) -> None:
+        data = unpack_state(state)
         self._prompts = data.get("remaining_prompts", list(self.PROMPTS))
+        self.MAX_ROUNDS = data.get("max_rounds", self.MAX_ROUNDS)
         self.current_round = data.get("current_round", 0)
         self.current_prompt = data.get("current_prompt")
         self.turn = data.get("turn", "white")
@@ -350,10 +359,16 @@ class WordAssociationEngine(BaseGameEngine):
         self.failure_reason = data.get("failure_reason")
         self.winner = data.get("winner")
         self.completed = data.get("completed", False)
-        self._used_responses = {_normalize_text(entry.get("white", "") or "") for entry in self.history if entry.get("white")}
-        self._used_responses.update(
-            {_normalize_text(entry.get("black", "") or "") for entry in self.history if entry.get("black")}
-        )
+        used = data.get("used_responses")
+        if used is not None:
+            self._used_responses = set(used)
+        else:
+            # States saved before used_responses was stored
+            self._used_responses = {
+                _normalize_text(entry.get(side) or "")
+                for entry in self.history
+                for side in ("white", "black")
+                if entry.get(side)
+            }
         if not self.completed and not self.current_prompt:
             random.shuffle(self._prompts)
-
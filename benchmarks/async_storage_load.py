@@ -0,0 +1,119 @@
+"""
+Concurrent load on async routes that read game state
+
+Serves GET /state/{game_id} from two FastAPI apps backed by the same
+GameManager and a FakeTable that sleeps `--latency` per DynamoDB request:
+
+- blocking: the route calls game_manager.get_state() directly, as the routes
+            did before, so every storage call stalls the event loop
+- aio:      the route awaits game_manager.aio.get_state(), which runs the
+            call on the shared storage pool
+
+Requests are sent `--concurrency` at a time through httpx's ASGI transport
+(no sockets), so the numbers show how many requests one worker process can
+overlap, not network overhead.
+
+    python -m benchmarks.async_storage_load [--requests 400] [--concurrency 50] [--latency 0.01] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from benchmarks.fakes import FakeTable
+
+
+def build_apps(game_manager) -> Dict[str, FastAPI]:
+    blocking = FastAPI()
+    aio = FastAPI()
+
+    @blocking.get("/state/{game_id}")
+    async def blocking_state(game_id: str):
+        state = game_manager.get_state(game_id)
+        if not state:
+            raise HTTPException(status_code=404)
+        return {"turn": state.turn, "moves": len(state.moves)}
+
+    @aio.get("/state/{game_id}")
+    async def aio_state(game_id: str):
+        state = await game_manager.aio.get_state(game_id)
+        if not state:
+            raise HTTPException(status_code=404)
+        return {"turn": state.turn, "moves": len(state.moves)}
+
+    return {"blocking": blocking, "aio": aio}
+
+
+async def load(app: FastAPI, game_ids: List[str], requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    gate = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int) -> None:
+            async with gate:
+                start = time.perf_counter()
+                response = await client.get(f"/state/{game_ids[i % len(game_ids)]}")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests_per_s": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds per DynamoDB request")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    from app.core.config import settings
+    from app.services.active_game_db import ActiveGameService
+    from app.services.game_manager import GameManager
+
+    db = ActiveGameService()
+    db.table = FakeTable(latency=0)
+    manager = GameManager()
+    manager.db = db
+
+    results = {"settings": {**vars(args), "storage_max_workers": settings.storage_max_workers}}
+    # The services print on every load; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_ids = [manager.create_game("chess", "bench:white", "bench:black").game_id for _ in range(args.games)]
+        db.table.latency = args.latency
+        for name, app in build_apps(manager).items():
+            results[name] = asyncio.run(load(app, game_ids, args.requests, args.concurrency))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {args.latency * 1000:.0f} ms per DynamoDB call")
+    for name in ("blocking", "aio"):
+        r = results[name]
+        print(f"{name:<9} {r['requests_per_s']:8.1f} req/s   p50 {r['p50_ms']:7.1f} ms   p99 {r['p99_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
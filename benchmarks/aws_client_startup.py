@@ -0,0 +1,103 @@
+"""
+Startup cost of the AWS clients
+
+Each sample runs in a fresh interpreter under moto (no network) and times:
+
+- startup:        importing the storage services plus whatever they build at
+                  import time
+- first request:  the first DynamoDB GetItem (a missing table, so moto
+                  answers ResourceNotFoundException immediately)
+
+"before" rebuilds what the services did at import time before the shared
+factory: three DynamoDB resources from separate sessions plus a cognito-idp
+client. "after" is the current code, where the first request creates the one
+shared session and resource.
+
+Requires moto (`pip install moto`).
+
+    python -m benchmarks.aws_client_startup [--samples 5] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+PRELUDE = """
+import os, time
+from moto import mock_aws
+mock = mock_aws()
+mock.start()
+t0 = time.perf_counter()
+from app.services import active_game_db, cognito_service, dynamodb_service, session_store
+"""
+
+BEFORE = """
+import boto3
+from app.core.config import settings
+resources = [boto3.resource('dynamodb', region_name=settings.aws_region) for _ in range(3)]
+cognito = boto3.client('cognito-idp', region_name=settings.cognito_region)
+users = resources[1].Table(settings.dynamodb_table_name)
+get_table = lambda: users
+"""
+
+AFTER = """
+get_table = lambda: dynamodb_service.dynamodb_service.table
+"""
+
+MEASURE = """
+from botocore.exceptions import ClientError
+t1 = time.perf_counter()
+try:
+    get_table().get_item(Key={'email': 'bench@example.com'})
+except ClientError:
+    pass
+t2 = time.perf_counter()
+print((t1 - t0) * 1000, (t2 - t1) * 1000)
+"""
+
+
+def sample(code: str) -> List[float]:
+    env = dict(os.environ, AWS_ACCESS_KEY_ID="bench", AWS_SECRET_ACCESS_KEY="bench", AWS_REGION="us-east-1")
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return [float(x) for x in out.stdout.strip().splitlines()[-1].split()]
+
+
+def measure(code: str, samples: int) -> Dict[str, float]:
+    runs = [sample(code) for _ in range(samples)]
+    startup = statistics.median(r[0] for r in runs)
+    first = statistics.median(r[1] for r in runs)
+    return {"startup_ms": startup, "first_request_ms": first, "total_ms": startup + first}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    try:
+        import moto  # noqa: F401
+    except ImportError:
+        raise SystemExit("This benchmark needs moto: pip install moto")
+
+    results = {
+        "before": measure(PRELUDE + BEFORE + MEASURE, args.samples),
+        "after": measure(PRELUDE + AFTER + MEASURE, args.samples),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, r in results.items():
+        print(
+            f"{name:<7} startup {r['startup_ms']:7.1f} ms   first request {r['first_request_ms']:7.1f} ms   "
+            f"total {r['total_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Turn latency while an LLM provider is down, with and without circuit breakers
+
+One duel against an Ollama model is played turn after turn (the client
+polls again --poll seconds after each answer) for --duration simulated
+seconds. Ollama is down for the first --outage seconds: every call fails
+after --timeout seconds, like the adapter's httpx timeout. Each turn
+follows MatchRunner: get_adapter(), up to MOVE_RETRY_LIMIT + 1 attempts
+0.1 s apart, then a random legal move.
+
+- before: adapters called directly (no breaker)
+- after:  get_adapter() with provider/model breakers (CIRCUIT_BREAKER_*)
+
+Reports turn latency during the outage, calls sent to the dead provider
+(each one holds a worker and a governor slot for the whole timeout),
+and how long after Ollama came back the first real LLM move was played.
+
+    python -m benchmarks.circuit_breaker [--outage 120] [--timeout 5] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Engine:
+    def legal_moves(self) -> List[str]:
+        return ["e2e4", "d2d4"]
+
+
+def make_adapter_class():
+    from app.models.base import ModelAdapter, ModelUnavailable
+
+    class FlakyOllama(ModelAdapter):
+        """Fails after `timeout` simulated seconds while the outage lasts"""
+
+        clock: Clock
+        outage: float
+        timeout: float
+        failed_calls = 0
+
+        async def get_move(self, engine) -> Tuple[Optional[str], Optional[str]]:
+            cls = type(self)
+            if cls.clock.now < cls.outage:
+                cls.failed_calls += 1
+                cls.clock.now += cls.timeout
+                raise ModelUnavailable("ReadTimeout: timed out")
+            cls.clock.now += 0.3
+            self.tokens_used += 90
+            return "e2e4", None
+
+    return FlakyOllama
+
+
+async def play(args, guarded: bool) -> Dict[str, Any]:
+    from app.core.config import settings
+    from app.models import base, circuit_breaker
+
+    clock = Clock()
+    FlakyOllama = make_adapter_class()
+    FlakyOllama.clock, FlakyOllama.outage, FlakyOllama.timeout = clock, args.outage, args.timeout
+    circuit_breaker.breakers = circuit_breaker.BreakerRegistry(fallbacks={}, clock=clock)
+    base._build_adapter = lambda uri: FlakyOllama(base.parse_model_uri(uri)[1])
+
+    uri = "ollama:llama3.1:latest"
+    engine = Engine()
+    outage_latencies: List[float] = []
+    recovered_at = None
+    while clock.now < args.duration:
+        started = clock.now
+        adapter = base.get_adapter(uri) if guarded else FlakyOllama("llama3.1:latest")
+        move = None
+        for _ in range(settings.move_retry_limit + 1):
+            try:
+                move, _ = await adapter.get_move(engine)
+            except base.ModelUnavailable:
+                move = None  # unguarded: the caller just retries
+            if move is not None:
+                break
+            clock.now += 0.1
+        llm_move = move is not None and not isinstance(adapter, base.RandomFallbackAdapter)
+        if started < args.outage:
+            outage_latencies.append(clock.now - started)
+        elif llm_move and recovered_at is None:
+            recovered_at = clock.now
+        clock.now += args.poll
+
+    outage_latencies.sort()
+    return {
+        "outage_turns": len(outage_latencies),
+        "outage_latency_mean_s": sum(outage_latencies) / len(outage_latencies),
+        "outage_latency_p50_s": outage_latencies[len(outage_latencies) // 2],
+        "outage_latency_p99_s": outage_latencies[int(len(outage_latencies) * 0.99)],
+        "calls_while_down": FlakyOllama.failed_calls,
+        "first_llm_move_after_recovery_s": None if recovered_at is None else recovered_at - args.outage,
+        "breakers": circuit_breaker.breakers.metrics() if guarded else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--outage", type=float, default=120.0, help="Simulated seconds Ollama is down")
+    parser.add_argument("--duration", type=float, default=300.0, help="Simulated seconds played")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Seconds a failing call takes")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between a turn's answer and the next request")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    results = {
+        "before": asyncio.run(play(args, guarded=False)),
+        "after": asyncio.run(play(args, guarded=True)),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"Ollama down for {args.outage:g} s of {args.duration:g} s, failing calls take {args.timeout:g} s, "
+        f"next turn {args.poll:g} s after each answer"
+    )
+    for name, r in results.items():
+        recovery = r["first_llm_move_after_recovery_s"]
+        print(
+            f"{name:<7} {r['outage_turns']:4d} turns during the outage   latency p50 {r['outage_latency_p50_s'] * 1000:8.1f} ms  "
+            f"mean {r['outage_latency_mean_s'] * 1000:8.1f} ms  "
+            f"p99 {r['outage_latency_p99_s'] * 1000:8.1f} ms   calls to dead Ollama {r['calls_while_down']:4d}   "
+            f"first LLM move {recovery:.1f} s after recovery"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Lambda cold-start import cost
+
+Imports the Lambda entry point in a fresh interpreter, one layer at a time,
+and reports the wall time (median over several interpreters) and memory
+(tracemalloc) each step adds, plus which heavy third-party packages ended up
+loaded. Steps are cumulative: a step only pays for modules earlier steps did
+not already import.
+
+    python -m benchmarks.cold_start [--samples 5] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+STEPS = [
+    "app.core.config",
+    "app.services.game_manager",
+    "app.services.match_runner",
+    "app.services.game_listing",
+    "app.routers.auth",
+    "app.routers.games",
+    "app.middleware.security",
+    "app.main",
+    "app.lambda_handler",
+]
+
+HEAVY = ["chess", "boto3", "authlib", "slowapi", "jinja2", "jwt", "passlib", "requests", "httpx"]
+
+PROBE = """
+import importlib, json, sys, time, tracemalloc
+trace = {trace!r}
+if trace:
+    tracemalloc.start()
+steps = []
+for name in {steps!r}:
+    before = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    importlib.import_module(name)
+    steps.append([name, (time.perf_counter() - t0) * 1000, (tracemalloc.get_traced_memory()[0] - before) / 1024])
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"steps": steps, "heavy": heavy}}))
+"""
+
+
+def sample(trace: bool) -> Dict[str, Any]:
+    # tracemalloc slows imports several times over, so time and memory are separate runs
+    env = dict(os.environ, AWS_REGION=os.environ.get("AWS_REGION", "us-east-1"))
+    code = PROBE.format(trace=trace, steps=STEPS, heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    timed: List[Dict[str, Any]] = [sample(trace=False) for _ in range(args.samples)]
+    traced = sample(trace=True)
+    steps = []
+    for i, name in enumerate(STEPS):
+        steps.append({
+            "module": name,
+            "ms": statistics.median(r["steps"][i][1] for r in timed),
+            "kib": traced["steps"][i][2],
+        })
+    results = {
+        "steps": steps,
+        "total_ms": sum(s["ms"] for s in steps),
+        "total_kib": sum(s["kib"] for s in steps),
+        "heavy_loaded": traced["heavy"],
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for s in steps:
+        print(f"{s['module']:<28} {s['ms']:8.1f} ms {s['kib']:9.0f} KiB")
+    print(f"{'total':<28} {results['total_ms']:8.1f} ms {results['total_kib']:9.0f} KiB")
+    print(f"heavy packages loaded: {', '.join(results['heavy_loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+In-process stand-ins for AWS resources and Redis used by the benchmarks
+
+`FakeTable` implements the subset of the boto3 Table API the storage services
+use and sleeps for a fixed latency on every request, like a network
+round-trip to DynamoDB would. Items are deep-copied in and out so callers
+cannot share state with the "database".
+
+`FakeRedis` does the same for the few redis-py calls the rate limiter makes
+(a pipeline counts as one round trip).
+"""
+from __future__ import annotations
+
+import copy
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+_SET_CLAUSE = re.compile(r"([#\w.]+)\s*=\s*(:\w+)")
+
+
+class FakeTable:
+    def __init__(self, key: str = "game_id", latency: float = 0.01, name: str = "fake") -> None:
+        self.key = key
+        self.latency = latency
+        self.name = name
+        self.items: Dict[Any, Dict[str, Any]] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _round_trip(self) -> None:
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def put_item(self, Item: Dict[str, Any], **_: Any) -> Dict[str, Any]:
+        self._round_trip()
+        with self._lock:
+            self.items[Item[self.key]] = copy.deepcopy(Item)
+        return {}
+
+    def get_item(
+        self,
+        Key: Dict[str, Any],
+        ProjectionExpression: Optional[str] = None,
+        ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+        **_: Any,
+    ) -> Dict[str, Any]:
+        self._round_trip()
+        with self._lock:
+            item = self.items.get(Key[self.key])
+            item = copy.deepcopy(item) if item is not None else None
+        if item is None:
+            return {}
+        if ProjectionExpression:
+            names = ExpressionAttributeNames or {}
+            wanted = {names.get(p.strip(), p.strip()) for p in ProjectionExpression.split(",")}
+            item = {k: v for k, v in item.items() if k in wanted}
+        return {"Item": item}
+
+    def delete_item(self, Key: Dict[str, Any], **_: Any) -> Dict[str, Any]:
+        self._round_trip()
+        with self._lock:
+            self.items.pop(Key[self.key], None)
+        return {}
+
+    def update_item(
+        self,
+        Key: Dict[str, Any],
+        UpdateExpression: str,
+        ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+        ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+        **_: Any,
+    ) -> Dict[str, Any]:
+        """Only `SET a = :a, #b = :b` updates (what update_header issues)"""
+        self._round_trip()
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        with self._lock:
+            item = self.items.setdefault(Key[self.key], dict(Key))
+            for name, value in _SET_CLAUSE.findall(UpdateExpression):
+                item[names.get(name, name)] = copy.deepcopy(values[value])
+        return {}
+
+
+class FakeRedis:
+    def __init__(self, latency: float = 0.001) -> None:
+        self.latency = latency
+        self.values: Dict[str, int] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _round_trip(self) -> None:
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, name: str) -> Optional[bytes]:
+        self._round_trip()
+        with self._lock:
+            value = self.values.get(name)
+        return None if value is None else str(value).encode()
+
+    def pipeline(self) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.commands: list = []
+
+    def incrby(self, name: str, amount: int) -> None:
+        self.commands.append(("incrby", name, amount))
+
+    def expire(self, name: str, seconds: int) -> None:
+        self.commands.append(("expire", name, seconds))
+
+    def execute(self) -> list:
+        self.redis._round_trip()
+        results = []
+        with self.redis._lock:
+            for command, name, arg in self.commands:
+                if command == "incrby":
+                    self.redis.values[name] = self.redis.values.get(name, 0) + arg
+                    results.append(self.redis.values[name])
+                else:
+                    results.append(True)
+        return results
@@ -0,0 +1,162 @@
+"""
+Resident memory of loaded games
+
+Loads many concurrent games from DynamoDB items and compares the previous
+representation (dict-backed dataclasses with every move materialized) with
+the slotted GameState and column-backed MoveLog:
+
+- header: games loaded, moves never read (lists, status checks)
+- moves:  games loaded and their moves read once (state responses, replays)
+
+    python -m benchmarks.game_state_memory [--games 2000] [--plies 120] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from app.services.game_manager import GameState
+from app.services.serialization import move_to_dict, state_from_item, state_to_item
+from benchmarks.move_blob_size import chess_moves
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+@dataclass
+class LegacyMoveRecord:
+    ply: int
+    side: str
+    move_uci: str
+    move_san: str | None
+    model_name: str | None
+    error: str | None = None
+    from_square: str | None = None
+    to_square: str | None = None
+    captured_piece: str | None = None
+    tokens_used: int = 0
+
+
+@dataclass
+class LegacyGameState:
+    game_id: str
+    game_type: str
+    state: str
+    turn: str
+    over: bool
+    result: Dict[str, str]
+    moves: List[LegacyMoveRecord] = field(default_factory=list)
+    white_model: str | None = None
+    black_model: str | None = None
+    white_tokens: int = 0
+    black_tokens: int = 0
+
+
+def legacy_load(item: Dict[str, Any]) -> LegacyGameState:
+    return LegacyGameState(
+        game_id=item["game_id"],
+        game_type=item["game_type"],
+        state=item["state"],
+        turn=item["turn"],
+        over=item["over"],
+        result=item.get("result", {}),
+        moves=[LegacyMoveRecord(**m) for m in item["moves"]],
+        white_model=item.get("white_model"),
+        black_model=item.get("black_model"),
+    )
+
+
+def make_items(games: int, plies: int) -> List[Dict[str, Any]]:
+    """Wire-format items, deserialized per load like boto3 does"""
+    moves = chess_moves(plies)
+    items = []
+    for i in range(games):
+        state = GameState(
+            game_id=f"{i:032x}",
+            game_type="chess",
+            state="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+            turn="white",
+            over=False,
+            result={},
+            moves=moves,
+            white_model="ollama:llama3.1:latest",
+            black_model="ollama:mistral-nemo:latest",
+        )
+        item = state_to_item(state)
+        # The legacy path read the list-of-maps attribute
+        item["moves"] = [move_to_dict(m) for m in moves]
+        items.append({k: _serializer.serialize(v) for k, v in item.items()})
+    return items
+
+
+def load_all(
+    items: List[Dict[str, Any]],
+    load: Callable[[Dict[str, Any]], Any],
+    skip: str,
+    read_moves: bool,
+) -> List[Any]:
+    loaded = []
+    for wire in items:
+        state = load({k: _deserializer.deserialize(v) for k, v in wire.items() if k != skip})
+        if read_moves:
+            for move in state.moves:
+                move.move_uci
+        loaded.append(state)
+    return loaded
+
+
+def measure(
+    items: List[Dict[str, Any]],
+    load: Callable[[Dict[str, Any]], Any],
+    skip: str,
+    read_moves: bool,
+) -> Dict[str, float]:
+    gc.collect()
+    start = time.perf_counter()
+    load_all(items, load, skip, read_moves)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    loaded = load_all(items, load, skip, read_moves)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loaded
+    return {"kb_per_game": current / len(items) / 1024, "us_per_game": elapsed / len(items) * 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--plies", type=int, default=120)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    items = make_items(args.games, args.plies)
+    results = []
+    for read_moves in (False, True):
+        before = measure(items, legacy_load, "moves_blob", read_moves)
+        after = measure(items, state_from_item, "moves", read_moves)
+        results.append({"scenario": "moves" if read_moves else "header", "before": before, "after": after})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.games} games x {args.plies} plies")
+    for r in results:
+        b, a = r["before"], r["after"]
+        print(
+            f"{r['scenario']:<7} {b['kb_per_game']:8.1f} KB/game -> {a['kb_per_game']:6.1f} KB/game   "
+            f"{b['us_per_game']:8.1f} us -> {a['us_per_game']:7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Game history write benchmark
+
+Counts DynamoDB requests per `add_game_result` against moto's in-process
+DynamoDB, for the original game_list-map implementation and the current
+transactional one:
+
+- new game:       first save of a finished game
+- repeat save:    the same game saved again (post_move after game over)
+- no game_list:   first save for a user item without a game_list map
+                  (original implementation only)
+
+Latencies are moto's, so only the request counts carry over to AWS; each saved
+request is a network round-trip on the request path.
+
+Requires moto (`pip install moto`).
+
+    python -m benchmarks.history_write [--saves 200] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from typing import Any, Callable, Dict
+
+from botocore.exceptions import ClientError
+
+USERS_TABLE = "bench-users"
+HISTORY_TABLE = "bench-game-history"
+
+
+def legacy_add_game_result(table, email: str, game_id: str, game_data: Dict[str, Any]) -> bool:
+    """add_game_result before the history table (game_list map on the user item)"""
+    update_expr = "SET game_list.#gid = :g, total_games_played = total_games_played + :inc"
+    expr_names = {'#gid': game_id}
+    expr_values = {':g': game_data, ':inc': 1}
+    try:
+        table.update_item(
+            Key={'email': email},
+            UpdateExpression=update_expr,
+            ExpressionAttributeNames=expr_names,
+            ExpressionAttributeValues=expr_values,
+            ConditionExpression="attribute_not_exists(game_list.#gid)"
+        )
+        return True
+    except ClientError as e:
+        code = e.response['Error']['Code']
+        if code == 'ConditionalCheckFailedException':
+            table.update_item(
+                Key={'email': email},
+                UpdateExpression="SET game_list.#gid = :g",
+                ExpressionAttributeNames=expr_names,
+                ExpressionAttributeValues={':g': game_data}
+            )
+            return True
+        if code != 'ValidationException':
+            raise
+    try:
+        table.update_item(
+            Key={'email': email},
+            UpdateExpression="SET game_list = :empty_map, total_games_played = if_not_exists(total_games_played, :zero)",
+            ExpressionAttributeValues={':empty_map': {}, ':zero': 0},
+            ConditionExpression="attribute_not_exists(game_list)"
+        )
+    except ClientError as init_error:
+        if init_error.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            return False
+    try:
+        table.update_item(
+            Key={'email': email},
+            UpdateExpression=update_expr,
+            ExpressionAttributeNames=expr_names,
+            ExpressionAttributeValues=expr_values,
+            ConditionExpression="attribute_not_exists(game_list.#gid)"
+        )
+        return True
+    except ClientError as retry_error:
+        if retry_error.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            table.update_item(
+                Key={'email': email},
+                UpdateExpression="SET game_list.#gid = :g",
+                ExpressionAttributeNames=expr_names,
+                ExpressionAttributeValues={':g': game_data}
+            )
+            return True
+        return False
+
+
+def create_tables(dynamodb) -> None:
+    dynamodb.create_table(
+        TableName=USERS_TABLE,
+        KeySchema=[{'AttributeName': 'email', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'email', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST',
+    )
+    dynamodb.create_table(
+        TableName=HISTORY_TABLE,
+        KeySchema=[{'AttributeName': 'email', 'KeyType': 'HASH'}, {'AttributeName': 'game_id', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[
+            {'AttributeName': 'email', 'AttributeType': 'S'},
+            {'AttributeName': 'game_id', 'AttributeType': 'S'},
+            {'AttributeName': 'completed_at', 'AttributeType': 'S'},
+        ],
+        LocalSecondaryIndexes=[{
+            'IndexName': 'completed_at-index',
+            'KeySchema': [{'AttributeName': 'email', 'KeyType': 'HASH'}, {'AttributeName': 'completed_at', 'KeyType': 'RANGE'}],
+            'Projection': {'ProjectionType': 'ALL'},
+        }],
+        BillingMode='PAY_PER_REQUEST',
+    )
+
+
+def game_data(i: int) -> Dict[str, Any]:
+    return {
+        'game_id': f"game-{i}",
+        'game_type': 'chess',
+        'result': {'status': 'checkmate', 'result': '1-0'},
+        'white_model': 'ollama:llama3.1:latest',
+        'black_model': 'ollama:mistral-nemo:latest',
+        'white_tokens': 4100,
+        'black_tokens': 3900,
+        'total_moves': 87,
+        'completed_at': f"2026-01-01T00:00:{i % 60:02d}.000000Z",
+    }
+
+
+def run(
+    name: str,
+    saves: int,
+    setup: Callable[[str, int], None],
+    save: Callable[[str, int], Any],
+    requests: Counter,
+) -> Dict[str, float]:
+    emails = [f"{name}-user{i}@example.com" for i in range(saves)]
+    for i, email in enumerate(emails):
+        setup(email, i)
+    requests.clear()
+    start = time.perf_counter()
+    for i, email in enumerate(emails):
+        save(email, i)
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_save": sum(requests.values()) / saves,
+        "ms_per_save": elapsed / saves * 1000,
+        "operations": dict(requests),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--saves", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    try:
+        from moto import mock_aws
+    except ImportError:
+        raise SystemExit("This benchmark needs moto: pip install moto")
+
+    for name, value in (("AWS_ACCESS_KEY_ID", "bench"), ("AWS_SECRET_ACCESS_KEY", "bench")):
+        os.environ.setdefault(name, value)
+    os.environ["DYNAMODB_TABLE_NAME"] = USERS_TABLE
+    os.environ["GAME_HISTORY_TABLE_NAME"] = HISTORY_TABLE
+
+    with mock_aws():
+        from app.services.dynamodb_service import DynamoDBService
+
+        service = DynamoDBService()
+        create_tables(service.dynamodb)
+        users = service.table
+
+        requests: Counter = Counter()
+        service.dynamodb.meta.client.meta.events.register(
+            "before-call.dynamodb", lambda model, **_: requests.update([model.name])
+        )
+
+        def with_game_list(email: str, i: int) -> None:
+            users.put_item(Item={'email': email, 'total_games_played': 0, 'game_list': {}})
+
+        def without_game_list(email: str, i: int) -> None:
+            users.put_item(Item={'email': email, 'total_games_played': 0})
+
+        def legacy(email: str, i: int) -> Any:
+            return legacy_add_game_result(users, email, f"game-{i}", game_data(i))
+
+        def current(email: str, i: int) -> Any:
+            return service.add_game_result(email, f"game-{i}", game_data(i))
+
+        def saved_twice(save: Callable[[str, int], Any]) -> Callable[[str, int], None]:
+            # Setup records the game once so the timed save is a repeat
+            def setup(email: str, i: int) -> None:
+                with_game_list(email, i)
+                save(email, i)
+            return setup
+
+        results = [
+            {"scenario": "new game", "before": run("new-legacy", args.saves, with_game_list, legacy, requests),
+             "after": run("new", args.saves, without_game_list, current, requests)},
+            {"scenario": "repeat save", "before": run("repeat-legacy", args.saves, saved_twice(legacy), legacy, requests),
+             "after": run("repeat", args.saves, saved_twice(current), current, requests)},
+            {"scenario": "no game_list", "before": run("bare-legacy", args.saves, without_game_list, legacy, requests),
+             "after": run("bare", args.saves, without_game_list, current, requests)},
+        ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for r in results:
+        b, a = r["before"], r["after"]
+        print(
+            f"{r['scenario']:<13} {b['requests_per_save']:.1f} -> {a['requests_per_save']:.1f} requests/save   "
+            f"{b['ms_per_save']:6.2f} ms -> {a['ms_per_save']:6.2f} ms (moto)   {a['operations']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
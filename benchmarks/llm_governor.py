@@ -0,0 +1,135 @@
+"""
+LLM concurrency: stampede on one Ollama box, and fairness across games
+
+--games duels all use the same Ollama model. One of them is watched by
+--hot-viewers browsers, each triggering process_turn as fast as its
+answers come back; every other duel has a single viewer. The fake Ollama
+box runs --box-parallel requests at full speed (--latency ms each) and
+slows down linearly beyond that (requests share the GPU).
+
+- unlimited:  no governor (every turn goes straight to the box)
+- fifo:       a plain semaphore at the box's parallelism, served in arrival order
+- governor:   LLMGovernor, round-robin by game, per-user limit for the viewers
+
+Reports turns completed per duel, turn latency and the most requests the
+box had in flight.
+
+    python -m benchmarks.llm_governor [--games 20] [--hot-viewers 10] [--seconds 5] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+
+class FakeOllama:
+    def __init__(self, latency: float, parallel: int) -> None:
+        self.latency = latency
+        self.parallel = parallel
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate(self) -> None:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # Work is shared: beyond `parallel` every request slows down
+            await asyncio.sleep(self.latency * max(1.0, self.in_flight / self.parallel))
+        finally:
+            self.in_flight -= 1
+
+
+async def run_case(name: str, args) -> Dict[str, Any]:
+    from app.models.governor import FairGate, LLMGovernor
+
+    box = FakeOllama(args.latency / 1000, args.box_parallel)
+    governor = LLMGovernor(
+        provider_limits={"ollama": args.box_parallel},
+        model_limit=args.box_parallel,
+        user_limit=2,
+        user_max_queued=args.hot_viewers,
+        queue_timeout=0,
+    )
+    fifo = FairGate("fifo", args.box_parallel)
+    turns: Counter = Counter()
+    latencies: List[float] = []
+    deadline = time.perf_counter() + args.seconds
+
+    async def turn(game: str, viewer: str) -> None:
+        if name == "unlimited":
+            await box.generate()
+        elif name == "fifo":
+            await fifo.acquire("all")  # one queue: arrival order
+            try:
+                await box.generate()
+            finally:
+                fifo.release()
+        else:
+            async with governor.slot("ollama:llama3.1:latest", game, viewer):
+                await box.generate()
+
+    async def viewer(game: str, viewer_id: str) -> None:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            await turn(game, viewer_id)
+            latencies.append(time.perf_counter() - t0)
+            turns[game] += 1
+
+    tasks = [viewer("hot", f"hot-viewer-{v}") for v in range(args.hot_viewers)]
+    tasks += [viewer(f"game-{g}", f"viewer-{g}") for g in range(1, args.games)]
+    await asyncio.gather(*tasks)
+
+    quiet = [turns[f"game-{g}"] for g in range(1, args.games)]
+    latencies.sort()
+    return {
+        "turns": sum(turns.values()),
+        "hot_game_turns": turns["hot"],
+        "quiet_game_turns_min": min(quiet),
+        "quiet_game_turns_median": statistics.median(quiet),
+        "latency_p50_ms": latencies[len(latencies) // 2] * 1000,
+        "latency_p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "box_peak_in_flight": box.peak,
+        "governor": governor.metrics() if name == "governor" else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--hot-viewers", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=50.0, help="Ollama time per request at or below full parallelism, ms")
+    parser.add_argument("--box-parallel", type=int, default=2)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    results = {name: asyncio.run(run_case(name, args)) for name in ("unlimited", "fifo", "governor")}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{args.games} duels on one Ollama box ({args.box_parallel} parallel, {args.latency:g} ms), "
+        f"one duel watched by {args.hot_viewers} viewers, {args.seconds:g} s"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:<10} turns {r['turns']:5d}   hot duel {r['hot_game_turns']:4d}   "
+            f"other duels min/median {r['quiet_game_turns_min']:3d}/{r['quiet_game_turns_median']:5.1f}   "
+            f"p50 {r['latency_p50_ms']:7.1f} ms  p99 {r['latency_p99_ms']:7.1f} ms   box peak {r['box_peak_in_flight']:3d}"
+        )
+    model = results["governor"]["governor"]["models"]["ollama:llama3.1:latest"]
+    print(
+        f"governor model gate: wait p50 {model['wait_p50_ms']} ms, p95 {model['wait_p95_ms']} ms "
+        f"(the hot duel's viewers queue behind one another, not behind the other duels)"
+    )
+
+
+if __name__ == "__main__":
+    main()
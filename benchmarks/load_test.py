@@ -0,0 +1,187 @@
+"""
+End-to-end load test: concurrent AI-vs-AI matches through the real app
+
+Starts benchmarks.mock_llm on a local port (or uses --mock-url), points
+OLLAMA_BASE_URL at it, and plays --matches duels at once through the FastAPI
+app (httpx ASGI transport, DynamoDB under moto). Each match is driven like
+the browser does: POST /process_turn, then GET the state, until the game is
+over or --max-plies moves have been played.
+
+Reports moves per second, process_turn latency (p50/p99), the statuses
+process_turn answered (success, fallback, busy...) and DynamoDB calls per
+move, by operation. Request rate limiting and daily token budgets are off;
+the LLM governor and circuit breakers run with their settings
+(--ollama-concurrency sets LLM_PROVIDER_CONCURRENCY for Ollama).
+
+    python -m benchmarks.load_test [--matches 20] [--game-type tic_tac_toe] [--latency-ms 300]
+        [--error-rate 0.02] [--illegal-rate 0.1] [--ollama-concurrency 8] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock(args) -> str:
+    import uvicorn
+
+    from .mock_llm import MockConfig, create_app
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        illegal_rate=args.illegal_rate,
+        seed=args.seed,
+    )
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="mock-llm", daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("mock LLM server did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def setup_storage() -> None:
+    from moto import mock_aws
+
+    mock_aws().start()
+    sys.path.insert(0, os.getcwd())
+    with contextlib.redirect_stdout(io.StringIO()):
+        from create_active_games_table import create_active_games_table
+        from create_dynamo_table import create_history_table, create_table
+
+        create_active_games_table()
+        create_table()
+        create_history_table()
+
+
+async def play_match(client, args, n: int, latencies: List[float], statuses: Counter) -> int:
+    white = f"ollama:mock-white-{n % 4}"
+    black = f"ollama:mock-black-{n % 4}"
+    resp = await client.post("/api/games/", json={"game_type": args.game_type, "white_model": white, "black_model": black})
+    resp.raise_for_status()
+    game_id = resp.json()["game_id"]
+    plies = 0
+    while plies < args.max_plies:
+        started = time.perf_counter()
+        result = (await client.post(f"/api/games/{game_id}/process_turn")).json()
+        latencies.append(time.perf_counter() - started)
+        statuses[result.get("status", "?")] += 1
+        if result.get("status") in ("success", "fallback"):
+            plies += 1
+        elif result.get("status") not in ("busy",):
+            break
+        state = (await client.get(f"/api/games/{game_id}")).json()
+        if state.get("over"):
+            break
+    return plies
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+
+    from app.core.aws import get_resource
+
+    # The app logs to stdout; keep --json output parseable
+    with contextlib.redirect_stdout(io.StringIO()) if args.json else contextlib.nullcontext():
+        from app.main import app
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+
+    calls: Counter = Counter()
+    get_resource("dynamodb").meta.client.meta.events.register(
+        "before-call.dynamodb", lambda model, **_: calls.update([model.name])
+    )
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://arena", timeout=120) as client:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # the app still prints per move
+            plies = await asyncio.gather(*(play_match(client, args, n, latencies, statuses) for n in range(args.matches)))
+        elapsed = time.perf_counter() - started
+
+    moves = sum(plies)
+    latencies.sort()
+    return {
+        "matches": args.matches,
+        "moves": moves,
+        "seconds": elapsed,
+        "moves_per_second": moves / elapsed,
+        "turn_latency_p50_ms": statistics.median(latencies) * 1000,
+        "turn_latency_p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "statuses": dict(statuses),
+        "storage_calls": sum(calls.values()),
+        "storage_calls_per_move": sum(calls.values()) / max(1, moves),
+        "storage_calls_by_operation": dict(calls.most_common()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=20)
+    parser.add_argument("--game-type", default="tic_tac_toe")
+    parser.add_argument("--max-plies", type=int, default=40)
+    parser.add_argument("--mock-url", default="", help="Use a running benchmarks.mock_llm instead of starting one")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--latency-dist", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--illegal-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ollama-concurrency", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ["AWS_REGION"] = "us-east-1"
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    os.environ["ENABLE_RATE_LIMITING"] = "false"
+    os.environ["TOKEN_BUDGET_PER_USER_DAY"] = "0"
+    os.environ["LLM_PROVIDER_CONCURRENCY"] = f"ollama={args.ollama_concurrency}"
+    os.environ["LLM_USER_CONCURRENCY"] = "0"  # every match comes from the same client address
+    os.environ["OLLAMA_BASE_URL"] = args.mock_url or start_mock(args)
+    setup_storage()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{args.matches} {args.game_type} matches on mock Ollama ({args.latency_dist} {args.latency_ms:g} ms, "
+        f"{args.error_rate:.0%} errors, {args.illegal_rate:.0%} illegal), Ollama concurrency {args.ollama_concurrency}"
+    )
+    print(
+        f"{results['moves']} moves in {results['seconds']:.1f} s: {results['moves_per_second']:.1f} moves/s   "
+        f"process_turn p50 {results['turn_latency_p50_ms']:.0f} ms  p99 {results['turn_latency_p99_ms']:.0f} ms"
+    )
+    print(f"statuses: {results['statuses']}")
+    by_op = ", ".join(f"{op} {n / max(1, results['moves']):.2f}" for op, n in results["storage_calls_by_operation"].items())
+    print(f"DynamoDB calls per move: {results['storage_calls_per_move']:.2f} ({by_op})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Local stand-in for LLM providers, for load tests
+
+Speaks just enough of three protocols for the arena's adapters:
+
+- Ollama:       POST /api/generate
+- OpenAI:       POST /v1/chat/completions
+- HuggingFace:  POST /models/{model}   (inference API)
+
+Answers are derived from the prompt: a FEN gets a legal UCI move (python-chess),
+a tic-tac-toe board a free "row,col", rock/paper/scissors a choice, racing one of the
+listed legal actions, word association a related phrase. A share of
+answers is deliberately illegal (--illegal-rate), a share of requests fails
+with --error-status (--error-rate), and every reply waits a latency drawn
+from --latency-dist. Token counts are reported like the real APIs do.
+
+Everything is seeded: the n-th identical request (same model, same prompt)
+gets the same answer, latency and error on every run, and a retry of a
+failed request can succeed like it would against a real provider.
+
+    python -m benchmarks.mock_llm [--port 11435] [--latency-ms 300] [--latency-dist lognormal]
+        [--error-rate 0.02] [--error-status 500] [--illegal-rate 0.1]
+
+Point the app at it with OLLAMA_BASE_URL=http://127.0.0.1:11435,
+OPENAI_BASE_URL=http://127.0.0.1:11435/v1 (plus any OPENAI_API_KEY) and
+HUGGINGFACE_BASE_URL=http://127.0.0.1:11435/models.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+FEN_RE = re.compile(r"FEN:\s*(\S+ [wb] \S+ \S+ \d+ \d+)")
+TTT_CELL_RE = re.compile(r"\b([0-2]),([0-2])\b")
+LEGAL_RE = re.compile(r"Legal actions:\s*(.+)")
+PROMPT_RE = re.compile(r"Prompt:\s*(.+)")
+ILLEGAL_ANSWERS = ("I would rather not say.", "z9z9", "Let me think about this position carefully first")
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 300.0
+    latency_dist: str = "lognormal"  # fixed, uniform or lognormal
+    latency_sigma: float = 0.5  # lognormal shape; uniform spans 0..2x the mean
+    error_rate: float = 0.0
+    error_status: int = 500
+    illegal_rate: float = 0.0
+    completion_tokens: int = 8
+    seed: int = 0
+
+
+def _rng(config: MockConfig, model: str, prompt: str, attempt: int) -> random.Random:
+    digest = hashlib.sha256(f"{config.seed}\0{model}\0{prompt}\0{attempt}".encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _latency(config: MockConfig, rng: random.Random) -> float:
+    mean = config.latency_ms / 1000
+    if config.latency_dist == "fixed":
+        return mean
+    if config.latency_dist == "uniform":
+        return rng.uniform(0, 2 * mean)
+    sigma = config.latency_sigma
+    return rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)  # mean stays latency_ms
+
+
+def answer(prompt: str, rng: random.Random) -> str:
+    """A legal reply for the game the prompt describes"""
+    fen = FEN_RE.search(prompt)
+    if fen:
+        import chess
+
+        board = chess.Board(fen.group(1))
+        moves = sorted(m.uci() for m in board.legal_moves)
+        return rng.choice(moves) if moves else "0000"
+    lowered = prompt.lower()
+    if "tic tac toe" in lowered:
+        board = prompt.split("Current board:", 1)[-1]
+        cells = TTT_CELL_RE.findall(board)  # free cells are shown as "row,col"
+        return ",".join(rng.choice(cells)) if cells else "1,1"
+    if "rock paper scissors" in lowered:
+        return rng.choice(("rock", "paper", "scissors"))
+    legal = LEGAL_RE.search(prompt)
+    if legal:
+        return rng.choice([a.strip() for a in legal.group(1).split(",") if a.strip()])
+    topic = PROMPT_RE.search(prompt)
+    if topic:
+        word = topic.group(1).strip().split()[0]
+        return f"{word} {rng.choice(('lover', 'season', 'story', 'maker', 'club', 'fever', 'time', 'land'))}"
+    return "e2e4"
+
+
+def reply(config: MockConfig, model: str, prompt: str, attempt: int = 0) -> Tuple[float, Optional[int], str, int, int]:
+    """(latency s, error status or None, text, prompt tokens, completion tokens)"""
+    rng = _rng(config, model, prompt, attempt)
+    latency = _latency(config, rng)
+    if rng.random() < config.error_rate:
+        return latency, config.error_status, "", 0, 0
+    if rng.random() < config.illegal_rate:
+        text = rng.choice(ILLEGAL_ANSWERS)
+    else:
+        text = answer(prompt, rng)
+    return latency, None, text, max(1, len(prompt) // 4), config.completion_tokens
+
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    config = config or MockConfig()
+    app = FastAPI(title="Mock LLM")
+    app.state.config = config
+    app.state.stats = Counter()
+    attempts: Counter = Counter()
+
+    async def respond(model: str, prompt: str, build) -> Any:
+        key = hashlib.sha256(f"{model}\0{prompt}".encode()).digest()
+        attempt = attempts[key]
+        attempts[key] += 1
+        latency, status, text, prompt_tokens, completion_tokens = reply(config, model, prompt, attempt)
+        app.state.stats["requests"] += 1
+        await asyncio.sleep(latency)
+        if status is not None:
+            app.state.stats[f"errors_{status}"] += 1
+            return JSONResponse({"error": "mock failure"}, status_code=status)
+        return build(text, prompt_tokens, completion_tokens)
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        body = await request.json()
+        model = body.get("model", "")
+        return await respond(model, body.get("prompt", ""), lambda text, p, c: {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "response": text,
+            "done": True,
+            "prompt_eval_count": p,
+            "eval_count": c,
+        })
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        body = await request.json()
+        model = body.get("model", "")
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        return await respond(model, prompt, lambda text, p, c: {
+            "id": f"chatcmpl-mock-{app.state.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": p, "completion_tokens": c, "total_tokens": p + c},
+        })
+
+    @app.post("/models/{model:path}")
+    async def hf_inference(model: str, request: Request):
+        body = await request.json()
+        return await respond(model, body.get("inputs", ""), lambda text, p, c: [{"generated_text": text}])
+
+    @app.get("/stats")
+    async def stats():
+        return dict(app.state.stats)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Mean reply latency")
+    parser.add_argument("--latency-dist", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500, help="e.g. 429 for rate limiting, 503 for overload")
+    parser.add_argument("--illegal-rate", type=float, default=0.0, help="Share of answers that are not a legal move")
+    parser.add_argument("--completion-tokens", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        illegal_rate=args.illegal_rate,
+        completion_tokens=args.completion_tokens,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Active-game item size per move
+
+Reports DynamoDB bytes per move for the original list-of-maps `moves`
+attribute and for the compressed column-oriented `moves_blob`, for a long
+chess game and a word association game with custom prompts.
+
+    python -m benchmarks.move_blob_size [--plies 300] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import chess
+
+from app.services.chess_engine import ChessEngine
+from app.services.game_manager import MoveRecord
+from app.services.serialization import encode_moves, move_to_dict, zstandard
+
+
+def dynamodb_size(value: Any) -> int:
+    """Approximate DynamoDB storage size of an attribute value"""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return len(str(abs(value)).replace(".", "")) // 2 + 2
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode("utf-8")) + dynamodb_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 3 + sum(dynamodb_size(v) + 1 for v in value)
+    raise TypeError(type(value))
+
+
+def chess_moves(plies: int, seed: int = 7) -> List[MoveRecord]:
+    rng = random.Random(seed)
+    engine = ChessEngine()
+    moves: List[MoveRecord] = []
+    while len(moves) < plies:
+        if engine.is_game_over():
+            engine = ChessEngine()
+        uci = rng.choice(engine.legal_moves())
+        captured = engine.board.piece_at(chess.parse_square(uci[2:4]))
+        san = engine.uci_to_san(uci)
+        side = engine.get_turn()
+        engine.push_move(uci)
+        moves.append(
+            MoveRecord(
+                ply=len(moves) + 1,
+                side=side,  # type: ignore[arg-type]
+                move_uci=uci,
+                move_san=san,
+                model_name="ollama:llama3.1:latest" if side == "white" else "ollama:mistral-nemo:latest",
+                from_square=uci[:2],
+                to_square=uci[2:4],
+                captured_piece=captured.symbol() if captured else None,
+                tokens_used=rng.randint(60, 120),
+            )
+        )
+    return moves
+
+
+def word_association_moves(plies: int, seed: int = 7) -> List[MoveRecord]:
+    rng = random.Random(seed)
+    vocabulary = ["orbit", "lunar", "module", "saturn", "rocket", "crew", "launch", "capsule", "mission", "gravity"]
+    return [
+        MoveRecord(
+            ply=i + 1,
+            side="white" if i % 2 == 0 else "black",
+            move_uci=" ".join(rng.sample(vocabulary, 2)),
+            move_san=None,
+            model_name="ollama:llama3.1:latest" if i % 2 == 0 else "ollama:mistral-nemo:latest",
+            tokens_used=rng.randint(90, 140),
+        )
+        for i in range(plies)
+    ]
+
+
+def report(name: str, moves: List[MoveRecord]) -> Dict[str, Any]:
+    n = len(moves)
+    before = dynamodb_size([move_to_dict(m) for m in moves]) + len("moves")
+    result = {
+        "game": name,
+        "moves": n,
+        "list_of_maps_bytes_per_move": before / n,
+        "zlib_columns_bytes_per_move": (len(encode_moves(moves, "zlib")) + len("moves_blob")) / n,
+    }
+    if zstandard is not None:
+        result["zstd_columns_bytes_per_move"] = (len(encode_moves(moves, "zstd")) + len("moves_blob")) / n
+    result["max_moves_under_400kb_before"] = int(400 * 1024 / result["list_of_maps_bytes_per_move"])
+    result["max_moves_under_400kb_after"] = int(400 * 1024 / result["zlib_columns_bytes_per_move"])
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plies", type=int, default=300)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = [
+        report("chess", chess_moves(args.plies)),
+        report("word_association_clash", word_association_moves(args.plies)),
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for r in results:
+        line = (
+            f"{r['game']:<24} {r['moves']} moves: {r['list_of_maps_bytes_per_move']:6.1f} B/move -> "
+            f"{r['zlib_columns_bytes_per_move']:5.1f} B/move (zlib)"
+        )
+        if "zstd_columns_bytes_per_move" in r:
+            line += f", {r['zstd_columns_bytes_per_move']:5.1f} B/move (zstd)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
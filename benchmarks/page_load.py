@@ -0,0 +1,172 @@
+"""
+Page load bytes and template compile time
+
+Simulates a browser loading each HTML page and every /static asset it links,
+then loading it again with a warm HTTP cache:
+
+- fresh responses (immutable or within max-age) are served from cache;
+- everything else is revalidated with If-None-Match / If-Modified-Since.
+
+"before" is the original setup (plain StaticFiles, no Cache-Control, pages
+rendered without an ETag), so every asset and page is refetched or
+revalidated. "after" is the app with `python build_assets.py` output.
+Bytes are response body bytes on the wire (compressed size when a
+precompressed variant is served).
+
+Also times the first render of every template in a fresh interpreter,
+with and without the prebuilt bytecode cache.
+
+    python -m benchmarks.page_load [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+from fastapi import Request
+
+PAGES = ["/", "/games", "/my-games", "/game", "/game?game_type=racing", "/game?game_type=word_association_clash"]
+ASSET_RE = re.compile(r'(?:src|href)="(/static/[^"]+)"')
+BROWSER_HEADERS = {"Accept-Encoding": "gzip, deflate, br"}
+
+COMPILE_PROBE = """
+import time
+from app.core.templating import compile_templates, get_templates
+get_templates()
+t0 = time.perf_counter()
+compile_templates()
+print((time.perf_counter() - t0) * 1000)
+"""
+
+
+def legacy_app():
+    """The app's pages and /static as they were served before fingerprinting"""
+    from fastapi import FastAPI
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.templating import Jinja2Templates
+
+    from app.core.config import settings
+
+    app = FastAPI()
+    app.mount("/static", StaticFiles(directory=str(settings.static_dir)), name="static")
+    templates = Jinja2Templates(directory=str(settings.templates_dir))
+    templates.env.globals["static_url"] = lambda path: f"/static/{path}"
+    names = {"": "index.html", "racing": "racing.html", "word_association_clash": "word_association.html"}
+
+    def page(name: str):
+        async def render(request: Request):
+            return templates.TemplateResponse(name, {"request": request, "app_name": settings.app_name})
+        return render
+
+    app.get("/")(page("landing.html"))
+    app.get("/games")(page("games_list.html"))
+    app.get("/my-games")(page("my_games.html"))
+
+    @app.get("/game")
+    async def game(request: Request, game_type: str = ""):
+        return await page(names.get(game_type, "index.html"))(request)
+
+    return app
+
+
+def wire_bytes(response) -> int:
+    if response.status_code == 304:
+        return 0
+    return int(response.headers.get("content-length", len(response.content)))
+
+
+def cacheable(response) -> bool:
+    cache_control = response.headers.get("cache-control", "")
+    return "immutable" in cache_control or ("max-age" in cache_control and "no-cache" not in cache_control)
+
+
+def visit(client, cache: Dict[str, Any], url: str, totals: Dict[str, int]) -> Any:
+    cached = cache.get(url)
+    if cached is not None and cacheable(cached):
+        totals["from_cache"] += 1
+        return cached
+    headers = dict(BROWSER_HEADERS)
+    if cached is not None:
+        if "etag" in cached.headers:
+            headers["If-None-Match"] = cached.headers["etag"]
+        if "last-modified" in cached.headers:
+            headers["If-Modified-Since"] = cached.headers["last-modified"]
+    response = client.get(url, headers=headers)
+    totals["requests"] += 1
+    totals["bytes"] += wire_bytes(response)
+    if response.status_code == 304:
+        totals["not_modified"] += 1
+        return cached
+    cache[url] = response
+    return response
+
+
+def load_pages(client) -> Tuple[Dict[str, int], Dict[str, int]]:
+    cache: Dict[str, Any] = {}
+    results: List[Dict[str, int]] = []
+    for _ in range(2):  # first visit, then repeat visit
+        totals = {"requests": 0, "bytes": 0, "not_modified": 0, "from_cache": 0}
+        for page in PAGES:
+            html = visit(client, cache, page, totals)
+            for asset in dict.fromkeys(ASSET_RE.findall(html.text)):
+                visit(client, cache, asset, totals)
+        results.append(totals)
+    return results[0], results[1]
+
+
+def compile_ms(cache_dir: str) -> float:
+    env = dict(os.environ, TEMPLATE_CACHE_DIR=cache_dir, AWS_REGION=os.environ.get("AWS_REGION", "us-east-1"))
+    runs = []
+    for _ in range(5):
+        out = subprocess.run([sys.executable, "-c", COMPILE_PROBE], env=env, capture_output=True, text=True, check=True)
+        runs.append(float(out.stdout.strip().splitlines()[-1]))
+    return sorted(runs)[len(runs) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    from fastapi.testclient import TestClient
+
+    from app.core.config import settings
+
+    subprocess.run([sys.executable, "build_assets.py"], check=True, capture_output=True)
+    from app.main import app
+
+    results: Dict[str, Any] = {}
+    for name, application in (("before", legacy_app()), ("after", app)):
+        first, repeat = load_pages(TestClient(application))
+        results[name] = {"first_visit": first, "repeat_visit": repeat}
+
+    with tempfile.TemporaryDirectory() as empty:
+        results["template_compile_ms"] = {
+            "no_cache": compile_ms(empty),
+            "prebuilt_cache": compile_ms(str(settings.template_cache_dir)),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{len(PAGES)} pages and their assets")
+    for name in ("before", "after"):
+        for visit_name in ("first_visit", "repeat_visit"):
+            t = results[name][visit_name]
+            print(
+                f"{name:<7} {visit_name:<13} {t['requests']:3d} requests {t['bytes'] / 1024:8.1f} KiB   "
+                f"({t['not_modified']} not modified, {t['from_cache']} from cache)"
+            )
+    c = results["template_compile_ms"]
+    print(f"first render of all templates: {c['no_cache']:.1f} ms -> {c['prebuilt_cache']:.1f} ms with bytecode cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Rate limit accuracy across workers and store round trips per request
+
+--workers processes (or Lambda instances) each run their own limiter, and
+requests from one client are spread round-robin over them. The client
+sends --rps requests per second for --duration seconds of simulated time,
+and the test counts how many requests got through compared with what
+RATE_LIMIT allows over that time.
+
+- before:          per-process memory counters (the old slowapi memory:// setup)
+- shared, batch 1: a shared store written on every request
+- shared:          a shared store with local pre-aggregation
+                   (RATE_LIMIT_SYNC_BATCH / RATE_LIMIT_SYNC_INTERVAL)
+
+The store is benchmarks.fakes.FakeRedis, or DynamoDB under moto with
+--backend dynamodb (`pip install moto`).
+
+    python -m benchmarks.rate_limit [--workers 10] [--rps 20] [--duration 180] [--backend redis] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import Any, Callable, Dict, List
+
+from .fakes import FakeRedis
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def drive(limiters: List[Any], clock: Clock, args) -> int:
+    allowed = 0
+    step = 1 / args.rps
+    for n in range(int(args.duration * args.rps)):
+        if limiters[n % len(limiters)].hit("203.0.113.7").allowed:
+            allowed += 1
+        clock.now += step
+    return allowed
+
+
+def make_dynamodb_store() -> Callable[[], Any]:
+    from moto import mock_aws
+
+    mock_aws().start()
+    import boto3
+
+    from app.core.rate_limit import DynamoDBWindowStore
+
+    dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+    table = dynamodb.create_table(
+        TableName="bench-rate-limits",
+        KeySchema=[{"AttributeName": "bucket", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "bucket", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    calls = {"n": 0}
+
+    def count(**_: Any) -> None:
+        calls["n"] += 1
+
+    table.meta.client.meta.events.register("before-call.dynamodb.*", count)
+    store = DynamoDBWindowStore(table=table)
+    store.requests = lambda: calls["n"]
+    return lambda: store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--rps", type=float, default=20.0, help="Requests per second from the client")
+    parser.add_argument("--duration", type=float, default=180.0, help="Simulated seconds")
+    parser.add_argument("--backend", choices=("redis", "dynamodb"), default="redis")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    from app.core.config import settings
+    from app.core.rate_limit import MemoryWindowStore, RedisWindowStore, SlidingWindowLimiter, parse_rate
+
+    limit, period = parse_rate(settings.rate_limit)
+    budget = limit * args.duration / period
+    sent = int(args.duration * args.rps)
+
+    if args.backend == "redis":
+        redis = FakeRedis(latency=0)
+        shared_store = lambda: RedisWindowStore(client=redis)
+        store_requests = lambda: redis.requests
+    else:
+        shared_store = make_dynamodb_store()
+        store_requests = shared_store().requests
+
+    results: Dict[str, Any] = {}
+    cases = (
+        ("before", lambda clock: MemoryWindowStore(clock), None),
+        ("shared_batch_1", lambda clock: shared_store(), 1),
+        ("shared", lambda clock: shared_store(), None),
+    )
+    for name, store, batch in cases:
+        clock = Clock()
+        clock.now += len(results) * 10 * period  # fresh windows for each case on the shared store
+        start = store_requests()
+        limiters = [SlidingWindowLimiter(store(clock), limit, period, sync_batch=batch, clock=clock) for _ in range(args.workers)]
+        allowed = drive(limiters, clock, args)
+        calls = store_requests() - start if name != "before" else 0
+        results[name] = {
+            "allowed": allowed,
+            "allowed_vs_limit": allowed / budget,
+            "store_requests": calls,
+            "store_requests_per_request": calls / sent,
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{args.workers} workers, one client at {args.rps:g} req/s for {args.duration:g} s: {sent} requests, "
+        f"RATE_LIMIT {settings.rate_limit} allows {budget:.0f} ({args.backend} store)"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:<15} allowed {r['allowed']:5d} ({r['allowed_vs_limit']:5.0%} of limit)   "
+            f"store requests {r['store_requests']:5d} ({r['store_requests_per_request']:.2f}/request)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+GameState serialization benchmark
+
+Per-request CPU for the storage and API conversions of 10-, 100- and 500-ply
+games, comparing the previous per-move dict path with the serialization layer:
+
+- save:     GameState -> DynamoDB item -> wire attribute values (boto3 serializer)
+- load:     wire attribute values -> DynamoDB item -> GameState (moves stay
+            encoded until read; `load_moves` also reads them)
+- response: GameState -> JSON body (pydantic response model vs direct encoding)
+
+    python -m benchmarks.serialization [--plies 10 100 500] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from app.schemas import GameState as GameStateSchema
+from app.services.game_manager import GameState, MoveRecord
+from app.services.serialization import (
+    move_from_dict,
+    move_to_dict,
+    state_from_item,
+    state_to_item,
+    state_to_json,
+)
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def make_state(plies: int) -> GameState:
+    files = "abcdefgh"
+    moves = [
+        MoveRecord(
+            ply=i + 1,
+            side="white" if i % 2 == 0 else "black",
+            move_uci=f"{files[i % 8]}{1 + i % 7}{files[(i + 3) % 8]}{2 + i % 6}",
+            move_san=None,
+            model_name="ollama:llama3.1:latest",
+            from_square=f"{files[i % 8]}{1 + i % 7}",
+            to_square=f"{files[(i + 3) % 8]}{2 + i % 6}",
+            tokens_used=80,
+        )
+        for i in range(plies)
+    ]
+    return GameState(
+        game_id="0" * 32,
+        game_type="chess",
+        state="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+        turn="white" if plies % 2 == 0 else "black",
+        over=False,
+        result={"status": "ongoing", "result": "*"},
+        moves=moves,
+        white_model="ollama:llama3.1:latest",
+        black_model="ollama:mistral-nemo:latest",
+        white_tokens=40 * plies,
+        black_tokens=40 * plies,
+    )
+
+
+def _to_wire(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: _serializer.serialize(v) for k, v in item.items()}
+
+
+def _from_wire(wire: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: _deserializer.deserialize(v) for k, v in wire.items()}
+
+
+def legacy_item(state: GameState) -> Dict[str, Any]:
+    return {
+        'game_id': state.game_id,
+        'game_type': state.game_type,
+        'state': state.state,
+        'turn': state.turn,
+        'over': state.over,
+        'result': state.result,
+        'white_model': state.white_model,
+        'black_model': state.black_model,
+        'white_tokens': state.white_tokens,
+        'black_tokens': state.black_tokens,
+        'moves': [move_to_dict(m) for m in state.moves],
+    }
+
+
+def legacy_load(item: Dict[str, Any]) -> GameState:
+    state = state_from_item({k: v for k, v in item.items() if k != 'moves'})
+    state.moves = [move_from_dict(m) for m in item.get('moves', [])]
+    return state
+
+
+def legacy_response(state: GameState) -> bytes:
+    payload = {
+        "game_id": state.game_id,
+        "game_type": state.game_type,
+        "state": state.state,
+        "fen": state.state,
+        "turn": state.turn,
+        "over": state.over,
+        "result": state.result,
+        "moves": [move_to_dict(m) for m in state.moves],
+        "white_model": state.white_model,
+        "black_model": state.black_model,
+        "white_tokens": state.white_tokens,
+        "black_tokens": state.black_tokens,
+    }
+    return GameStateSchema(**payload).model_dump_json().encode("utf-8")
+
+
+def cpu_us(fn: Callable[[], Any], min_time: float = 0.2) -> float:
+    runs = 0
+    start = time.process_time()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.process_time() - start
+        if elapsed >= min_time:
+            return elapsed / runs * 1e6
+
+
+def run(plies: int) -> Dict[str, Any]:
+    state = make_state(plies)
+    legacy_wire = _to_wire(legacy_item(state))
+    new_wire = _to_wire(state_to_item(state))
+
+    return {
+        "plies": plies,
+        "item_bytes": {
+            "legacy": len(json.dumps(legacy_wire)),
+            "blob": len(json.dumps({k: v for k, v in new_wire.items() if k != 'moves_blob'}))
+            + len(state_to_item(state)['moves_blob']),
+        },
+        "save_us": {
+            "legacy": cpu_us(lambda: _to_wire(legacy_item(state))),
+            "blob": cpu_us(lambda: _to_wire(state_to_item(state))),
+        },
+        "load_us": {
+            "legacy": cpu_us(lambda: legacy_load(_from_wire(legacy_wire))),
+            "blob": cpu_us(lambda: state_from_item(_from_wire(new_wire))),
+        },
+        "load_moves_us": {
+            "legacy": cpu_us(lambda: list(legacy_load(_from_wire(legacy_wire)).moves)),
+            "blob": cpu_us(lambda: list(state_from_item(_from_wire(new_wire)).moves)),
+        },
+        "response_us": {
+            "pydantic": cpu_us(lambda: legacy_response(state)),
+            "direct": cpu_us(lambda: state_to_json(state)),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plies", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = [run(plies) for plies in args.plies]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for r in results:
+        print(f"{r['plies']:>4} plies  item {r['item_bytes']['legacy']:>7} -> {r['item_bytes']['blob']:>6} bytes")
+        for stage, old, new in (
+            ("save_us", "legacy", "blob"),
+            ("load_us", "legacy", "blob"),
+            ("load_moves_us", "legacy", "blob"),
+            ("response_us", "pydantic", "direct"),
+        ):
+            values = r[stage]
+            print(f"      {stage[:-3]:<10} {values[old]:9.1f}us -> {values[new]:8.1f}us  ({values[old] / values[new]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
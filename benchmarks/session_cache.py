@@ -0,0 +1,109 @@
+"""
+DynamoDB session reads and writes under polling clients
+
+--users logged-in clients each poll every --interval seconds for
+--duration seconds of simulated time. Every poll does what get_current_user
+does: look the session up, and extend it by --session-ttl when needs_extend()
+says so. A share of requests carry a stale cookie for a session that no
+longer exists. The session table is benchmarks.fakes.FakeTable with
+--latency ms per request. Sessions start with --session-ttl seconds left, so
+with the defaults they cross SESSION_EXTEND_THRESHOLD during the run.
+
+- before: DynamoDBSessionStore, one read and one write per poll
+- after:  CachedSessionStore in front of it (SESSION_CACHE_TTL,
+          SESSION_EXTEND_THRESHOLD from settings)
+
+    python -m benchmarks.session_cache [--users 50] [--interval 2] [--duration 120] [--session-ttl 1000] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict
+
+from .fakes import FakeTable
+
+
+class Clock:
+    """Wall clock moved forward by the simulation instead of sleeping"""
+
+    def __init__(self) -> None:
+        self.offset = 0.0
+
+    def __call__(self) -> float:
+        return time.time() + self.offset
+
+
+def simulate(store, table: FakeTable, clock: Clock, args) -> Dict[str, Any]:
+    sessions = [
+        store.create_session({"email": f"user{n}@example.com", "name": f"User {n}"}, ttl_seconds=args.session_ttl)
+        for n in range(args.users)
+    ]
+    stale = [f"stale-cookie-{n}" for n in range(max(1, args.users // 10))]
+    table.requests = 0
+
+    polls = 0
+    t0 = time.perf_counter()
+    for _ in range(int(args.duration / args.interval)):
+        for session_id in sessions + stale:
+            if store.get_session(session_id) is not None and store.needs_extend(session_id):
+                store.extend_session(session_id, args.session_ttl)
+            polls += 1
+        clock.offset += args.interval
+    elapsed = time.perf_counter() - t0
+    return {
+        "polls": polls,
+        "dynamodb_requests": table.requests,
+        "requests_per_poll": table.requests / polls,
+        "wall_s": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls of one client")
+    parser.add_argument("--duration", type=float, default=120.0, help="Simulated seconds")
+    parser.add_argument("--session-ttl", type=int, default=1000, help="Session lifetime, and what an extension renews")
+    parser.add_argument("--latency", type=float, default=2.0, help="Simulated DynamoDB round trip, ms")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    from app.core.config import settings
+    from app.services.session_store import CachedSessionStore, DynamoDBSessionStore
+
+    results: Dict[str, Any] = {}
+    for name in ("before", "after"):
+        table = FakeTable(key="session_id", latency=args.latency / 1000, name="sessions")
+        clock = Clock()
+        backend = DynamoDBSessionStore(table_name="sessions", clock=clock)
+        backend._table = table
+        store = backend if name == "before" else CachedSessionStore(backend, clock=clock)
+        results[name] = simulate(store, table, clock, args)
+        if name == "after":
+            results[name]["cache"] = store.metrics()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{args.users} clients polling every {args.interval:g} s for {args.duration:g} s "
+        f"(cache TTL {settings.session_cache_ttl:g} s, extend threshold {settings.session_extend_threshold:g} s)"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:<7} {r['polls']:6d} polls  {r['dynamodb_requests']:6d} DynamoDB requests "
+            f"({r['requests_per_poll']:.2f}/poll)  {r['wall_s']:6.2f} s"
+        )
+    cache = results["after"]["cache"]
+    print(
+        f"reads avoided {cache['reads_avoided']} ({cache['hit_rate']:.0%}), "
+        f"negative hits {cache['negative_hits']}, TTL writes {cache['extends_written']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Memory held by in-process sessions in a long-running server
+
+Simulates --days of logins (--logins-per-hour, each session valid
+--ttl hours and never logged out, like most browser sessions) with a
+sweep every SESSION_SWEEP_INTERVAL of simulated time.
+
+- before: the routers' old module-level `sessions = {}` dict, which only
+          grows
+- after:  InMemorySessionStore (expiry heap, sweeps, LRU cap)
+
+Memory is measured with tracemalloc after the last login.
+
+    python -m benchmarks.session_memory [--days 7] [--logins-per-hour 200] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import secrets
+import tracemalloc
+from typing import Any, Dict
+
+
+def user(n: int) -> Dict[str, Any]:
+    return {"email": f"user{n}@example.com", "name": f"User {n}", "picture": "", "user_id": f"sub-{n:08d}"}
+
+
+def run_legacy(args) -> Dict[str, Any]:
+    tracemalloc.start()
+    sessions = {}
+    for n in range(int(args.days * 24 * args.logins_per_hour)):
+        sessions[secrets.token_urlsafe(32)] = user(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"sessions": len(sessions), "traced_bytes": current}
+
+
+def run_store(args) -> Dict[str, Any]:
+    from app.core.config import settings
+    from app.services.session_store import InMemorySessionStore
+
+    now = [0.0]
+    tracemalloc.start()
+    store = InMemorySessionStore(sweep_interval=0, clock=lambda: now[0])  # swept below, on simulated time
+    step = 3600 / args.logins_per_hour
+    next_sweep = settings.session_sweep_interval
+    for n in range(int(args.days * 24 * args.logins_per_hour)):
+        store.create_session(user(n), ttl_seconds=int(args.ttl * 3600))
+        now[0] += step
+        if now[0] >= next_sweep:
+            store.sweep()
+            next_sweep += settings.session_sweep_interval
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {**store.metrics(), "traced_bytes": current}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--logins-per-hour", type=int, default=200)
+    parser.add_argument("--ttl", type=float, default=24, help="Session lifetime, hours")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    results = {"before": run_legacy(args), "after": run_store(args)}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.days:g} days at {args.logins_per_hour} logins/hour, sessions valid {args.ttl:g} h")
+    for name, r in results.items():
+        print(f"{name:<7} {r['sessions']:7d} sessions held   {r['traced_bytes'] / 2**20:7.1f} MiB")
+    after = results["after"]
+    print(
+        f"store: {after.get('expired', 0)} expired by {after.get('sweeps', 0)} sweeps, "
+        f"{after.get('evicted', 0)} evicted, ~{after['approx_bytes'] / 2**20:.1f} MiB by its own estimate"
+    )
+
+
+if __name__ == "__main__":
+    main()
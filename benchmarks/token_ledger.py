@@ -0,0 +1,163 @@
+"""
+Token ledger: storage calls per LLM turn, budget accuracy across workers,
+and the cost of "tokens by model this week"
+
+--workers processes share one DynamoDB usage table (moto). --users users
+play turns spread round-robin over the workers, one turn every --interval
+simulated seconds per user, each turn using --tokens tokens on one of
+--models models, until every user has hit TOKEN_BUDGET_PER_USER_DAY.
+
+- per turn: every turn writes its counts and reads the budget from the store
+            (flush interval 0, no budget caching)
+- batched:  TOKEN_LEDGER_FLUSH_INTERVAL / TOKEN_LEDGER_BUDGET_REFRESH
+
+Reports store calls per turn, how far users got past their budget, and the
+calls needed to total a week of usage by model (before this there was no
+way short of scanning every game).
+
+    python -m benchmarks.token_ledger [--workers 4] [--users 20] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import Any, Dict
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_760_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_table():
+    from moto import mock_aws
+
+    mock_aws().start()
+    import boto3
+
+    dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+    table = dynamodb.create_table(
+        TableName="bench-token-usage",
+        KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}, {"AttributeName": "sk", "KeyType": "RANGE"}],
+        AttributeDefinitions=[
+            {"AttributeName": "pk", "AttributeType": "S"},
+            {"AttributeName": "sk", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    calls = {"n": 0}
+
+    def count(**_: Any) -> None:
+        calls["n"] += 1
+
+    table.meta.client.meta.events.register("before-call.dynamodb.*", count)
+    return table, calls
+
+
+def run_case(table, calls, flush_interval: float, budget_refresh: float, args) -> Dict[str, Any]:
+    from app.services.token_ledger import DynamoDBUsageStore, TokenLedger, day_of
+
+    for item in table.scan()["Items"]:  # start each case from an empty table
+        table.delete_item(Key={"pk": item["pk"], "sk": item["sk"]})
+    clock = Clock()
+    ledgers = []
+    for _ in range(args.workers):
+        ledger = TokenLedger(
+            store=DynamoDBUsageStore(table=table),
+            daily_budget=args.budget,
+            flush_interval=flush_interval,
+            budget_refresh=budget_refresh,
+            clock=clock,
+        )
+        if flush_interval > 0:
+            ledger._ensure_started = lambda: None  # flushed below, on simulated time
+        ledgers.append(ledger)
+
+    models = [f"ollama:model-{m}" for m in range(args.models)]
+    start = calls["n"]
+    turns = 0
+    last_flush = clock.now
+    done = set()
+    n = 0
+    while len(done) < args.users:
+        for u in range(args.users):
+            if u in done:
+                continue
+            user = f"user{u}@example.com"
+            ledger = ledgers[n % args.workers]
+            n += 1
+            if not ledger.check_budget(user).allowed:
+                done.add(u)
+                continue
+            ledger.record(user, models[u % args.models], args.tokens)
+            turns += 1
+        clock.now += args.interval
+        if flush_interval > 0 and clock.now - last_flush >= flush_interval:
+            for ledger in ledgers:
+                ledger.flush()
+            last_flush = clock.now
+    for ledger in ledgers:
+        ledger.flush()
+    store_calls = calls["n"] - start
+
+    day = day_of(clock())
+    used = [ledgers[0].store.get("user", day, f"user{u}@example.com") for u in range(args.users)]
+    before = calls["n"]
+    by_model = ledgers[0].usage("model", days=7)
+    week_calls = calls["n"] - before
+    return {
+        "turns": turns,
+        "store_calls": store_calls,
+        "store_calls_per_turn": store_calls / turns,
+        "budget_overshoot_max": max(used) / args.budget - 1,
+        "budget_overshoot_mean": sum(used) / len(used) / args.budget - 1,
+        "week_by_model_calls": week_calls,
+        "week_by_model_tokens": sum(by_model.values()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--models", type=int, default=6)
+    parser.add_argument("--tokens", type=int, default=400, help="Tokens per turn")
+    parser.add_argument("--interval", type=float, default=2.0, help="Simulated seconds between a user's turns")
+    parser.add_argument("--budget", type=int, default=20000, help="Daily token budget per user")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    from app.core.config import settings
+
+    table, calls = make_table()
+    results = {
+        "per_turn": run_case(table, calls, 0, 0, args),
+        "batched": run_case(table, calls, settings.token_ledger_flush_interval, settings.token_ledger_budget_refresh, args),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{args.workers} workers, {args.users} users, {args.tokens} tokens per turn, "
+        f"daily budget {args.budget} (DynamoDB under moto)"
+    )
+    for name in ("per_turn", "batched"):
+        r = results[name]
+        print(
+            f"{name:<9} {r['turns']:5d} turns   store calls {r['store_calls']:6d} ({r['store_calls_per_turn']:.2f}/turn)   "
+            f"budget overshoot mean {r['budget_overshoot_mean']:5.1%} max {r['budget_overshoot_max']:5.1%}"
+        )
+    r = results["batched"]
+    print(f"tokens by model this week: {r['week_by_model_tokens']} tokens in {r['week_by_model_calls']} queries")
+
+
+if __name__ == "__main__":
+    main()
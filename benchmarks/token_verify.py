@@ -0,0 +1,207 @@
+"""
+Cognito token verification: JWKS fetches and latency
+
+Signs RS256 tokens with a locally generated key and verifies them through
+CognitoService.verify_token, with `get_jwks` replaced by an in-process
+fetcher that sleeps --fetch-latency ms (the round trip to Cognito) and
+counts calls. No network or AWS account needed.
+
+- before:   the original verify_token (fetch and parse the JWKS every call)
+- after:    the cached keys, steady state
+- rotation: the pool starts signing with a new key halfway through
+- cold:     first verification in a new process, with and without the
+            snapshot left by a previous one
+- polling:  one token sent with every request (a page polling game state),
+            with and without the verified-token cache; then logout must
+            make the same token fail
+
+    python -m benchmarks.token_verify [--tokens 200] [--fetch-latency 40] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+POOL_ID = "us-east-1_bench"
+CLIENT_ID = "bench-client"
+REGION = "us-east-1"
+
+
+def make_key(kid: str):
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jwt.algorithms import RSAAlgorithm
+
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private.public_key()))
+    jwk.update(kid=kid, alg="RS256", use="sig")
+    return private, jwk
+
+
+def make_token(private, kid: str, n: int) -> str:
+    import jwt
+
+    now = int(time.time())
+    claims = {
+        "sub": f"user-{n}",
+        "email": f"user{n}@example.com",
+        "aud": CLIENT_ID,
+        "iss": f"https://cognito-idp.{REGION}.amazonaws.com/{POOL_ID}",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, private, algorithm="RS256", headers={"kid": kid})
+
+
+class Fetcher:
+    def __init__(self, latency_ms: float) -> None:
+        self.latency = latency_ms / 1000
+        self.keys: List[Dict[str, Any]] = []
+        self.calls = 0
+
+    def __call__(self) -> Dict[str, Any]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return {"keys": list(self.keys)}
+
+
+class Clock:
+    """Wall clock that the benchmark can move forward"""
+
+    def __init__(self) -> None:
+        self.offset = 0.0
+
+    def __call__(self) -> float:
+        return time.time() + self.offset
+
+
+def service(fetcher: Fetcher, snapshot_path: str, clock: Callable[[], float] = time.time, token_cache: int = 0):
+    from app.core.config import settings
+    from app.services.cognito_service import CognitoService
+    from app.services.jwks_cache import JWKSCache
+    from app.services.token_cache import VerifiedTokenCache
+
+    svc = CognitoService()
+    svc.user_pool_id, svc.client_id, svc.region = POOL_ID, CLIENT_ID, REGION
+    svc.get_jwks = fetcher
+    svc.jwks = JWKSCache(
+        fetcher,
+        ttl=settings.cognito_jwks_ttl,
+        min_refresh_interval=settings.cognito_jwks_min_refresh_interval,
+        snapshot_path=snapshot_path,
+        clock=clock,
+    )
+    svc.verified = VerifiedTokenCache(token_cache)
+    return svc
+
+
+def legacy_verify(svc) -> Callable[[str], Any]:
+    """verify_token as it was: JWKS fetched and the key parsed on every call"""
+    import jwt
+    from jwt.algorithms import RSAAlgorithm
+
+    def verify(token: str):
+        jwks = svc.get_jwks()
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = next(RSAAlgorithm.from_jwk(json.dumps(k)) for k in jwks["keys"] if k["kid"] == kid)
+        return jwt.decode(token, key, algorithms=["RS256"], audience=svc.client_id, issuer=f"https://cognito-idp.{REGION}.amazonaws.com/{POOL_ID}")
+
+    return verify
+
+
+def run(verify: Callable[[str], Any], tokens: List[str]) -> List[float]:
+    timings = []
+    for token in tokens:
+        t0 = time.perf_counter()
+        assert verify(token), "token failed to verify"
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings
+
+
+def summary(timings: List[float], fetches: int) -> Dict[str, float]:
+    return {
+        "verifications": len(timings),
+        "jwks_fetches": fetches,
+        "median_ms": statistics.median(timings),
+        "total_ms": sum(timings),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--fetch-latency", type=float, default=40.0, help="Simulated JWKS round trip, ms")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", REGION)
+    old_private, old_jwk = make_key("key-1")
+    new_private, new_jwk = make_key("key-2")
+    tokens = [make_token(old_private, "key-1", n) for n in range(args.tokens)]
+    half = args.tokens // 2
+    rotated = tokens[:half] + [make_token(new_private, "key-2", n) for n in range(half, args.tokens)]
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "jwks.json")
+
+        fetcher = Fetcher(args.fetch_latency)
+        fetcher.keys = [old_jwk]
+        results["before"] = summary(run(legacy_verify(service(fetcher, snapshot)), tokens), fetcher.calls)
+
+        fetcher = Fetcher(args.fetch_latency)
+        fetcher.keys = [old_jwk]
+        clock = Clock()
+        svc = service(fetcher, snapshot, clock)
+        timings = run(svc.verify_token, tokens)
+        results["after"] = summary(timings[1:], fetcher.calls - 1)
+        results["after"]["first_ms"] = timings[0]
+
+        # Some time later Cognito publishes a new key alongside the old one and signs with it
+        clock.offset += svc.jwks.min_refresh_interval
+        fetcher.keys = [old_jwk, new_jwk]
+        fetcher.calls = 0
+        results["rotation"] = summary(run(svc.verify_token, rotated), fetcher.calls)
+
+        cold = {}
+        for name, path in (("no_snapshot", os.path.join(tmp, "missing.json")), ("snapshot", snapshot)):
+            fetcher = Fetcher(args.fetch_latency)
+            fetcher.keys = [old_jwk, new_jwk]
+            timings = run(service(fetcher, path).verify_token, tokens[:1])
+            cold[name] = {"first_ms": timings[0], "jwks_fetches": fetcher.calls}
+        results["cold_start"] = cold
+
+        polling = {}
+        for name, size in (("no_token_cache", 0), ("token_cache", 1024)):
+            fetcher = Fetcher(args.fetch_latency)
+            fetcher.keys = [old_jwk]
+            svc = service(fetcher, snapshot, token_cache=size)
+            polling[name] = summary(run(svc.verify_token, tokens[:1] * args.tokens), fetcher.calls)
+            polling[name]["hit_rate"] = svc.verified.metrics()["hit_rate"]
+        svc.revoke_token(tokens[0])
+        polling["rejected_after_logout"] = svc.verify_token(tokens[0]) is None
+        results["polling"] = polling
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.tokens} verifications, simulated JWKS fetch {args.fetch_latency:.0f} ms")
+    for name in ("before", "after", "rotation"):
+        r = results[name]
+        print(
+            f"{name:<9} {r['jwks_fetches']:4d} fetches   median {r['median_ms']:7.2f} ms   total {r['total_ms']:8.1f} ms"
+        )
+    for name, r in results["cold_start"].items():
+        print(f"cold start ({name:<11}) first verification {r['first_ms']:7.2f} ms, {r['jwks_fetches']} fetch(es)")
+    for name in ("no_token_cache", "token_cache"):
+        r = results["polling"][name]
+        print(f"polling ({name:<14}) median {r['median_ms']:7.3f} ms   total {r['total_ms']:7.1f} ms   hit rate {r['hit_rate']:.2f}")
+    print(f"token rejected after logout: {results['polling']['rejected_after_logout']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Per-turn latency by stage, for every game type, with a regression gate
+
+One turn of MatchRunner.process_turn split into the stages it goes through,
+each timed on its own for --iterations turns from a mid-game position:
+
+- state_load:    ActiveGameService.load_state (boto3 get_item + state_from_item)
+- engine:        engine rebuilt from the stored state
+- prompt:        build_prompt (legal moves, board rendering)
+- adapter:       OllamaAdapter.generate over httpx.MockTransport (client
+                 setup, JSON encode/decode; no network, no model latency)
+- extract:       extract_move on the reply
+- validate:      is_legal_move against the engine
+- push:          GameManager.apply_move (engine rebuilt again, move record)
+- serialization: state_to_item
+- save:          boto3 put_item
+
+DynamoDB calls go through a real boto3 Table whose client is stubbed with
+botocore's Stubber, so request serialization and the resource layer's
+TypeSerializer/TypeDeserializer are measured while nothing is sent.
+
+Medians and p95 are reported in microseconds. With a baseline (by default
+benchmarks/baselines/turn_stages.json, written by --save-baseline) each
+stage median is compared with it: slower by more than --tolerance and by
+more than --floor-us is a regression, and the exit status is 1.
+
+    python -m benchmarks.turn_stages [--iterations 300] [--games chess racing] [--json]
+        [--output results.json] [--save-baseline] [--tolerance 0.5]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+GAMES = ("chess", "tic_tac_toe", "rock_paper_scissors", "racing", "word_association_clash")
+STAGES = ("state_load", "engine", "prompt", "adapter", "extract", "validate", "push", "serialization", "save")
+# Plies played before measuring, short enough that no game is over
+OPENING_PLIES = {"chess": 20, "tic_tac_toe": 3, "rock_paper_scissors": 1, "racing": 8, "word_association_clash": 4}
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "turn_stages.json"
+
+
+def stubbed_table():
+    """A boto3 Table whose client answers from a Stubber queue"""
+    import boto3
+    from botocore.stub import Stubber
+
+    resource = boto3.resource(
+        "dynamodb", region_name="us-east-1", aws_access_key_id="bench", aws_secret_access_key="bench"
+    )
+    table = resource.Table("LLM-Duel-ActiveGames")
+    stubber = Stubber(resource.meta.client)
+    stubber.activate()
+    return table, stubber
+
+
+def wire(value: Any) -> Any:
+    """TypeSerializer output as DynamoDB sends it (Binary unwrapped to bytes)"""
+    from boto3.dynamodb.types import Binary
+
+    if isinstance(value, Binary):
+        return value.value
+    if isinstance(value, dict):
+        return {k: wire(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [wire(v) for v in value]
+    return value
+
+
+def mid_game_state(game_type: str):
+    """A GameState a few plies in, played with the mock LLM's answers"""
+    from app.models.prompts import build_prompt, extract_move
+    from app.services.game_manager import GameState, game_manager
+
+    from .mock_llm import answer
+
+    random.seed(0)  # engines draw from the global generator (word association prompts)
+    rng = random.Random(1)
+    engine = game_manager._create_engine(game_type)
+    state = GameState(
+        game_id=f"bench-{game_type}",
+        game_type=game_type,
+        state=engine.get_state(),
+        turn=engine.get_turn(),
+        over=engine.is_game_over(),
+        result=engine.result(),
+        white_model="ollama:mock-white",
+        black_model="ollama:mock-black",
+        created_at="2026-01-01T00:00:00.000000Z",
+    )
+    for _ in range(OPENING_PLIES[game_type]):
+        prompt, _ = build_prompt(game_manager._create_engine(game_type, state.state))
+        move = extract_move(prompt, answer(prompt.text, rng))
+        model = state.white_model if state.turn == "white" else state.black_model
+        game_manager.apply_move(state, move, model_name=model, tokens_used=60)
+        if state.over or state.moves[-1].error:
+            raise RuntimeError(f"{game_type} opening failed at ply {len(state.moves)}; shorten it")
+    return state
+
+
+def mock_transport(game_type: str, state):
+    """httpx transport answering /api/generate with a legal move for state"""
+    import httpx
+
+    from app.models.prompts import build_prompt
+    from app.services.game_manager import game_manager
+
+    from .mock_llm import answer
+
+    prompt, _ = build_prompt(game_manager._create_engine(game_type, state.state))
+    body = {
+        "model": "mock",
+        "response": answer(prompt.text, random.Random(1)),
+        "done": True,
+        "prompt_eval_count": max(1, len(prompt.text) // 4),
+        "eval_count": 8,
+    }
+    return httpx.MockTransport(lambda request: httpx.Response(200, json=body))
+
+
+async def measure_game(game_type: str, iterations: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    from boto3.dynamodb.types import TypeSerializer
+
+    from app.models.ollama_adapter import OllamaAdapter
+    from app.models.prompts import build_prompt, extract_move
+    from app.services.active_game_db import active_game_service
+    from app.services.game_manager import game_manager
+    from app.services.match_runner import is_legal_move
+    from app.services.serialization import state_to_item
+
+    table, stubber = stubbed_table()
+    active_game_service.table = table
+    start = mid_game_state(game_type)
+    serializer = TypeSerializer()
+    stored = {"Item": {k: wire(serializer.serialize(v)) for k, v in state_to_item(start).items()}}
+    adapter = OllamaAdapter("mock", transport=mock_transport(game_type, start))
+
+    samples: Dict[str, List[int]] = {stage: [] for stage in STAGES}
+    clock = time.perf_counter_ns
+    for n in range(warmup + iterations):
+        stubber.add_response("get_item", copy.deepcopy(stored))  # deserialized in place by the resource
+        stubber.add_response("put_item", {})
+        timings = {}
+
+        t = clock()
+        state = active_game_service.load_state(start.game_id)
+        timings["state_load"] = clock() - t
+
+        t = clock()
+        engine = game_manager._create_engine(state.game_type, state.state)
+        timings["engine"] = clock() - t
+
+        t = clock()
+        prompt, error = build_prompt(engine)
+        timings["prompt"] = clock() - t
+
+        t = clock()
+        content, error = await adapter.generate(prompt)
+        timings["adapter"] = clock() - t
+        if content is None:
+            raise RuntimeError(f"{game_type}: mock adapter failed: {error}")
+
+        t = clock()
+        move = extract_move(prompt, content)
+        timings["extract"] = clock() - t
+
+        t = clock()
+        is_legal_move(state.game_type, engine, move)
+        timings["validate"] = clock() - t
+
+        t = clock()
+        game_manager.apply_move(state, move, model_name=adapter.model_name, tokens_used=60)
+        timings["push"] = clock() - t
+        if state.moves[-1].error:
+            raise RuntimeError(f"{game_type}: measured move {move!r} was rejected: {state.moves[-1].error}")
+
+        t = clock()
+        item = state_to_item(state)
+        timings["serialization"] = clock() - t
+
+        t = clock()
+        table.put_item(Item=item)
+        timings["save"] = clock() - t
+
+        if n >= warmup:
+            for stage, ns in timings.items():
+                samples[stage].append(ns)
+
+    stubber.assert_no_pending_responses()
+    results = {}
+    for stage, values in samples.items():
+        values.sort()
+        results[stage] = {
+            "median_us": round(statistics.median(values) / 1000, 1),
+            "p95_us": round(values[int(len(values) * 0.95)] / 1000, 1),
+        }
+    results["total"] = {
+        "median_us": round(sum(r["median_us"] for r in results.values()), 1),
+        "p95_us": round(sum(r["p95_us"] for r in results.values()), 1),
+    }
+    return results
+
+
+def find_regressions(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, floor_us: float
+) -> List[Dict[str, Any]]:
+    """Stage medians slower than the baseline's by more than tolerance and floor_us"""
+    regressions = []
+    for game_type, stages in results["games"].items():
+        for stage, r in stages.items():
+            before = baseline.get("games", {}).get(game_type, {}).get(stage)
+            if before is None:
+                continue
+            limit = max(before["median_us"] * (1 + tolerance), before["median_us"] + floor_us)
+            if r["median_us"] > limit:
+                regressions.append({
+                    "game_type": game_type,
+                    "stage": stage,
+                    "baseline_us": before["median_us"],
+                    "median_us": r["median_us"],
+                    "ratio": r["median_us"] / before["median_us"] if before["median_us"] else None,
+                })
+    return regressions
+
+
+def run(args) -> Dict[str, Any]:
+    games = {}
+    for game_type in args.games:
+        games[game_type] = asyncio.run(measure_game(game_type, args.iterations, args.warmup))
+    return {
+        "iterations": args.iterations,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "games": games,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--games", nargs="+", choices=GAMES, default=list(GAMES))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown of a stage median (0.5 = 50%%)")
+    parser.add_argument("--floor-us", type=float, default=25.0, help="Slowdowns below this many µs never fail")
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON to this file")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    results = run(args)
+
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        results["baseline"] = str(args.baseline)
+        results["regressions"] = find_regressions(results, baseline, args.tolerance, args.floor_us)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Per-turn stages, median / p95 µs over {args.iterations} turns (Python {results['python']})")
+        print(f"{'game':<24}" + "".join(f"{s:>15}" for s in (*STAGES, "total")))
+        for game_type, stages in results["games"].items():
+            print(f"{game_type:<24}" + "".join(
+                f"{stages[s]['median_us']:>8.0f}/{stages[s]['p95_us']:<6.0f}" for s in (*STAGES, "total")
+            ))
+        if args.save_baseline:
+            print(f"baseline written to {args.baseline}")
+        elif baseline is None:
+            print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        elif results["regressions"]:
+            print(f"regressions against {args.baseline} (tolerance {args.tolerance:.0%}, floor {args.floor_us:g} µs):")
+            for r in results["regressions"]:
+                print(f"  {r['game_type']} {r['stage']}: {r['baseline_us']:.0f} -> {r['median_us']:.0f} µs")
+        else:
+            print(f"no regressions against {args.baseline}")
+
+    if results.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Word Association state load/save benchmark
+
+Plays custom-prompt games of 12 and 200 rounds the way GameManager does
+(rebuild the engine from the saved state, apply one move, save again) and
+reports the per-move load and save cost at the start and end of each game.
+
+The state keeps at most HISTORY_WINDOW rounds of history and of the
+used_responses index, and only the prompts still to be played, so load and
+save cost stop growing once a game passes the window (the 200-round game);
+regular games are shorter than the window and keep everything.
+
+    python -m benchmarks.word_association_state [--rounds 12 200] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from app.services.relatedness import TokenOverlapChecker
+from app.services.word_association_engine import WordAssociationEngine
+
+
+def _word(i: int) -> str:
+    # Responses are normalized to letters only, so encode the index in letters
+    return "".join(chr(ord("a") + int(d)) for d in str(i))
+
+
+def _custom_prompts(rounds: int) -> str:
+    return json.dumps({"custom_prompts": [f"{_word(i)} theme" for i in range(rounds)]})
+
+
+def _legacy(state: str) -> str:
+    """Same state without the precomputed index, as saved before it existed"""
+    data = json.loads(state)
+    data.pop("used_responses", None)
+    return json.dumps(data)
+
+
+def run_game(rounds: int, packed: bool = False) -> Dict[str, float]:
+    checker = TokenOverlapChecker()
+
+    class _Engine(WordAssociationEngine):
+        MAX_ROUNDS = rounds
+
+    engine = _Engine(_custom_prompts(rounds), relatedness=checker)
+    state = engine.get_state_packed() if packed else engine.get_state()
+
+    loads: List[float] = []
+    saves: List[float] = []
+    legacy_loads: List[float] = []
+    ply = 0
+    while True:
+        t0 = time.perf_counter()
+        engine = WordAssociationEngine(state, relatedness=checker)
+        loads.append(time.perf_counter() - t0)
+        if engine.is_game_over():
+            break
+
+        if not packed:
+            legacy = _legacy(state)
+            t0 = time.perf_counter()
+            WordAssociationEngine(legacy, relatedness=checker)
+            legacy_loads.append(time.perf_counter() - t0)
+
+        side = engine.get_turn()
+        engine.push_move(f"{_word(engine.current_round)} {side}")
+        ply += 1
+
+        t0 = time.perf_counter()
+        state = engine.get_state_packed() if packed else engine.get_state()
+        saves.append(time.perf_counter() - t0)
+
+    def _avg_us(values: List[float], head: bool) -> float:
+        window = values[:20] if head else values[-20:]
+        return sum(window) / max(len(window), 1) * 1e6
+
+    result = {
+        "rounds": rounds,
+        "encoding": "packed" if packed else "json",
+        "moves": ply,
+        "state_bytes": len(state),
+        "load_us_first": _avg_us(loads, True),
+        "load_us_last": _avg_us(loads, False),
+        "save_us_first": _avg_us(saves, True),
+        "save_us_last": _avg_us(saves, False),
+    }
+    if legacy_loads:
+        result["legacy_load_us_last"] = _avg_us(legacy_loads, False)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[12, 200])
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = [run_game(rounds, packed) for rounds in args.rounds for packed in (False, True)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for r in results:
+        legacy = f"  legacy load(last) {r['legacy_load_us_last']:8.1f}us" if "legacy_load_us_last" in r else ""
+        print(
+            f"{r['rounds']:>4} rounds {r['encoding']:>6}: {r['state_bytes']:>7} bytes  "
+            f"load {r['load_us_first']:7.1f}->{r['load_us_last']:7.1f}us  "
+            f"save {r['save_us_first']:7.1f}->{r['save_us_last']:7.1f}us{legacy}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Build step for static assets and templates
+
+- Copies app/static into STATIC_BUILD_DIR under content-hashed names, with
+  gzip/brotli variants and manifest.json (see app/core/assets.py)
+- Compiles every template into the Jinja bytecode cache (TEMPLATE_CACHE_DIR)
+
+Run before packaging (sam build / build-lambda.sh) and whenever assets change:
+
+    python build_assets.py
+"""
+import os
+import shutil
+import sys
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.core.assets import brotli, build_assets
+from app.core.config import settings
+from app.core.templating import compile_templates
+
+
+def main():
+    manifest = build_assets(settings.static_dir, settings.static_build_dir)
+    print(f"Fingerprinted {len(manifest)} assets into {settings.static_build_dir}")
+    if brotli is None:
+        print("brotli not installed: only gzip variants were written (pip install brotli)")
+
+    if settings.template_cache_dir.exists():
+        shutil.rmtree(settings.template_cache_dir)
+    count = compile_templates()
+    print(f"Compiled {count} templates into {settings.template_cache_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+Build the word-vector table used by Word Association Clash
+
+Converts a GloVe/word2vec text file into the memory-mapped binary table read
+by EmbeddingRelatednessChecker (format in app/services/relatedness.py), then
+point WORD_EMBEDDINGS_PATH at the output:
+
+    python build_word_embeddings.py glove.6B.50d.txt words.emb [--limit 50000]
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.services.relatedness import write_embedding_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a word association embedding table")
+    parser.add_argument("source", type=Path, help="GloVe/word2vec text file")
+    parser.add_argument("dest", type=Path, help="Output table path")
+    parser.add_argument("--limit", type=int, default=50000, help="Keep only the first N words")
+    args = parser.parse_args()
+    count = write_embedding_table(args.source, args.dest, args.limit)
+    print(f"Wrote {count} vectors to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
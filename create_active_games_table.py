@@ -7,10 +7,28 @@ from botocore.exceptions import ClientError
 sys.path.append(os.getcwd())
 
 from app.core.config import settings
+from app.services.active_game_db import LISTING_ATTRIBUTES, LISTING_INDEX
+
+LISTING_INDEX_DEFINITION = {
+    'IndexName': LISTING_INDEX,
+    'KeySchema': [
+        {'AttributeName': 'status', 'KeyType': 'HASH'},
+        {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
+    ],
+    # Only what the games list shows; state and moves_blob stay out of the index
+    'Projection': {'ProjectionType': 'INCLUDE', 'NonKeyAttributes': list(LISTING_ATTRIBUTES)},
+}
+
+ATTRIBUTE_DEFINITIONS = [
+    {'AttributeName': 'game_id', 'AttributeType': 'S'},
+    {'AttributeName': 'status', 'AttributeType': 'S'},
+    {'AttributeName': 'created_at', 'AttributeType': 'S'}
+]
+
 
 def create_active_games_table():
     region = settings.aws_region
-    
+
     if settings.aws_access_key_id and settings.aws_secret_access_key:
         dynamodb = boto3.resource(
             'dynamodb',
@@ -20,7 +38,7 @@ def create_active_games_table():
         )
     else:
         dynamodb = boto3.resource('dynamodb', region_name=region)
-        
+
     table_name = 'LLM-Duel-ActiveGames'
 
     try:
@@ -29,9 +47,8 @@ def create_active_games_table():
             KeySchema=[
                 {'AttributeName': 'game_id', 'KeyType': 'HASH'}  # Partition key
             ],
-            AttributeDefinitions=[
-                {'AttributeName': 'game_id', 'AttributeType': 'S'}
-            ],
+            AttributeDefinitions=ATTRIBUTE_DEFINITIONS,
+            GlobalSecondaryIndexes=[LISTING_INDEX_DEFINITION],
             BillingMode='PAY_PER_REQUEST'
         )
         print(f"Creating table {table_name}...")
@@ -40,8 +57,53 @@ def create_active_games_table():
     except ClientError as e:
         if e.response['Error']['Code'] == 'ResourceInUseException':
             print(f"Table {table_name} already exists.")
+            add_listing_index(dynamodb.Table(table_name))
         else:
             print(f"Error creating table: {e}")
 
+
+def add_listing_index(table):
+    """Add the listing GSI to a table created before it existed, then backfill older items"""
+    indexes = table.global_secondary_indexes or []
+    if any(index['IndexName'] == LISTING_INDEX for index in indexes):
+        print(f"Index {LISTING_INDEX} already exists.")
+    else:
+        table.meta.client.update_table(
+            TableName=table.name,
+            AttributeDefinitions=ATTRIBUTE_DEFINITIONS,
+            GlobalSecondaryIndexUpdates=[{'Create': LISTING_INDEX_DEFINITION}]
+        )
+        print(f"Creating index {LISTING_INDEX} (builds in the background)...")
+    backfill_listing_attributes(table)
+
+
+def backfill_listing_attributes(table):
+    """One-off scan: give games saved before the (sharded) index a status partition and created_at"""
+    from app.services.game_manager import utc_now_iso
+    from app.services.serialization import game_status
+
+    updated = 0
+    kwargs = {
+        'ProjectionExpression': 'game_id, #over',
+        # Unsharded statuses ("ongoing") are from before LISTING_SHARDS
+        'FilterExpression': 'attribute_not_exists(#status) OR NOT contains(#status, :sep) OR attribute_not_exists(created_at)',
+        'ExpressionAttributeNames': {'#over': 'over', '#status': 'status'},
+        'ExpressionAttributeValues': {':sep': '#'},
+    }
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get('Items', []):
+            table.update_item(
+                Key={'game_id': item['game_id']},
+                UpdateExpression='SET #status = :status, created_at = if_not_exists(created_at, :now)',
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues={':status': game_status(bool(item.get('over')), item['game_id']), ':now': utc_now_iso()},
+            )
+            updated += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"Backfilled {updated} games.")
+
 if __name__ == '__main__':
     create_active_games_table()
@@ -57,5 +57,153 @@ def create_table():
         else:
             print(f"❌ Failed to create table: {e}")
 
+def create_history_table():
+    """Finished games: one item per (email, game_id), LSI by completion time"""
+    table_name = os.getenv("GAME_HISTORY_TABLE_NAME", "llm-duel-arena-game-history")
+    region = os.getenv("AWS_REGION", "eu-north-1")
+    aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
+    aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
+
+    print(f"Creating table '{table_name}' in region '{region}'...")
+
+    if not aws_access_key or not aws_secret_key:
+        print("❌ Error: AWS credentials not found.")
+        return
+
+    dynamodb = boto3.resource(
+        'dynamodb',
+        region_name=region,
+        aws_access_key_id=aws_access_key,
+        aws_secret_access_key=aws_secret_key
+    )
+
+    try:
+        table = dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[
+                {'AttributeName': 'email', 'KeyType': 'HASH'},  # Partition key
+                {'AttributeName': 'game_id', 'KeyType': 'RANGE'}  # Sort key
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'email', 'AttributeType': 'S'},
+                {'AttributeName': 'game_id', 'AttributeType': 'S'},
+                {'AttributeName': 'completed_at', 'AttributeType': 'S'}
+            ],
+            LocalSecondaryIndexes=[
+                {
+                    'IndexName': 'completed_at-index',
+                    'KeySchema': [
+                        {'AttributeName': 'email', 'KeyType': 'HASH'},
+                        {'AttributeName': 'completed_at', 'KeyType': 'RANGE'}
+                    ],
+                    'Projection': {'ProjectionType': 'ALL'}
+                }
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        print("Waiting for table to be active...")
+
+        table.meta.client.get_waiter('table_exists').wait(TableName=table_name)
+        print(f"✅ Table '{table_name}' created successfully and is ACTIVE.")
+
+    except Exception as e:
+        if "ResourceInUseException" in str(e):
+             print(f"✅ Table '{table_name}' already exists in '{region}'.")
+        else:
+            print(f"❌ Failed to create table: {e}")
+
+def create_rate_limit_table():
+    """Rate limit counters (RATE_LIMIT_BACKEND=dynamodb): one item per (client, window), expired by TTL"""
+    table_name = os.getenv("RATE_LIMIT_TABLE_NAME", "LLM-Duel-RateLimits")
+    region = os.getenv("AWS_REGION", "eu-north-1")
+    aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
+    aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
+
+    print(f"Creating table '{table_name}' in region '{region}'...")
+
+    if not aws_access_key or not aws_secret_key:
+        print("❌ Error: AWS credentials not found.")
+        return
+
+    dynamodb = boto3.resource(
+        'dynamodb',
+        region_name=region,
+        aws_access_key_id=aws_access_key,
+        aws_secret_access_key=aws_secret_key
+    )
+
+    try:
+        table = dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[{'AttributeName': 'bucket', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'bucket', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        print("Waiting for table to be active...")
+
+        table.meta.client.get_waiter('table_exists').wait(TableName=table_name)
+        table.meta.client.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'ttl'}
+        )
+        print(f"✅ Table '{table_name}' created successfully and is ACTIVE.")
+
+    except Exception as e:
+        if "ResourceInUseException" in str(e):
+             print(f"✅ Table '{table_name}' already exists in '{region}'.")
+        else:
+            print(f"❌ Failed to create table: {e}")
+
+def create_token_usage_table():
+    """Token usage (TOKEN_LEDGER_BACKEND=dynamodb): one item per (dimension#day, name), expired by TTL"""
+    table_name = os.getenv("TOKEN_USAGE_TABLE_NAME", "LLM-Duel-TokenUsage")
+    region = os.getenv("AWS_REGION", "eu-north-1")
+    aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
+    aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
+
+    print(f"Creating table '{table_name}' in region '{region}'...")
+
+    if not aws_access_key or not aws_secret_key:
+        print("❌ Error: AWS credentials not found.")
+        return
+
+    dynamodb = boto3.resource(
+        'dynamodb',
+        region_name=region,
+        aws_access_key_id=aws_access_key,
+        aws_secret_access_key=aws_secret_key
+    )
+
+    try:
+        table = dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[
+                {'AttributeName': 'pk', 'KeyType': 'HASH'},
+                {'AttributeName': 'sk', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'pk', 'AttributeType': 'S'},
+                {'AttributeName': 'sk', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        print("Waiting for table to be active...")
+
+        table.meta.client.get_waiter('table_exists').wait(TableName=table_name)
+        table.meta.client.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'ttl'}
+        )
+        print(f"✅ Table '{table_name}' created successfully and is ACTIVE.")
+
+    except Exception as e:
+        if "ResourceInUseException" in str(e):
+             print(f"✅ Table '{table_name}' already exists in '{region}'.")
+        else:
+            print(f"❌ Failed to create table: {e}")
+
 if __name__ == "__main__":
     create_table()
+    create_history_table()
+    create_rate_limit_table()
+    create_token_usage_table()
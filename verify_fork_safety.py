@@ -0,0 +1,104 @@
+"""
+Check that forked workers do not share the parent's AWS connections
+
+Starts a tiny local HTTP endpoint that answers DynamoDB GetItem, makes a
+request from the parent (opening a pooled keep-alive connection), forks, and
+makes the same request from the child. The child must arrive on a new TCP
+connection and its storage thread pool must run work. Both are rebuilt by the
+after-fork hooks in app/core/lifecycle.py.
+
+    python verify_fork_safety.py
+"""
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+connections = []  # client port of every request the endpoint served
+
+
+class DynamoDBStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        connections.append(self.client_address[1])
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-amz-json-1.0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def get_item(table):
+    table.get_item(Key={"email": "fork-check@example.com"})
+
+
+def verify_fork_safety():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DynamoDBStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["AWS_ENDPOINT_URL_DYNAMODB"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "fork-check")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fork-check")
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+
+    from app.core import lifecycle
+    from app.core.aio import get_storage_executor
+    from app.services.dynamodb_service import dynamodb_service
+
+    lifecycle.install()
+    get_item(dynamodb_service.table)
+    get_item(dynamodb_service.table)
+    parent_ports = set(connections)
+    get_storage_executor().submit(os.getpid).result()
+    print(f"Parent {os.getpid()}: {len(connections)} requests over connection(s) {sorted(parent_ports)}")
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: same singletons, but the hooks must have dropped the parent's clients and threads
+        os.close(read_fd)
+        result = {}
+        try:
+            get_item(dynamodb_service.table)
+            result["pool_pid"] = get_storage_executor().submit(os.getpid).result(timeout=5)
+        except Exception as e:
+            result["error"] = repr(e)
+        os.write(write_fd, json.dumps(result).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        result = json.loads(pipe.read() or "{}")
+    os.waitpid(pid, 0)
+    server.shutdown()
+
+    child_ports = set(connections) - parent_ports
+    ok = True
+    if "error" in result:
+        print(f"❌ Child request failed: {result['error']}")
+        return False
+    if len(connections) != 3 or not child_ports:
+        print(f"❌ Child reused the parent's connection (ports {connections})")
+        ok = False
+    else:
+        print(f"✅ Child {pid} opened its own connection ({sorted(child_ports)[0]})")
+    if result.get("pool_pid") != pid:
+        print("❌ Child storage pool did not run work in the child")
+        ok = False
+    else:
+        print("✅ Child storage thread pool is its own")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_fork_safety() else 1)